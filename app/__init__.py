@@ -21,11 +21,13 @@ def create_app():
     from .routes.shot_routes import shot_bp
     from .routes.settings_routes import settings_bp
     from .routes.reference_routes import reference_bp
+    from .routes.job_routes import job_bp
 
     # Register blueprints with appropriate prefixes
     app.register_blueprint(project_bp, url_prefix='/')
     app.register_blueprint(shot_bp, url_prefix="/api/shots")
     app.register_blueprint(settings_bp, url_prefix="/api/settings")
     app.register_blueprint(reference_bp, url_prefix="/api/reference")
+    app.register_blueprint(job_bp, url_prefix="/api/jobs")
 
     return app
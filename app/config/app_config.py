@@ -0,0 +1,50 @@
+from configparser import ConfigParser
+from functools import lru_cache
+import logging
+
+from .constants import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+# shotbuddy.cfg lives next to run.py in the repository root.
+CONFIG_FILE = BASE_DIR.parent / "shotbuddy.cfg"
+
+
+@lru_cache(maxsize=1)
+def load_config():
+    """Return the parsed ``shotbuddy.cfg`` (empty if the file is missing)."""
+    parser = ConfigParser()
+    if CONFIG_FILE.exists():
+        try:
+            parser.read(CONFIG_FILE)
+        except Exception as e:
+            logger.warning("Failed to read %s: %s", CONFIG_FILE, e)
+    return parser
+
+
+def config_str(section, key, fallback=None):
+    return load_config().get(section, key, fallback=fallback)
+
+
+def config_bool(section, key, fallback=False):
+    try:
+        return load_config().getboolean(section, key, fallback=fallback)
+    except ValueError:
+        logger.warning("Invalid boolean for [%s] %s in shotbuddy.cfg", section, key)
+        return fallback
+
+
+def config_int(section, key, fallback=0):
+    try:
+        return load_config().getint(section, key, fallback=fallback)
+    except ValueError:
+        logger.warning("Invalid integer for [%s] %s in shotbuddy.cfg", section, key)
+        return fallback
+
+
+def config_float(section, key, fallback=0.0):
+    try:
+        return load_config().getfloat(section, key, fallback=fallback)
+    except ValueError:
+        logger.warning("Invalid number for [%s] %s in shotbuddy.cfg", section, key)
+        return fallback
@@ -0,0 +1,54 @@
+import logging
+
+from flask import Blueprint, request, jsonify
+
+from ..services.job_queue import STATES
+from ..services.shot_manager import get_shot_manager
+from ..utils import require_project, error_response
+
+logger = logging.getLogger(__name__)
+
+job_bp = Blueprint('jobs', __name__)
+
+# Longest a request may block waiting for a job, in seconds.
+MAX_WAIT_SECONDS = 60
+
+
+@job_bp.route("/", methods=["GET"])
+@require_project
+def list_jobs(project):
+    """List the project's background jobs, newest first.
+
+    Optional query parameters: ``state`` (queued, running, done, failed),
+    ``shot`` and ``limit`` (default 100).
+    """
+    try:
+        state = request.args.get("state")
+        if state and state not in STATES:
+            return error_response(f"Invalid state: expected one of {', '.join(STATES)}")
+        limit = max(1, min(request.args.get("limit", 100, type=int), 1000))
+        jobs = get_shot_manager(project["path"]).jobs
+        return jsonify({"success": True, "data": {
+            "jobs": jobs.list(state=state, shot=request.args.get("shot"), limit=limit),
+            "counts": jobs.counts(),
+        }})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+@job_bp.route("/<int:job_id>", methods=["GET"])
+@require_project
+def get_job(project, job_id):
+    """Return one job; ``?wait=N`` waits up to N seconds for it to finish."""
+    try:
+        jobs = get_shot_manager(project["path"]).jobs
+        wait = request.args.get("wait", 0, type=float)
+        if wait > 0:
+            job = jobs.wait(job_id, timeout=min(wait, MAX_WAIT_SECONDS))
+        else:
+            job = jobs.get(job_id)
+        if job is None:
+            return error_response("Job not found", 404)
+        return jsonify({"success": True, "data": job})
+    except Exception as e:
+        return error_response(str(e), 500)
@@ -105,12 +105,13 @@ def open_project():
         )
         project_manager.save_projects()
 
-        # Sync latest folders to ensure consistency with WIP
+        # Sync latest folders with WIP in the background; progress is
+        # published as ``sync`` events and at /api/shots/sync-latest.
         try:
             shot_manager = get_shot_manager(path_str)
-            shot_manager.sync_latest_folders()
+            shot_manager.start_latest_sync()
         except Exception as e:
-            logger.warning("Failed to sync latest folders on project open: %s", e)
+            logger.warning("Failed to start syncing latest folders on project open: %s", e)
 
         return jsonify({"success": True, "data": project_info})
     except Exception as e:
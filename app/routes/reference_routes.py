@@ -5,8 +5,9 @@ from flask import Blueprint, request, jsonify, send_file, current_app
 from werkzeug.utils import secure_filename
 
 from ..config.constants import THUMBNAIL_CACHE_DIR
-from ..services.reference_manager import ReferenceManager
-from ..utils import require_project, error_response, reveal_in_file_browser
+from ..services.reference_manager import ReferenceManager, reference_listing_etag
+from ..services.thumbnail_queue import THUMBNAIL_QUEUE
+from ..utils import require_project, error_response, reveal_in_file_browser, conditional_response
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +18,15 @@ reference_bp = Blueprint('reference', __name__)
 def get_reference_images(project):
     """Get all reference images for the current project."""
     try:
-        ref_manager = ReferenceManager(project["path"])
-        images = ref_manager.get_reference_images()
-        result = {"success": True, "data": images}
-        if ref_manager.migrated_count:
-            result["migrated"] = ref_manager.migrated_count
-        return jsonify(result)
+        def build():
+            ref_manager = ReferenceManager(project["path"])
+            images = ref_manager.get_reference_images()
+            result = {"success": True, "data": images}
+            if ref_manager.migrated_count:
+                result["migrated"] = ref_manager.migrated_count
+            return jsonify(result)
+
+        return conditional_response(reference_listing_etag(project["path"]), build)
     except Exception as e:
         return error_response(str(e), 500)
 
@@ -128,8 +132,9 @@ def serve_reference_image(project, filename):
 
 @reference_bp.route("/thumbnail/<path:filename>")
 def serve_reference_thumbnail(filename):
-    """Serve a reference image thumbnail from the cache directory."""
+    """Serve a reference image thumbnail, waiting for it if it is still queued."""
     try:
+        THUMBNAIL_QUEUE.wait(Path(filename).name)
         thumb_path = THUMBNAIL_CACHE_DIR / Path(filename).name
         thumb_dir = THUMBNAIL_CACHE_DIR.resolve()
         thumb_path = thumb_path.resolve()
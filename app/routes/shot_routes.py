@@ -1,18 +1,31 @@
 from pathlib import Path
+import json
 import logging
 
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, stream_with_context
 
+from ..services.event_bus import EVENT_BUS
 from ..services.shot_manager import get_shot_manager
+from ..services.shot_filter import parse_filters
+from ..services.job_queue import wait_for_key
+from ..services.thumbnail_queue import (
+    DEFAULT_WAIT_TIMEOUT,
+    THUMBNAIL_QUEUE,
+    queue_thumbnail,
+    thumbnail_url,
+)
 from ..services.file_handler import FileHandler, resolve_naming_pattern
+from ..services.ingest import ingest_roots, resolve_source
+from ..services.upload_sessions import UploadNotFound, UploadOffsetError, UploadSessions
 from ..utils import (
     require_project,
     error_response,
+    conditional_response,
+    make_etag,
     reveal_in_file_browser,
     open_folder_in_browser,
-    create_image_thumbnail,
-    create_video_thumbnail,
 )
+from ..config.app_config import config_float
 from ..config.constants import (
     AssetType,
     ALLOWED_IMAGE_EXTENSIONS,
@@ -22,6 +35,9 @@ from ..config.constants import (
 
 logger = logging.getLogger(__name__)
 
+# Seconds between keep-alive comments on idle event streams.
+SSE_HEARTBEAT_SECONDS = 15
+
 shot_bp = Blueprint('shot', __name__)
 
 
@@ -37,16 +53,133 @@ def _find_file_with_extensions(folder_path, base_name, extensions):
     return None
 
 
+def _parse_fields(value):
+    """Split a ``fields`` query parameter into a sorted tuple of paths."""
+    if not value:
+        return None
+    return tuple(sorted({f.strip() for f in value.split(',') if f.strip()}))
+
+
+def _project_fields(shot, fields):
+    """Return only the dotted ``fields`` of a shot dict (plus its name).
+
+    ``image.thumbnail`` selects ``shot['image']['thumbnail']``; a bare
+    ``image`` keeps the whole sub-dict.  Unknown paths are skipped.
+    """
+    result = {'name': shot['name']}
+    for field in fields:
+        source, target = shot, result
+        keys = field.split('.')
+        for i, key in enumerate(keys):
+            if not isinstance(source, dict) or key not in source:
+                break
+            if i == len(keys) - 1:
+                target[key] = source[key]
+            else:
+                source = source[key]
+                target = target.setdefault(key, {})
+    return result
+
+
 @shot_bp.route("/", strict_slashes=False, methods=["GET"])
 @require_project
 def get_shots(project):
     try:
         shot_manager = get_shot_manager(project["path"])
-        shots = shot_manager.get_shots(generate=False)
-        return jsonify({"success": True, "data": shots})
+        fields = _parse_fields(request.args.get("fields"))
+
+        def build():
+            # Read the token first so changes made during the listing are
+            # reported again rather than lost.
+            token = shot_manager.change_token
+            shots = shot_manager.get_shots(generate=False)
+            if fields:
+                shots = [_project_fields(shot, fields) for shot in shots]
+            return jsonify({"success": True, "data": shots, "token": token})
+
+        etag = make_etag(shot_manager.listing_etag(), ','.join(fields or ()))
+        return conditional_response(etag, build)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/changes", methods=["GET"])
+@require_project
+def get_shot_changes(project):
+    """Return shots added, modified or removed since a change token."""
+    try:
+        since = int(request.args.get('since', ''))
+    except ValueError:
+        return error_response("Invalid or missing 'since' token")
+    try:
+        shot_manager = get_shot_manager(project["path"])
+        changes = shot_manager.get_changes(since)
+        fields = _parse_fields(request.args.get("fields"))
+        if fields:
+            for key in ('added', 'modified'):
+                changes[key] = [_project_fields(shot, fields) for shot in changes[key]]
+        return jsonify({"success": True, "data": changes})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/query", methods=["GET"])
+@require_project
+def query_shots(project):
+    """Return the shots matching filter predicates.
+
+    See :mod:`app.services.shot_filter` for the parameters.  Only names are
+    returned unless ``rows=1``; ``fields`` projects rows as in the listing.
+    """
+    try:
+        filters = parse_filters(request.args)
+    except ValueError as e:
+        return error_response(str(e))
+    try:
+        shot_manager = get_shot_manager(project["path"])
+        token = shot_manager.change_token
+        names = shot_manager.query_shots(filters)
+        if request.args.get("rows", "").lower() not in ("1", "true", "yes"):
+            return jsonify({"success": True, "data": names, "token": token})
+
+        shots = shot_manager.get_shots(generate=False, names=names)
+        fields = _parse_fields(request.args.get("fields"))
+        if fields:
+            shots = [_project_fields(shot, fields) for shot in shots]
+        return jsonify({"success": True, "data": shots, "token": token})
     except Exception as e:
         return error_response(str(e), 500)
 
+@shot_bp.route("/events", methods=["GET"])
+@require_project
+def shot_events(project):
+    """Stream live shot, thumbnail and reference changes as Server-Sent Events."""
+    subscription = EVENT_BUS.subscribe(project["path"])
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@shot_bp.route("/cache-stats", methods=["GET"])
+@require_project
+def get_cache_stats(project):
+    """Return hit/miss counters of the shot memo for diagnostics."""
+    shot_manager = get_shot_manager(project["path"])
+    return jsonify({"success": True, "data": shot_manager.cache_stats()})
+
 @shot_bp.route("/", methods=["POST"])
 @require_project
 def create_shot(project):
@@ -65,23 +198,35 @@ def create_shot(project):
 @shot_bp.route("/upload", methods=["POST"])
 @require_project
 def upload_file(project):
+    """Upload a shot asset.
+
+    Accepts a multipart form (``file``, ``shot_name``, ``file_type``,
+    ``custom_label``) or the raw file as the request body with the same
+    fields plus ``filename`` in the query string.  Raw bodies are streamed
+    straight into the shot folder without being spooled first.
+    """
     try:
-        file = request.files.get('file')
-        shot_name = request.form.get('shot_name')
-        file_type = request.form.get('file_type')
+        if request.mimetype == 'multipart/form-data':
+            file = request.files.get('file')
+            fields = request.form
+            if not file:
+                return error_response("Missing required parameters")
+            stream, filename = file.stream, file.filename
+        else:
+            fields = request.args
+            stream, filename = request.stream, fields.get('filename', '')
+        shot_name = fields.get('shot_name')
+        file_type = fields.get('file_type')
 
-        if not file or not shot_name or not file_type:
+        if not shot_name or not file_type:
             return error_response("Missing required parameters")
-        if file.filename == '':
+        if not filename:
             return error_response("No file selected")
 
-        custom_label = request.form.get('custom_label')
+        custom_label = fields.get('custom_label')
 
-        project_manager = current_app.config['PROJECT_MANAGER']
-        settings = project_manager.get_settings()
-        naming_pattern = settings.get('file_naming_pattern', '{shot}')
-        file_handler = FileHandler(project['path'], naming_pattern=naming_pattern)
-        result = file_handler.save_file(file, shot_name, file_type, custom_label=custom_label)
+        result = _file_handler(project).save_stream(stream, filename, shot_name, file_type,
+                                                    custom_label=custom_label)
 
         return jsonify({"success": True, "data": result})
     except ValueError as e:
@@ -89,6 +234,190 @@ def upload_file(project):
     except Exception as e:
         return error_response(str(e), 500)
 
+def _file_handler(project):
+    project_manager = current_app.config['PROJECT_MANAGER']
+    settings = project_manager.get_settings()
+    naming_pattern = settings.get('file_naming_pattern', '{shot}')
+    return FileHandler(project['path'], naming_pattern=naming_pattern)
+
+@shot_bp.route("/upload-batch", methods=["POST"])
+@require_project
+def upload_batch(project):
+    """Upload many files in one multipart request.
+
+    Expects one ``file`` part per file and an ``items`` field holding a
+    JSON list, in the same order, of
+    ``{"shot_name", "file_type", "custom_label"?}``.  Returns one result
+    per file.
+    """
+    try:
+        files = request.files.getlist('file')
+        try:
+            items = json.loads(request.form.get('items') or '[]')
+        except ValueError:
+            return error_response("Invalid items")
+        if not files or not isinstance(items, list) or len(items) != len(files):
+            return error_response("Expected one item per file")
+
+        entries = []
+        for file, item in zip(files, items):
+            item = item if isinstance(item, dict) else {}
+            entries.append({
+                'stream': file.stream,
+                'filename': file.filename,
+                'shot_name': item.get('shot_name'),
+                'file_type': item.get('file_type'),
+                'custom_label': item.get('custom_label'),
+            })
+
+        results = _file_handler(project).save_batch(entries)
+        for file, result in zip(files, results):
+            result['filename'] = file.filename
+        return jsonify({"success": True, "data": {"results": results}})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/ingest", methods=["POST"])
+@require_project
+def ingest_files(project):
+    """Version files the server can read directly, by path.
+
+    Expects: { "items": [{"path", "shot_name", "file_type", "custom_label"?, "move"?}] }
+    Paths must lie below a root in ``[ingest] roots``.  Returns one result
+    per item.
+    """
+    try:
+        roots = ingest_roots()
+        if not roots:
+            return error_response("Ingest by path is disabled; add roots to [ingest] in shotbuddy.cfg", 403)
+        data = request.get_json() or {}
+        items = data.get("items")
+        if not isinstance(items, list) or not items:
+            return error_response("Missing items")
+
+        file_handler = _file_handler(project)
+        results = []
+        for item in items:
+            path = item.get("path")
+            try:
+                shot_name = item.get("shot_name")
+                file_type = item.get("file_type")
+                if not shot_name or not file_type:
+                    raise ValueError("Missing required parameters")
+                source = resolve_source(path, roots)
+                result = file_handler.save_ingested(
+                    source, shot_name, file_type,
+                    custom_label=item.get("custom_label"), move=bool(item.get("move")))
+                results.append({"path": path, "success": True, "data": result})
+            except ValueError as e:
+                results.append({"path": path, "success": False, "error": str(e)})
+            except Exception as e:
+                logger.exception("Failed to ingest %s", path)
+                results.append({"path": path, "success": False, "error": str(e)})
+
+        return jsonify({"success": True, "data": {"results": results}})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/uploads", methods=["POST"])
+@require_project
+def create_upload(project):
+    """Open a resumable chunked upload.
+
+    Expects: { "shot_name", "file_type", "filename", "size", "custom_label"? }
+    """
+    try:
+        data = request.get_json() or {}
+        shot_name = data.get('shot_name')
+        file_type = data.get('file_type')
+        filename = data.get('filename')
+        size = data.get('size')
+        custom_label = data.get('custom_label')
+        if not shot_name or not file_type or not filename or size is None:
+            return error_response("Missing required parameters")
+
+        FileHandler.validate_item(filename, shot_name, file_type, custom_label)
+        status = UploadSessions(project['path']).create(
+            shot_name, file_type, filename, int(size), custom_label=custom_label)
+        return jsonify({"success": True, "data": status})
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/uploads/<upload_id>", methods=["GET"])
+@require_project
+def get_upload(project, upload_id):
+    try:
+        return jsonify({"success": True, "data": UploadSessions(project['path']).status(upload_id)})
+    except UploadNotFound:
+        return error_response("Upload not found", 404)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/uploads/<upload_id>", methods=["PUT"])
+@require_project
+def put_upload_chunk(project, upload_id):
+    """Append one chunk at ``?offset=N``; the body is the chunk's bytes.
+
+    The chunk's hex SHA-256 goes in the ``X-Chunk-Sha256`` header (or its
+    CRC-32 in ``X-Chunk-Crc32``).  A chunk at the wrong offset gets a 409
+    with the offset to resume from.
+    """
+    try:
+        offset = request.args.get('offset', type=int)
+        if offset is None:
+            return error_response("Missing offset")
+        if 'X-Chunk-Sha256' in request.headers:
+            algorithm, checksum = 'sha256', request.headers['X-Chunk-Sha256']
+        else:
+            algorithm, checksum = 'crc32', request.headers.get('X-Chunk-Crc32')
+        status = UploadSessions(project['path']).write_chunk(
+            upload_id, offset, request.stream, request.content_length, checksum, algorithm)
+        return jsonify({"success": True, "data": status})
+    except UploadNotFound:
+        return error_response("Upload not found", 404)
+    except UploadOffsetError as e:
+        return jsonify({"success": False, "error": str(e), "data": e.status}), 409
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/uploads/<upload_id>/finalize", methods=["POST"])
+@require_project
+def finalize_upload(project, upload_id):
+    """Version a completed chunked upload like a regular upload."""
+    try:
+        file_handler = _file_handler(project)
+
+        def save(path, session):
+            return file_handler.save_staged(
+                path, session['filename'], session['shot_name'], session['file_type'],
+                custom_label=session.get('custom_label'))
+
+        result = UploadSessions(project['path']).finalize(upload_id, save)
+        return jsonify({"success": True, "data": result})
+    except UploadNotFound:
+        return error_response("Upload not found", 404)
+    except UploadOffsetError as e:
+        return jsonify({"success": False, "error": str(e), "data": e.status}), 409
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/uploads/<upload_id>", methods=["DELETE"])
+@require_project
+def abort_upload(project, upload_id):
+    try:
+        UploadSessions(project['path']).abort(upload_id)
+        return jsonify({"success": True})
+    except UploadNotFound:
+        return error_response("Upload not found", 404)
+    except Exception as e:
+        return error_response(str(e), 500)
+
 @shot_bp.route("/notes", methods=["POST"])
 @require_project
 def save_shot_notes(project):
@@ -127,6 +456,32 @@ def save_shot_prompt(project):
     except Exception as e:
         return error_response(str(e), 500)
 
+@shot_bp.route("/prompts", methods=["POST"])
+@require_project
+def get_shot_prompts(project):
+    """Return several prompt bodies in one request.
+
+    Expects: { "items": [{"shot_name": "SH010", "asset_type": "image", "version": 2}, ...] }
+    ``version`` may be omitted for the asset's active version.
+    """
+    try:
+        data = request.get_json() or {}
+        items = []
+        for item in data.get("items", []):
+            shot_name = item.get("shot_name")
+            asset_type = item.get("asset_type")
+            version = item.get("version")
+            if not shot_name or not asset_type:
+                return error_response("Missing parameters")
+            items.append((shot_name, asset_type, int(version) if version is not None else None))
+
+        shot_manager = get_shot_manager(project["path"])
+        return jsonify({"success": True, "data": shot_manager.load_prompts(items)})
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
 @shot_bp.route("/prompt", methods=["GET"])
 @require_project
 def get_shot_prompt(project):
@@ -145,6 +500,37 @@ def get_shot_prompt(project):
     except Exception as e:
         return error_response(str(e), 500)
 
+@shot_bp.route("/prompt-history")
+@require_project
+def get_prompt_history(project):
+    """Return every stored prompt of a shot, grouped by asset type."""
+    try:
+        shot_name = request.args.get("shot_name")
+        if not shot_name:
+            return error_response("Missing parameters")
+
+        shot_manager = get_shot_manager(project["path"])
+        return jsonify({"success": True, "data": shot_manager.prompt_history(shot_name)})
+    except ValueError as e:
+        return error_response(str(e))
+    except Exception as e:
+        return error_response(str(e), 500)
+
+@shot_bp.route("/search")
+@require_project
+def search_shots(project):
+    """Full-text search over shot names, notes, prompts and artists."""
+    try:
+        query = request.args.get("q", "").strip()
+        limit = max(1, min(request.args.get("limit", 50, type=int), 500))
+        if not query:
+            return jsonify({"success": True, "data": []})
+
+        shot_manager = get_shot_manager(project["path"])
+        return jsonify({"success": True, "data": shot_manager.search(query, limit)})
+    except Exception as e:
+        return error_response(str(e), 500)
+
 @shot_bp.route("/prompt-versions")
 @require_project
 def get_prompt_versions(project):
@@ -233,7 +619,7 @@ def create_shot_between(project):
 
 @shot_bp.route("/thumbnail/<path:filepath>")
 def serve_thumbnail(filepath):
-    """Serve a thumbnail from the cache directory."""
+    """Serve a thumbnail from the cache directory, waiting for it if it is still queued."""
     try:
         thumb_path = THUMBNAIL_CACHE_DIR / Path(filepath).name
         thumb_dir = THUMBNAIL_CACHE_DIR.resolve()
@@ -242,8 +628,11 @@ def serve_thumbnail(filepath):
         if not str(thumb_path).startswith(str(thumb_dir)):
             return error_response("Invalid path")
 
-        if thumb_path.is_file():
-            return send_file(str(thumb_path))
+        # An upload's thumbnail job may not have reached the thumbnail
+        # queue yet.
+        wait_for_key(thumb_path.name, config_float('thumbnails', 'wait_timeout', DEFAULT_WAIT_TIMEOUT))
+        if THUMBNAIL_QUEUE.wait(thumb_path.name):
+            return send_file(str(thumb_path), max_age=0)
         return error_response("File not found", 404)
     except Exception as e:
         return error_response(str(e), 500)
@@ -374,12 +763,12 @@ def refresh_thumbnails(project):
         shot_manager = get_shot_manager(project["path"])
         shot_manager.sync_latest_folders()
 
-        # Regenerate by loading all shots (which triggers thumbnail creation)
-        shots = shot_manager.get_shots()
+        # Queue every missing thumbnail; clients pick them up as they finish
+        shots = shot_manager.get_shots(generate=True)
 
         return jsonify({
             "success": True,
-            "message": f"Regenerated thumbnails for {len(shots)} shots"
+            "message": f"Regenerating thumbnails for {len(shots)} shots"
         })
     except Exception as e:
         logger.error("Error refreshing thumbnails: %s", e)
@@ -389,20 +778,40 @@ def refresh_thumbnails(project):
 @shot_bp.route("/sync-latest", methods=["POST"])
 @require_project
 def sync_latest(project):
-    """Sync latest_images/ and latest_videos/ with the highest WIP versions."""
+    """Sync latest_images/ and latest_videos/ with the highest WIP versions.
+
+    Starts a background sync and returns its status; poll with GET or
+    follow the ``sync`` events.  ``full`` ignores the sync journal and
+    ``wait`` blocks until the sync has finished.
+    """
     try:
+        data = request.get_json(silent=True) or {}
+        full = str(data.get("full", request.args.get("full", ""))).lower() in ("1", "true")
+        wait = str(data.get("wait", request.args.get("wait", ""))).lower() in ("1", "true")
         shot_manager = get_shot_manager(project["path"])
-        stats = shot_manager.sync_latest_folders()
+        status = shot_manager.start_latest_sync(full=full)
+        if not wait:
+            return jsonify({"success": True, "data": status}), 202
+        status = shot_manager.wait_latest_sync()
         return jsonify({
-            "success": True,
-            "data": stats,
-            "message": f"Synced {stats['synced']}, removed {stats['removed']} orphans, {stats['errors']} errors"
+            "success": status.get("state") == "done",
+            "data": status,
+            "message": f"Synced {status.get('synced', 0)}, removed {status.get('removed', 0)} orphans, "
+                       f"{status.get('errors', 0)} errors"
         })
     except Exception as e:
         logger.error("Error syncing latest folders: %s", e)
         return error_response(str(e), 500)
 
 
+@shot_bp.route("/sync-latest", methods=["GET"])
+@require_project
+def sync_latest_status(project):
+    """Return the progress of the current or last background sync."""
+    shot_manager = get_shot_manager(project["path"])
+    return jsonify({"success": True, "data": shot_manager.latest_sync_status()})
+
+
 @shot_bp.route("/generate-thumbnail", methods=["POST"])
 @require_project
 def generate_thumbnail(project):
@@ -419,25 +828,9 @@ def generate_thumbnail(project):
             return error_response("shot_name and asset_type required")
 
         shot_manager = get_shot_manager(project["path"])
-        shot_info = shot_manager.get_shot_info(shot_name)
-
-        # Get the file path for the requested asset
-        if asset_type == AssetType.IMAGE:
-            file_path = shot_info['image'].get('file')
-            if file_path:
-                thumbnail = shot_manager.get_thumbnail_path(file_path, shot_name, generate=True)
-                return jsonify({"success": True, "thumbnail": thumbnail})
-        elif asset_type == AssetType.VIDEO:
-            file_path = shot_info['video'].get('file')
-            if file_path:
-                thumbnail = shot_manager.get_video_thumbnail_path(file_path, shot_name, generate=True)
-                return jsonify({"success": True, "thumbnail": thumbnail})
-        elif asset_type in AssetType.LIPSYNC_TYPES:
-            lipsync_info = shot_info['lipsync'].get(asset_type, {})
-            file_path = lipsync_info.get('file')
-            if file_path:
-                thumbnail = shot_manager.get_video_thumbnail_path(file_path, f"{shot_name}_{asset_type}", generate=True)
-                return jsonify({"success": True, "thumbnail": thumbnail})
+        thumb_key = shot_manager.queue_asset_thumbnail(shot_name, asset_type)
+        if thumb_key and THUMBNAIL_QUEUE.wait(thumb_key):
+            return jsonify({"success": True, "thumbnail": thumbnail_url(thumb_key)})
 
         return jsonify({"success": True, "thumbnail": None})
     except Exception as e:
@@ -448,10 +841,12 @@ def generate_thumbnail(project):
 @shot_bp.route("/restore-version", methods=["POST"])
 @require_project
 def restore_version(project):
-    """Restore a previous version to the latest folder."""
-    try:
-        import shutil
+    """Restore a previous version to the latest folder.
 
+    A metadata-only operation where the filesystem supports reflinks or
+    hardlinks; see :mod:`app.services.materialize`.
+    """
+    try:
         data = request.get_json()
         shot_name = data.get("shot_name")
         asset_type = data.get("asset_type")
@@ -489,28 +884,22 @@ def restore_version(project):
         if not version_file:
             return error_response(f"Version {version} not found")
 
-        # Remove existing files in latest folder for this shot
-        for ext in extensions:
-            existing = latest_dir / f"{base_name}{ext}"
-            if existing.exists():
-                existing.unlink()
-
-        # Copy the versioned file to latest folder
+        # Link (or clone, or copy) the versioned file into the latest
+        # folder, replacing latest files of this shot with another extension
         dest_path = latest_dir / f"{base_name}{version_file.suffix}"
-        shutil.copy2(str(version_file), str(dest_path))
+        shot_manager = get_shot_manager(project["path"])
+        shot_manager.place_latest(
+            shot_name, asset_type, version, version_file, dest_path,
+            [latest_dir / f"{base_name}{ext}" for ext in extensions])
+        shot_manager.refresh_shot(
+            shot_name, detail={'action': 'restored', 'asset': asset_type, 'version': version})
 
-        # Regenerate thumbnail for the restored version
+        # Re-render the thumbnail of the restored version in the background
         project_name = project_path.name
-        if asset_type == AssetType.IMAGE:
-            thumb_filename = f"{project_name}_{shot_name}_{dest_path.stem}_thumb.jpg"
-            thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-            create_image_thumbnail(dest_path, thumb_path)
-        else:
-            thumb_filename = f"{project_name}_{shot_name}_{dest_path.stem}_vthumb.jpg"
-            thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-            create_video_thumbnail(dest_path, thumb_path)
-
-        thumbnail_url = f"/static/thumbnails/{thumb_filename}"
+        suffix = 'thumb' if asset_type == AssetType.IMAGE else 'vthumb'
+        thumb_filename = f"{project_name}_{shot_name}_{dest_path.stem}_{suffix}.jpg"
+        pending_url = queue_thumbnail(project_path, dest_path, thumb_filename,
+                                      shot=shot_name, asset=asset_type, force=True)
 
         # For videos, also return the file path for hover preview
         file_path = str(dest_path) if asset_type == AssetType.VIDEO else None
@@ -518,7 +907,7 @@ def restore_version(project):
         logger.info("Restored %s %s version %d", shot_name, asset_type, version)
         return jsonify({
             "success": True,
-            "thumbnail": thumbnail_url,
+            "thumbnail": pending_url,
             "file_path": file_path
         })
     except Exception as e:
@@ -533,20 +922,25 @@ def generate_thumbnails_batch(project):
 
     Expects: { "items": [{"shot_name": "SH010", "asset_type": "image"}, ...] }
     Returns: { "success": true, "thumbnails": {"SH010-image": "/static/thumbnails/...", ...} }
+
+    With ``Accept: application/x-ndjson`` one JSON line is streamed per
+    item as soon as its thumbnail is ready (``{"key": ..., "url": ...}``,
+    or ``{"key": ..., "error": ...}``), followed by ``{"done": true}``.
     """
     try:
         data = request.get_json()
         items = data.get("items", [])
+        stream = request.accept_mimetypes.best == "application/x-ndjson"
 
-        if not items:
+        if not items and not stream:
             return jsonify({"success": True, "thumbnails": {}})
 
         shot_manager = get_shot_manager(project["path"])
-        thumbnails = {}
-
-        # Cache shot info to avoid repeated lookups
-        shot_info_cache = {}
 
+        # Queue everything first so the workers render in parallel, then
+        # collect the results as they finish.
+        queued = {}
+        failed = {}
         for item in items:
             shot_name = item.get("shot_name")
             asset_type = item.get("asset_type")
@@ -555,33 +949,37 @@ def generate_thumbnails_batch(project):
                 continue
 
             key = f"{shot_name}-{asset_type}"
-
-            # Get shot info (cached)
-            if shot_name not in shot_info_cache:
-                try:
-                    shot_info_cache[shot_name] = shot_manager.get_shot_info(shot_name)
-                except Exception:
-                    continue
-
-            shot_info = shot_info_cache[shot_name]
-
             try:
-                if asset_type == AssetType.IMAGE:
-                    file_path = shot_info['image'].get('file')
-                    if file_path:
-                        thumbnails[key] = shot_manager.get_thumbnail_path(file_path, shot_name, generate=True)
-                elif asset_type == AssetType.VIDEO:
-                    file_path = shot_info['video'].get('file')
-                    if file_path:
-                        thumbnails[key] = shot_manager.get_video_thumbnail_path(file_path, shot_name, generate=True)
-                elif asset_type in AssetType.LIPSYNC_TYPES:
-                    lipsync_info = shot_info['lipsync'].get(asset_type, {})
-                    file_path = lipsync_info.get('file')
-                    if file_path:
-                        thumbnails[key] = shot_manager.get_video_thumbnail_path(file_path, f"{shot_name}_{asset_type}", generate=True)
+                thumb_key = shot_manager.queue_asset_thumbnail(shot_name, asset_type)
             except Exception as e:
-                logger.warning("Failed to generate thumbnail for %s: %s", key, e)
-
+                logger.warning("Failed to queue thumbnail for %s: %s", key, e)
+                failed[key] = str(e)
+                continue
+            if thumb_key:
+                queued.setdefault(thumb_key, []).append(key)
+            else:
+                failed[key] = "No thumbnail available"
+
+        def results():
+            for thumb_key, ready in THUMBNAIL_QUEUE.as_completed(list(queued)):
+                for key in queued[thumb_key]:
+                    if ready:
+                        yield {"key": key, "url": thumbnail_url(thumb_key)}
+                    else:
+                        yield {"key": key, "error": "Thumbnail could not be rendered"}
+
+        if stream:
+            def ndjson():
+                for key, error in failed.items():
+                    yield json.dumps({"key": key, "error": error}) + "\n"
+                for result in results():
+                    yield json.dumps(result) + "\n"
+                yield json.dumps({"done": True}) + "\n"
+
+            return Response(ndjson(), mimetype="application/x-ndjson",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        thumbnails = {r["key"]: r["url"] for r in results() if "url" in r}
         return jsonify({"success": True, "thumbnails": thumbnails})
     except Exception as e:
         logger.error("Error generating thumbnails batch: %s", e)
@@ -0,0 +1,196 @@
+"""Single-pass directory classification for shot assets.
+
+Every directory involved in a listing is read exactly once with
+``os.scandir`` and its entries are classified by shot, asset type, version
+and extension.  Callers then answer "latest file", "highest version" and
+"has prompt" questions from memory instead of globbing once per extension.
+"""
+
+from pathlib import Path
+import os
+import re
+
+from ..config.constants import (
+    ALLOWED_IMAGE_EXTENSIONS,
+    ALLOWED_LIPSYNC_EXTENSIONS,
+    ALLOWED_VIDEO_EXTENSIONS,
+    AssetType,
+)
+
+VERSION_RE = re.compile(r'_v(\d{3})')
+
+# A shot name embedded in a filename, e.g. ``Demo_SH010_050.png``.  The
+# look-arounds stop ``SH010`` from matching inside ``SH010_050`` or
+# ``XSH010``.
+SHOT_TOKEN_RE = re.compile(r'(?<![A-Za-z0-9])SH\d{3}(?:_\d{3})?(?!\d)')
+
+LIPSYNC_PARTS = (AssetType.DRIVER, AssetType.TARGET, AssetType.RESULT)
+
+
+def list_files(directory):
+    """Return ``[(name, path_str)]`` for regular files in ``directory``.
+
+    Missing or unreadable directories yield an empty list.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return [(entry.name, entry.path) for entry in it if entry.is_file()]
+    except OSError:
+        return []
+
+
+def parse_version(stem):
+    """Return the ``_v###`` version number in ``stem`` or ``None``."""
+    m = VERSION_RE.search(stem)
+    return int(m.group(1)) if m else None
+
+
+def shot_tokens(stem):
+    """Return every shot name embedded in a filename stem."""
+    return SHOT_TOKEN_RE.findall(stem)
+
+
+class LatestFolder:
+    """Classified contents of ``latest_images`` or ``latest_videos``.
+
+    Files are grouped by every shot name found in their stem so a lookup
+    for one shot is a dict access instead of a glob over the folder.
+    """
+
+    def __init__(self, directory, extensions):
+        self.directory = Path(directory)
+        self.extensions = extensions
+        self.files = []
+        self.by_shot = {}
+        self._tokens = {}
+        for name, path in sorted(list_files(self.directory)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in extensions:
+                continue
+            path = Path(path)
+            tokens = set(shot_tokens(stem))
+            self.files.append(path)
+            self._tokens[path] = tokens
+            for token in tokens:
+                self.by_shot.setdefault(token, []).append(path)
+
+    def find(self, shot_name):
+        """Return the latest file for ``shot_name`` or ``None``.
+
+        The default ``{shot}{ext}`` name wins over files produced by a
+        custom naming pattern.
+        """
+        matches = self.by_shot.get(shot_name)
+        if not matches:
+            return None
+        for path in matches:
+            if path.stem == shot_name:
+                return path
+        return matches[0]
+
+    def shots(self):
+        """Return the set of shot names that have a file in this folder."""
+        return set(self.by_shot)
+
+    def names(self, shot_name):
+        """Return the sorted filenames belonging to ``shot_name``."""
+        return sorted(path.name for path in self.by_shot.get(shot_name, ()))
+
+    def orphans(self, shot_names):
+        """Return files whose stem names none of ``shot_names`` (a set)."""
+        return [path for path in self.files
+                if not any(token in shot_names for token in self._tokens[path])]
+
+
+class AssetVersions:
+    """Versioned files for one asset slot of one shot."""
+
+    def __init__(self):
+        self.versions = {}
+        self.unversioned = None
+        self.prompt_versions = set()
+
+    @property
+    def max_version(self):
+        return max(self.versions) if self.versions else 0
+
+    def best(self):
+        """Return ``(version, path)`` of the highest version or ``(0, None)``."""
+        if not self.versions:
+            return 0, None
+        version = self.max_version
+        return version, self.versions[version]
+
+
+class ShotScan:
+    """Classified contents of one shot's images/videos/lipsync folders."""
+
+    def __init__(self, shot_dir, shot_name, include_lipsync=True):
+        self.shot_name = shot_name
+        self.shot_dir = Path(shot_dir)
+        self.assets = {slot: AssetVersions() for slot in (AssetType.IMAGE, AssetType.VIDEO) + LIPSYNC_PARTS}
+        self.custom_files = []
+
+        self._scan_media(self.shot_dir / 'images', AssetType.IMAGE,
+                         ALLOWED_IMAGE_EXTENSIONS, '_image_prompt')
+        self._scan_media(self.shot_dir / 'videos', AssetType.VIDEO,
+                         ALLOWED_VIDEO_EXTENSIONS, '_video_prompt')
+        if include_lipsync:
+            self._scan_lipsync(self.shot_dir / 'lipsync')
+
+    def _scan_media(self, directory, asset_type, extensions, prompt_marker):
+        slot = self.assets[asset_type]
+        for name, path in list_files(directory):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() == '.txt' and stem.endswith(prompt_marker):
+                version = parse_version(stem)
+                if version is not None:
+                    slot.prompt_versions.add(version)
+                continue
+            if ext.lower() not in extensions or self.shot_name not in stem:
+                continue
+            version = parse_version(stem)
+            if version is not None:
+                slot.versions[version] = Path(path)
+
+    def _scan_lipsync(self, directory):
+        standard_markers = tuple(f'_{p}_v' for p in LIPSYNC_PARTS)
+        custom = []
+        for name, path in list_files(directory):
+            stem, ext = os.path.splitext(name)
+            if name.endswith('_prompt.txt'):
+                for part in LIPSYNC_PARTS:
+                    if f'{self.shot_name}_{part}_v' in stem:
+                        version = parse_version(stem)
+                        if version is not None:
+                            self.assets[part].prompt_versions.add(version)
+                        break
+                continue
+            if ext.lower() not in ALLOWED_LIPSYNC_EXTENSIONS:
+                continue
+
+            for part in LIPSYNC_PARTS:
+                key = f'{self.shot_name}_{part}'
+                if key not in stem:
+                    continue
+                version = parse_version(stem)
+                if version is not None:
+                    self.assets[part].versions[version] = Path(path)
+                elif stem.endswith(key):
+                    self.assets[part].unversioned = Path(path)
+                break
+
+            if not any(marker in name for marker in standard_markers):
+                custom.append(Path(path))
+        self.custom_files = sorted(custom)
+
+    def asset(self, slot):
+        return self.assets[slot]
+
+
+def scan_latest_folders(latest_images_dir, latest_videos_dir):
+    """Return ``{asset_type: LatestFolder}`` for both latest folders."""
+    return {
+        AssetType.IMAGE: LatestFolder(latest_images_dir, ALLOWED_IMAGE_EXTENSIONS),
+        AssetType.VIDEO: LatestFolder(latest_videos_dir, ALLOWED_VIDEO_EXTENSIONS),
+    }
@@ -0,0 +1,80 @@
+"""Monotonic per-project change tokens for incremental shot listings.
+
+Every mutation that changes what ``/api/shots`` would return records the
+affected shot here and bumps the project's change token.  Clients remember
+the token of their last listing and ask only for shots touched since then.
+
+The token survives restarts (it is stored in the shot index), but the
+event log itself is kept in memory and bounded; a token older than the
+retained window tells the client to fall back to a full listing.
+"""
+
+from collections import deque
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+ADDED = 'added'
+MODIFIED = 'modified'
+REMOVED = 'removed'
+
+# Number of change events kept in memory per project.
+CHANGE_LOG_SIZE = 10000
+
+
+class ChangeLog:
+    """Bounded log of ``(token, shot_name, kind)`` events."""
+
+    def __init__(self, index, maxlen=CHANGE_LOG_SIZE, listener=None):
+        self._index = index
+        self._listener = listener
+        self._lock = threading.Lock()
+        try:
+            self._token = int(index.get_meta('change_token') or 0)
+        except ValueError:
+            self._token = 0
+        # Oldest token a client may resume from; anything earlier predates
+        # the in-memory log.
+        self._floor = self._token
+        self._events = deque(maxlen=maxlen)
+
+    @property
+    def token(self):
+        return self._token
+
+    def record(self, shot_name, kind=MODIFIED, detail=None):
+        """Record a change to ``shot_name`` and return the new token.
+
+        ``detail`` is an optional dict describing the change (e.g. which
+        asset was versioned); it is only passed on to the listener.
+        """
+        with self._lock:
+            self._token += 1
+            if len(self._events) == self._events.maxlen:
+                self._floor = self._events[0][0]
+            self._events.append((self._token, shot_name, kind))
+            token = self._token
+            # Persisted under the lock so a lower token never overwrites a
+            # higher one; otherwise tokens clients have seen are reused
+            # after a restart.
+            self._index.set_meta('change_token', str(token))
+        if self._listener is not None:
+            self._listener(token, shot_name, kind, detail)
+        return token
+
+    def since(self, token):
+        """Return ``{shot_name: [kinds]}`` changed after ``token``.
+
+        Returns ``None`` when ``token`` is outside the retained window (too
+        old, or from before a restart with a different history) and the
+        caller has to fall back to a full listing.
+        """
+        with self._lock:
+            if token < self._floor or token > self._token:
+                return None
+            changed = {}
+            for event_token, shot_name, kind in self._events:
+                if event_token > token:
+                    changed.setdefault(shot_name, []).append(kind)
+            return changed
@@ -0,0 +1,102 @@
+"""In-process publish/subscribe hub for Server-Sent Events.
+
+Services publish small JSON-serialisable events for a project; every open
+``/api/shots/events`` stream subscribes to the project it is viewing.  Each
+subscriber owns a bounded queue: when a slow client falls behind, further
+events are dropped and the client is told to resynchronise instead of
+letting the queue grow without limit.
+"""
+
+from pathlib import Path
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of undelivered events held for a single client.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def project_key(project_path):
+    """Return the key events for ``project_path`` are published under."""
+    return str(Path(project_path).resolve())
+
+
+class Subscription:
+    """A client's bounded event queue."""
+
+    def __init__(self, bus, key, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self._bus = bus
+        self.key = key
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """Return the next event, or ``None`` if ``timeout`` elapsed.
+
+        After an overflow the backlog is discarded and a single ``resync``
+        event is returned so the client reloads its state.
+        """
+        if self.overflowed:
+            self.overflowed = False
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            return {'type': 'resync'}
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class EventBus:
+    """Fan events out to the subscribers of each project."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, project_path):
+        sub = Subscription(self, project_key(project_path))
+        with self._lock:
+            self._subscribers.setdefault(sub.key, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.key)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.key]
+
+    def publish(self, project_path, event):
+        with self._lock:
+            subs = list(self._subscribers.get(project_key(project_path), ()))
+        for sub in subs:
+            sub.put(event)
+
+
+# Shared by every service in the process.
+EVENT_BUS = EventBus()
+
+
+def publish_event(project_path, event_type, **data):
+    """Publish ``{'type': event_type, **data}`` for a project."""
+    data['type'] = event_type
+    try:
+        EVENT_BUS.publish(project_path, data)
+    except Exception as e:
+        logger.warning("Failed to publish %s event: %s", event_type, e)
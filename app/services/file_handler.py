@@ -1,12 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import logging
+import os
 import re
-import shutil
-
-from .prompt_importer import extract_prompt_from_png
-from .shot_manager import get_shot_manager
-from ..utils import create_image_thumbnail, create_video_thumbnail, ProjectPaths
+import threading
+
+from .prompt_importer import prompt_from_metadata
+from .shot_manager import get_shot_manager, validate_shot_name
+from .thumbnail_queue import pending_thumbnail_url
+from .upload_stream import (
+    adopt_file,
+    fsync_dir,
+    ingest_file,
+    read_header,
+    sniff_kind,
+    stream_to_temp,
+)
+from ..config.app_config import config_int
+from ..utils import ProjectPaths
 from ..config.constants import (
     ALLOWED_IMAGE_EXTENSIONS,
     ALLOWED_VIDEO_EXTENSIONS,
@@ -17,8 +29,21 @@ from ..config.constants import (
 
 VERSION_RE = re.compile(r'_v(\d{3})')
 
+# Shots saved in parallel by a batch upload; see [uploads] in shotbuddy.cfg.
+DEFAULT_BATCH_WORKERS = 4
+
 logger = logging.getLogger(__name__)
 
+# {version folder: lock} held while an upload picks its version number.
+_version_locks = {}
+_version_locks_guard = threading.Lock()
+
+
+def _version_lock(directory):
+    with _version_locks_guard:
+        return _version_locks.setdefault(str(directory), threading.Lock())
+
+
 # Ensure the thumbnail cache directory exists.
 THUMBNAIL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -67,9 +92,112 @@ class FileHandler:
                     logger.warning("Could not delete thumbnail %s: %s", thumb, e)
 
     def save_file(self, file, shot_name, file_type, custom_label=None):
-        """Save uploaded file with proper versioning"""
-        shot_dir = self.wip_dir / shot_name
-        file_ext = Path(file.filename).suffix.lower()
+        """Save an uploaded ``FileStorage`` with proper versioning."""
+        return self.save_stream(file.stream, file.filename, shot_name, file_type,
+                                custom_label=custom_label)
+
+    def save_stream(self, stream, filename, shot_name, file_type, custom_label=None):
+        """Save an upload read from ``stream`` with proper versioning.
+
+        The body is streamed once into a temporary file next to its WIP
+        destination (see :mod:`.upload_stream`) and renamed to the next
+        version, so the digest and embedded prompt come from the same pass.
+        """
+        return self._save_upload(
+            lambda dest_dir, png_text: stream_to_temp(stream, dest_dir, png_text),
+            filename, shot_name, file_type, custom_label)
+
+    def save_batch(self, items, workers=None):
+        """Save several uploads, one shot per worker thread.
+
+        ``items`` are dicts with ``stream``, ``filename``, ``shot_name``,
+        ``file_type`` and optionally ``custom_label``.  Items of one shot
+        are versioned in order; different shots are saved in parallel by
+        ``[uploads] batch_workers`` threads.  Thumbnails go to the shared
+        thumbnail queue as usual.  Returns one result per item, in order:
+        ``{"success": True, "data": ...}`` or ``{"success": False, "error": ...}``.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        by_shot = {}
+        # Reject invalid items before any file is written.
+        for index, item in enumerate(items):
+            try:
+                self.validate_item(item.get('filename'), item.get('shot_name'),
+                                   item.get('file_type'), item.get('custom_label'))
+            except ValueError as e:
+                results[index] = {'success': False, 'error': str(e)}
+                continue
+            by_shot.setdefault(item['shot_name'], []).append(index)
+        if not by_shot:
+            return results
+
+        def save_shot(indices):
+            for index in indices:
+                item = items[index]
+                try:
+                    data = self.save_stream(
+                        item['stream'], item.get('filename'), item['shot_name'],
+                        item['file_type'], custom_label=item.get('custom_label'))
+                    results[index] = {'success': True, 'data': data}
+                except ValueError as e:
+                    results[index] = {'success': False, 'error': str(e)}
+                except Exception as e:
+                    logger.exception("Batch upload of %s failed", item.get('filename'))
+                    results[index] = {'success': False, 'error': str(e)}
+
+        if workers is None:
+            workers = config_int('uploads', 'batch_workers', DEFAULT_BATCH_WORKERS)
+        workers = max(1, min(workers, len(by_shot)))
+        if workers == 1:
+            for indices in by_shot.values():
+                save_shot(indices)
+            return results
+
+        # get_shot_manager() looks up its cache on the Flask app.
+        from flask import current_app, has_app_context
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def save_shot_in_app(indices):
+            if app is None:
+                return save_shot(indices)
+            with app.app_context():
+                return save_shot(indices)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload') as pool:
+            list(pool.map(save_shot_in_app, by_shot.values()))
+        return results
+
+    def save_staged(self, path, filename, shot_name, file_type, custom_label=None):
+        """Save a file already assembled on disk (a chunked upload).
+
+        ``path`` is moved into the shot folder and versioned like a
+        streamed upload.
+        """
+        return self._save_upload(
+            lambda dest_dir, png_text: adopt_file(path, dest_dir, png_text),
+            filename, shot_name, file_type, custom_label)
+
+    def save_ingested(self, path, shot_name, file_type, custom_label=None, move=False):
+        """Version a file the server can read directly (ingest by path).
+
+        The file is placed with a reflink, hardlink or kernel copy (or
+        renamed, with ``move``) instead of being streamed; its content
+        digest is left to the background rehash.  The content type is
+        checked before anything is moved.
+        """
+        path = Path(path)
+        self.validate_item(path.name, shot_name, file_type, custom_label)
+        header, _ = read_header(path)
+        self.check_kind(file_type, sniff_kind(header))
+        return self._save_upload(
+            lambda dest_dir, png_text: ingest_file(path, dest_dir, png_text, move=move),
+            path.name, shot_name, file_type, custom_label)
+
+    @staticmethod
+    def validate_upload(filename, file_type, custom_label=None):
+        """Raise ValueError if ``filename`` cannot be uploaded as ``file_type``."""
+        file_ext = Path(filename or '').suffix.lower()
 
         if file_type == AssetType.IMAGE and file_ext not in ALLOWED_IMAGE_EXTENSIONS:
             raise ValueError(f"Invalid image format. Allowed: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}")
@@ -79,87 +207,142 @@ class FileHandler:
             raise ValueError(f"{file_type.capitalize()} does not accept image files")
         elif file_type in (AssetType.LIPSYNC_TYPES | {AssetType.LIPSYNC_CUSTOM}) and file_ext not in ALLOWED_LIPSYNC_EXTENSIONS:
             raise ValueError(f"Invalid lipsync format. Allowed: {', '.join(ALLOWED_LIPSYNC_EXTENSIONS)}")
+        elif file_type not in AssetType.ALL_TYPES:
+            raise ValueError(f"Unknown file type: {file_type}")
+
+        if file_type == AssetType.LIPSYNC_CUSTOM and not custom_label:
+            raise ValueError("Custom label is required for custom lipsync files")
+
+    @classmethod
+    def validate_item(cls, filename, shot_name, file_type, custom_label=None):
+        """Raise ValueError unless ``filename`` can be uploaded to shot ``shot_name``."""
+        if not shot_name or not file_type:
+            raise ValueError("Missing required parameters")
+        validate_shot_name(shot_name)
+        cls.validate_upload(filename, file_type, custom_label)
+
+    @staticmethod
+    def check_kind(file_type, kind):
+        """Raise ValueError if sniffed content ``kind`` does not fit ``file_type``."""
+        expected = file_type if file_type in AssetType.MEDIA_TYPES else None
+        if expected and kind and kind != expected:
+            raise ValueError(f"File content is {kind} data, not a {expected} file")
+        if file_type in (AssetType.DRIVER, AssetType.RESULT) and kind == 'image':
+            raise ValueError(f"{file_type.capitalize()} does not accept image files")
+
+    def _save_upload(self, stage, filename, shot_name, file_type, custom_label):
+        """Version an upload written into its folder by ``stage(dest_dir, png_text)``."""
+        self.validate_item(filename, shot_name, file_type, custom_label)
+        shot_dir = self.wip_dir / shot_name
+        file_ext = Path(filename).suffix.lower()
 
         if not shot_dir.exists():
             get_shot_manager(self.project_path).create_shot_structure(shot_name)
 
+        base_name = resolve_naming_pattern(
+            self.naming_pattern, self.project_path.name, shot_name
+        )
+        if file_type in AssetType.MEDIA_TYPES:
+            dest_dir = shot_dir / ('images' if file_type == AssetType.IMAGE else 'videos')
+            base = base_name
+        else:
+            # Lipsync files: driver/target/result or custom-labeled
+            suffix = custom_label if file_type == AssetType.LIPSYNC_CUSTOM else file_type
+            dest_dir = shot_dir / 'lipsync'
+            base = f'{base_name}_{suffix}'
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        upload = stage(dest_dir, file_ext == '.png')
+        try:
+            self.check_kind(file_type, upload.kind)
+            version, wip_path = self._publish_version(upload.tmp_path, dest_dir, base, file_ext)
+        except BaseException:
+            upload.discard()
+            raise
+
+        # The versioned file is durable from here on.  Everything else
+        # (latest folder, prompt import, thumbnail) is queued as jobs; the
+        # returned thumbnail URL resolves once its job has run.
+        manager = get_shot_manager(self.project_path)
+        manager.note_write(wip_path)
+        jobs = []
         if file_type in AssetType.MEDIA_TYPES:
-            wip_dir = shot_dir / ('images' if file_type == AssetType.IMAGE else 'videos')
-            base_name = resolve_naming_pattern(
-                self.naming_pattern, self.project_path.name, shot_name
-            )
-            version = self.get_next_version(wip_dir, base_name)
-            wip_filename = f'{base_name}_v{version:03d}{file_ext}'
-            wip_path = wip_dir / wip_filename
-            file.save(str(wip_path))
-
             final_dir = self.latest_images_dir if file_type == AssetType.IMAGE else self.latest_videos_dir
             final_filename = f'{base_name}{file_ext}'
             final_path = final_dir / final_filename
-
-            # Remove old latest files for this shot (any naming pattern)
-            for existing_file in final_dir.glob(f'*{shot_name}*'):
-                if existing_file.is_file():
-                    existing_file.unlink()
-
-            shutil.copy2(str(wip_path), str(final_path))
+            jobs.append(manager.jobs.submit('latest', {
+                'asset_type': file_type,
+                'version': version,
+                'wip_path': str(wip_path),
+                'final_path': str(final_path),
+                'digest': upload.digest,
+            }, shot=shot_name))
             thumb_key = shot_name
 
-            # Attempt to extract embedded prompt metadata from PNG files
+            # Import prompt metadata embedded in PNG text chunks, which
+            # were parsed while the upload was streamed.
             if file_ext == '.png':
-                prompt_data = extract_prompt_from_png(final_path)
-                if prompt_data and prompt_data.get('prompt'):
-                    prompt_text = prompt_data['prompt'].strip()
-                    neg = prompt_data.get('negative_prompt', '').strip()
-                    if neg:
-                        prompt_text += f"\n\nNegative: {neg}"
-                    try:
-                        manager = get_shot_manager(self.project_path)
-                        manager.save_prompt(shot_name, AssetType.IMAGE, version, prompt_text)
-                        logger.info("Imported prompt from metadata for %s", final_path)
-                    except Exception as e:
-                        logger.warning('Failed to save imported prompt: %s', e)
-                else:
-                    logger.info("No embedded prompt found in %s", final_path)
+                prompt_text = self._imported_prompt(
+                    wip_path, prompt_from_metadata(upload.text, wip_path))
+                if prompt_text:
+                    jobs.append(manager.jobs.submit('prompt', {
+                        'asset_type': AssetType.IMAGE,
+                        'version': version,
+                        'prompt': prompt_text,
+                    }, shot=shot_name))
         else:
-            # Lipsync files: driver/target/result or custom-labeled
-            if file_type == AssetType.LIPSYNC_CUSTOM:
-                if not custom_label:
-                    raise ValueError("Custom label is required for custom lipsync files")
-                suffix = custom_label
-            else:
-                suffix = file_type
-
-            dest_dir = shot_dir / 'lipsync'
-            dest_dir.mkdir(exist_ok=True)
-            base_name = resolve_naming_pattern(
-                self.naming_pattern, self.project_path.name, shot_name
-            )
-            base = f'{base_name}_{suffix}'
-            version = self.get_next_version(dest_dir, base)
-            wip_filename = f'{base}_v{version:03d}{file_ext}'
-            wip_path = dest_dir / wip_filename
-            file.save(str(wip_path))
-
             final_path = wip_path
             thumb_key = f'{shot_name}_{suffix}'
 
-        thumbnail_path = None
-        if file_type == AssetType.IMAGE:
-            thumbnail_path = self.create_thumbnail(str(final_path), shot_name)
-        elif file_ext in ALLOWED_IMAGE_EXTENSIONS:
-            thumbnail_path = self.create_thumbnail(str(final_path), thumb_key)
-        elif file_ext in ALLOWED_VIDEO_EXTENSIONS:
-            thumbnail_path = self.create_video_thumbnail(str(final_path), thumb_key)
-        # Audio files get no thumbnail
+        manager.refresh_shot(
+            shot_name, detail={'action': 'versioned', 'asset': file_type, 'version': version})
+
+        # Custom lipsync files have no grid slot to update, so their
+        # thumbnail job publishes no event.
+        thumbnail = None
+        thumb_name = self.thumbnail_filename(final_path, thumb_key)
+        if thumb_name:
+            jobs.append(manager.jobs.submit('thumbnail', {
+                'source': str(wip_path),
+                'thumb_key': thumb_name,
+                'asset': file_type if file_type != AssetType.LIPSYNC_CUSTOM else None,
+            }, shot=shot_name, key=thumb_name))
+            thumbnail = pending_thumbnail_url(thumb_name)
 
         return {
             'wip_path': str(wip_path).replace('\\', '/'),
             'final_path': str(final_path).replace('\\', '/'),
             'version': version,
-            'thumbnail': f"static/thumbnails/{Path(thumbnail_path).name}" if thumbnail_path else None
+            'thumbnail': thumbnail,
+            'jobs': [job_id for job_id in jobs if job_id is not None],
         }
 
+    def _publish_version(self, tmp_path, dest_dir, base, file_ext):
+        """Rename a finished upload to the next free version of ``base``.
+
+        Returns ``(version, path)``.  Concurrent uploads into the same
+        folder are serialized here so they never pick the same number.
+        """
+        with _version_lock(dest_dir):
+            version = self.get_next_version(dest_dir, base)
+            wip_path = dest_dir / f'{base}_v{version:03d}{file_ext}'
+            os.replace(tmp_path, wip_path)
+        fsync_dir(dest_dir)
+        return version, wip_path
+
+    @staticmethod
+    def _imported_prompt(path, prompt_data):
+        """Return the prompt text to store for embedded ``prompt_data``, or ``None``."""
+        if not prompt_data or not prompt_data.get('prompt'):
+            logger.info("No embedded prompt found in %s", path)
+            return None
+        prompt_text = prompt_data['prompt'].strip()
+        neg = prompt_data.get('negative_prompt', '').strip()
+        if neg:
+            prompt_text += f"\n\nNegative: {neg}"
+        logger.info("Importing prompt from metadata of %s", path)
+        return prompt_text
+
     def get_next_version(self, wip_dir, base_name):
         """Get the next available version number for a shot asset.
 
@@ -296,18 +479,16 @@ class FileHandler:
 
         return stats
 
-    def create_thumbnail(self, image_path, shot_name):
-        """Create thumbnail for image and save it to the central cache."""
-        image_path = Path(image_path)
-        project_name = self.project_path.name
-        thumb_filename = f"{project_name}_{shot_name}_{image_path.stem}_thumb.jpg"
-        thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-        return create_image_thumbnail(image_path, thumb_path)
+    def thumbnail_filename(self, file_path, owner):
+        """Return the thumbnail cache filename for ``file_path``.
 
-    def create_video_thumbnail(self, video_path, shot_name):
-        """Extract the first frame of ``video_path`` and save it as a thumbnail."""
-        video_path = Path(video_path)
+        Audio files have no thumbnail and return ``None``.
+        """
+        file_path = Path(file_path)
+        ext = file_path.suffix.lower()
         project_name = self.project_path.name
-        thumb_filename = f"{project_name}_{shot_name}_{video_path.stem}_vthumb.jpg"
-        thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-        return create_video_thumbnail(video_path, thumb_path)
+        if ext in ALLOWED_VIDEO_EXTENSIONS:
+            return f"{project_name}_{owner}_{file_path.stem}_vthumb.jpg"
+        if ext in ALLOWED_IMAGE_EXTENSIONS:
+            return f"{project_name}_{owner}_{file_path.stem}_thumb.jpg"
+        return None
@@ -0,0 +1,53 @@
+"""Ingesting files by server-side path.
+
+Shotbuddy usually runs next to the render outputs it manages, so a file
+can be versioned into a shot from its path without being pushed through
+the browser (``POST /api/shots/ingest``).  Only files below one of the
+roots listed in ``[ingest] roots`` may be ingested; the endpoint is off
+until at least one root is configured.
+"""
+
+from pathlib import Path
+import logging
+
+from ..config.app_config import config_str
+from ..utils import sanitize_path
+
+logger = logging.getLogger(__name__)
+
+
+def ingest_roots():
+    """Return the resolved allow-listed source roots (one per line in the config)."""
+    roots = []
+    for line in config_str('ingest', 'roots', '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            roots.append(sanitize_path(line).expanduser().resolve())
+        except OSError as e:
+            logger.warning("Ignoring ingest root %s: %s", line, e)
+    return roots
+
+
+def resolve_source(path, roots=None):
+    """Return the real path of ``path`` if it is a file below an allowed root.
+
+    Symlinks are resolved before the check, so a link cannot point out of
+    a root.
+
+    Raises:
+        ValueError: If the path is missing, not a file or not allowed.
+    """
+    roots = ingest_roots() if roots is None else roots
+    if not path:
+        raise ValueError("Missing path")
+    try:
+        source = sanitize_path(path).expanduser().resolve(strict=True)
+    except (OSError, RuntimeError):
+        raise ValueError(f"File not found: {path}")
+    if not any(source.is_relative_to(root) for root in roots):
+        raise ValueError(f"Path is outside the ingest roots: {path}")
+    if not source.is_file():
+        raise ValueError(f"Not a file: {path}")
+    return Path(source)
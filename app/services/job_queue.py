@@ -0,0 +1,439 @@
+"""Persistent background jobs.
+
+An upload returns as soon as its versioned WIP file is on disk.  The work
+that follows (placing the file into the latest folder, importing its
+embedded prompt, rendering its thumbnail) and the materialization probe
+of a newly opened project run as *jobs*: rows in
+``<project>/.shotbuddy/jobs.sqlite`` picked up by a few worker threads.
+
+Jobs of one shot run one at a time in submission order, so two quick
+uploads to a shot reach the latest folder in order; jobs of different
+shots run in parallel.  A job still queued or running when the server
+stops is run again when the project is next opened, so handlers must be
+idempotent.  State changes are published as ``job`` events, and
+``/api/jobs`` lists jobs or waits for one to finish.
+
+If the job table cannot be opened (a read-only share) jobs run inline
+in the submitting request, as they did before.
+"""
+
+from pathlib import Path
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from .shot_index import INDEX_DIRNAME
+from ..config.app_config import config_float, config_int
+
+logger = logging.getLogger(__name__)
+
+JOBS_FILENAME = 'jobs.sqlite'
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+STATES = (QUEUED, RUNNING, DONE, FAILED)
+
+# Worker threads per project and hours finished jobs are kept; see the
+# [jobs] section of shotbuddy.cfg.
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_KEEP_HOURS = 24
+
+# A job interrupted by this many restarts is given up on.
+MAX_ATTEMPTS = 3
+
+# Bump when the table layout changes; older job tables are dropped.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    shot TEXT,
+    key TEXT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+_COLUMNS = ('id', 'kind', 'shot', 'key', 'payload', 'state', 'progress', 'error',
+            'attempts', 'created_at', 'started_at', 'finished_at')
+
+# {key: Event} of keyed jobs not finished yet, across every project, so a
+# route can wait for e.g. a thumbnail without knowing the project.
+_key_events = {}
+_key_events_lock = threading.Lock()
+
+
+def wait_for_key(key, timeout=None):
+    """Wait for the unfinished job submitted under ``key``, if any.
+
+    Returns False if it is still unfinished after ``timeout`` seconds.
+    """
+    with _key_events_lock:
+        event = _key_events.get(key)
+    return event is None or event.wait(timeout)
+
+
+class Job:
+    """A claimed job, as passed to its handler."""
+
+    def __init__(self, queue, job_id, kind, shot, payload):
+        self._queue = queue
+        self.id = job_id
+        self.kind = kind
+        self.shot = shot
+        self.payload = payload
+
+    def progress(self, fraction):
+        """Record progress between 0 and 1."""
+        self._queue._set_progress(self.id, fraction)
+
+
+class JobQueue:
+    """Job table and worker threads of one project.
+
+    ``handlers`` maps a job kind to ``handler(job)``; an exception fails
+    the job.  ``publish(job_dict)`` is called whenever a job changes state.
+    """
+
+    def __init__(self, project_path, handlers, publish=None):
+        self.db_path = Path(project_path) / INDEX_DIRNAME / JOBS_FILENAME
+        self._handlers = handlers
+        self._publish = publish
+        self._lock = threading.RLock()
+        self._cond = threading.Condition(self._lock)
+        self._conn = None
+        self._disabled = False
+        self._threads = []
+        self._busy_shots = set()
+        self._stopped = False
+        self.workers = max(1, config_int('jobs', 'workers', DEFAULT_JOB_WORKERS))
+
+    def _connect(self):
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                conn.executescript('DROP TABLE IF EXISTS jobs;')
+                conn.executescript(_SCHEMA)
+                conn.execute('DELETE FROM meta')
+                conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)",
+                             (str(SCHEMA_VERSION),))
+                conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning("Job table unavailable at %s; running jobs inline: %s", self.db_path, e)
+            self._disabled = True
+        return self._conn
+
+    @staticmethod
+    def _row_dict(row):
+        job = dict(zip(_COLUMNS, row))
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def start(self):
+        """Requeue jobs interrupted by a shutdown, prune old ones and start workers."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            keep = config_float('jobs', 'keep_hours', DEFAULT_KEEP_HOURS) * 3600
+            try:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = 'Interrupted too often', finished_at = ? "
+                    "WHERE state = ? AND attempts >= ?",
+                    (FAILED, time.time(), RUNNING, MAX_ATTEMPTS))
+                conn.execute("UPDATE jobs SET state = ? WHERE state = ?", (QUEUED, RUNNING))
+                conn.execute("DELETE FROM jobs WHERE state IN (?, ?) AND finished_at < ?",
+                             (DONE, FAILED, time.time() - keep))
+                conn.commit()
+                pending = conn.execute(
+                    "SELECT key FROM jobs WHERE state = ?", (QUEUED,)).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Job table read failed: %s", e)
+                return
+            if not pending:
+                return
+            for (key,) in pending:
+                if key:
+                    self._register_key(key)
+            logger.info("Resuming %d queued jobs in %s", len(pending), self.db_path)
+            self._ensure_workers()
+
+    def submit(self, kind, payload, shot=None, key=None):
+        """Queue a job and return its id.
+
+        A job with the same ``kind`` and ``key`` that has not started yet
+        is updated instead of queueing another.  Runs the job inline and
+        returns ``None`` when the job table is unavailable.
+        """
+        with self._lock:
+            conn = None if self._stopped else self._connect()
+            if conn is not None:
+                try:
+                    job_id = self._insert(conn, kind, payload, shot, key)
+                except sqlite3.Error as e:
+                    logger.warning("Job table write failed; running %s inline: %s", kind, e)
+                else:
+                    if key:
+                        self._register_key(key)
+                    self._ensure_workers()
+                    self._cond.notify_all()
+                    return job_id
+        self._run_inline(kind, payload, shot)
+        return None
+
+    def _insert(self, conn, kind, payload, shot, key):
+        data = json.dumps(payload)
+        if key:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE kind = ? AND key = ? AND state = ? "
+                "ORDER BY id DESC LIMIT 1", (kind, key, QUEUED)).fetchone()
+            if row:
+                conn.execute("UPDATE jobs SET payload = ?, shot = ? WHERE id = ?",
+                             (data, shot, row[0]))
+                conn.commit()
+                return row[0]
+        cur = conn.execute(
+            "INSERT INTO jobs (kind, shot, key, payload, state, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", (kind, shot, key, data, QUEUED, time.time()))
+        conn.commit()
+        return cur.lastrowid
+
+    def _run_inline(self, kind, payload, shot):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            logger.warning("No handler for job kind %s", kind)
+            return
+        try:
+            handler(Job(self, None, kind, shot, payload))
+        except Exception as e:
+            logger.warning("Job %s for %s failed: %s", kind, shot, e)
+
+    def _register_key(self, key):
+        with _key_events_lock:
+            event = _key_events.get(key)
+            if event is None or event.is_set():
+                _key_events[key] = threading.Event()
+
+    def _release_key(self, key):
+        """Signal waiters on ``key`` unless another job with it is queued."""
+        conn = self._connect()
+        try:
+            again = conn.execute("SELECT 1 FROM jobs WHERE key = ? AND state IN (?, ?) LIMIT 1",
+                                 (key, QUEUED, RUNNING)).fetchone()
+        except sqlite3.Error:
+            again = None
+        if again:
+            return
+        with _key_events_lock:
+            event = _key_events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name='job', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _claim(self):
+        """Mark the oldest runnable job running; return it or ``None``."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, kind, shot, payload FROM jobs WHERE state = ? ORDER BY id",
+                (QUEUED,)).fetchall()
+            for job_id, kind, shot, payload in rows:
+                if shot is not None and shot in self._busy_shots:
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET state = ?, started_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ?", (RUNNING, time.time(), job_id))
+                conn.commit()
+                if shot is not None:
+                    self._busy_shots.add(shot)
+                return Job(self, job_id, kind, shot, json.loads(payload))
+        except sqlite3.Error as e:
+            logger.warning("Job table read failed: %s", e)
+        return None
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                job = None
+                while not self._stopped:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self._cond.wait(5.0)
+                if job is None:
+                    return
+            self._emit(job.id)
+            handler = self._handlers.get(job.kind)
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job.kind}")
+                handler(job)
+                state, error = DONE, None
+            except Exception as e:
+                logger.warning("Job %s (%s) failed: %s", job.id, job.kind, e)
+                state, error = FAILED, str(e)
+            self._finish(job, state, error)
+
+    def _finish(self, job, state, error):
+        with self._lock:
+            conn = self._connect()
+            key = None
+            try:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, finished_at = ?, "
+                    "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+                    (state, error, time.time(), state, job.id))
+                conn.commit()
+                row = conn.execute("SELECT key FROM jobs WHERE id = ?", (job.id,)).fetchone()
+                key = row[0] if row else None
+            except sqlite3.Error as e:
+                logger.warning("Job table write failed: %s", e)
+            self._busy_shots.discard(job.shot)
+            if key:
+                self._release_key(key)
+            self._cond.notify_all()
+        self._emit(job.id)
+
+    def _set_progress(self, job_id, fraction):
+        if job_id is None:
+            return
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("UPDATE jobs SET progress = ? WHERE id = ?",
+                             (max(0.0, min(1.0, float(fraction))), job_id))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.debug("Job progress write failed: %s", e)
+
+    def _emit(self, job_id):
+        if self._publish is None:
+            return
+        job = self.get(job_id)
+        if job is None:
+            return
+        try:
+            self._publish(job)
+        except Exception as e:
+            logger.debug("Failed to publish job %s: %s", job_id, e)
+
+    def get(self, job_id):
+        """Return one job as a dict, or ``None``."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?",
+                                   (job_id,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Job table read failed: %s", e)
+                return None
+            return self._row_dict(row) if row else None
+
+    def list(self, state=None, shot=None, limit=100):
+        """Return the newest jobs first, optionally filtered."""
+        clauses, params = [], []
+        if state:
+            clauses.append('state = ?')
+            params.append(state)
+        if shot:
+            clauses.append('shot = ?')
+            params.append(shot)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return []
+            try:
+                rows = conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs {where} ORDER BY id DESC LIMIT ?",
+                    params + [limit]).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Job table read failed: %s", e)
+                return []
+            return [self._row_dict(row) for row in rows]
+
+    def counts(self):
+        """Return ``{state: number of jobs}``."""
+        with self._lock:
+            conn = self._connect()
+            counts = dict.fromkeys(STATES, 0)
+            if conn is None:
+                return counts
+            try:
+                for state, count in conn.execute(
+                        "SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+                    counts[state] = count
+            except sqlite3.Error as e:
+                logger.warning("Job table read failed: %s", e)
+            return counts
+
+    def wait(self, job_id, timeout=None):
+        """Wait until a job is done or failed; return it (``None`` if unknown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                job = self.get(job_id)
+                if job is None or job['state'] in (DONE, FAILED):
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def join(self, timeout=None):
+        """Wait until no job is queued or running; return True if so."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                counts = self.counts()
+                if not counts[QUEUED] and not counts[RUNNING]:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def stop(self, timeout=5.0):
+        """Stop the workers after their current job; queued jobs stay queued."""
+        with self._lock:
+            self._stopped = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,229 @@
+"""Background synchronisation of the latest folders.
+
+Bringing ``latest_images``/``latest_videos`` in line with WIP used to run
+inside ``/api/project/open`` and visit every shot.  It now runs on a
+background thread (:class:`LatestSyncTask`) that reports its progress as
+``sync`` events, and a persisted :class:`SyncJournal` records, per shot,
+the directory stamp seen at its last successful sync so unchanged shots
+are skipped without being scanned.
+
+The journal lives in ``<project>/.shotbuddy/sync_journal.json``.  Like the
+shot index it is derived data: deleting it only makes the next sync visit
+every shot.
+
+Shots whose WIP files changed in place are re-hashed one at a time by a
+:class:`RehashQueue`, so content digests stay current without the sync
+itself reading media.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from .shot_index import INDEX_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+SYNC_JOURNAL_FILENAME = 'sync_journal.json'
+
+# Bump when the stamp format changes; older journals are ignored.
+JOURNAL_VERSION = 1
+
+# Minimum seconds between two progress events of a running sync.
+PROGRESS_INTERVAL = 0.5
+
+
+class SyncJournal:
+    """Last-synced stamp per shot, persisted as JSON."""
+
+    def __init__(self, project_path):
+        self.path = Path(project_path) / INDEX_DIRNAME / SYNC_JOURNAL_FILENAME
+        self._stamps = None
+
+    def load(self):
+        if self._stamps is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') != JOURNAL_VERSION:
+                    data = {}
+            except FileNotFoundError:
+                data = {}
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning("Ignoring unreadable sync journal %s: %s", self.path, e)
+                data = {}
+            self._stamps = dict(data.get('shots', {}))
+        return self._stamps
+
+    def get(self, shot_name):
+        return self.load().get(shot_name)
+
+    def put(self, shot_name, stamp):
+        self.load()[shot_name] = stamp
+
+    def discard(self, shot_name):
+        self.load().pop(shot_name, None)
+
+    def retain(self, shot_names):
+        """Forget every shot not in ``shot_names``."""
+        stamps = self.load()
+        for name in set(stamps) - set(shot_names):
+            del stamps[name]
+
+    def save(self):
+        data = {'version': JOURNAL_VERSION, 'shots': self.load()}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Failed to write sync journal %s: %s", self.path, e)
+
+
+class LatestSyncTask:
+    """Runs one sync at a time on a daemon thread and tracks its progress.
+
+    ``run(full, progress, stopped)`` does the work: it calls
+    ``progress(done, total, stats)`` as shots are visited and should return
+    early once ``stopped()`` is true.  ``publish(status)`` is called with
+    throttled progress snapshots and once when the run ends.
+    """
+
+    def __init__(self, run, publish=None):
+        self._run = run
+        self._publish = publish
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_publish = 0.0
+        self._status = {'state': 'idle'}
+
+    def status(self):
+        with self._lock:
+            return dict(self._status)
+
+    @property
+    def running(self):
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def start(self, full=False):
+        """Start a sync unless one is already running; return its status."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return dict(self._status)
+            self._stop.clear()
+            self._status = {
+                'state': 'running', 'full': full, 'done': 0, 'total': None,
+                'started_at': datetime.now().isoformat(), 'finished_at': None,
+            }
+            self._thread = threading.Thread(
+                target=self._main, args=(full,), name='latest-sync', daemon=True)
+            self._thread.start()
+            return dict(self._status)
+
+    def wait(self, timeout=None):
+        """Wait for the running sync; return its status."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.status()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self.wait(timeout)
+
+    def _progress(self, done, total, stats):
+        with self._lock:
+            self._status.update(stats, done=done, total=total)
+            now = time.monotonic()
+            if now - self._last_publish < PROGRESS_INTERVAL and done != total:
+                return
+            self._last_publish = now
+            status = dict(self._status)
+        self._emit(status)
+
+    def _main(self, full):
+        try:
+            stats = self._run(full=full, progress=self._progress, stopped=self._stop.is_set)
+            state = 'cancelled' if self._stop.is_set() else 'done'
+            update = dict(stats, state=state)
+        except Exception as e:
+            logger.exception("Background sync of latest folders failed")
+            update = {'state': 'failed', 'error': str(e)}
+        with self._lock:
+            self._status.update(update, finished_at=datetime.now().isoformat())
+            status = dict(self._status)
+        self._emit(status)
+
+    def _emit(self, status):
+        if self._publish is None:
+            return
+        try:
+            self._publish(status)
+        except Exception as e:
+            logger.debug("Failed to publish sync progress: %s", e)
+
+
+class RehashQueue:
+    """Single daemon thread rehashing queued shots one after another.
+
+    ``rehash(shot_name)`` does the work.  A shot is queued at most once
+    until its rehash starts.
+    """
+
+    def __init__(self, rehash):
+        self._rehash = rehash
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def submit(self, shot_name):
+        with self._lock:
+            if self._stop.is_set() or shot_name in self._queued:
+                return
+            self._queued.add(shot_name)
+            self._queue.put(shot_name)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._main, name='rehash', daemon=True)
+                self._thread.start()
+
+    def pending(self):
+        with self._lock:
+            return len(self._queued)
+
+    def join(self):
+        """Block until every queued shot has been rehashed."""
+        self._queue.join()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _main(self):
+        while not self._stop.is_set():
+            try:
+                shot_name = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._queued.discard(shot_name)
+            try:
+                self._rehash(shot_name)
+            except Exception as e:
+                logger.warning("Rehash of %s failed: %s", shot_name, e)
+            finally:
+                self._queue.task_done()
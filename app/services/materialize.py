@@ -0,0 +1,219 @@
+"""Placing WIP versions into the latest folders without duplicating data.
+
+Every upload, restore and sync used to ``shutil.copy2`` a WIP version into
+``latest_images``/``latest_videos`` (or ``ref-images/latest``).  Files are
+now *materialized* with the cheapest strategy the filesystem supports:
+
+``reflink``
+    Copy-on-write clone (``FICLONE``; Btrfs, XFS, bcachefs).  Shares the
+    data blocks until either file is written, so it is as safe as a copy.
+``hardlink``
+    A second name for the WIP file.  The app never writes into a latest
+    file in place (replacing one is always a rename), but a tool that
+    edits a latest file in place would change the WIP original too, so
+    hardlinks are only used when ``[latest] allow_hardlinks`` is set.
+``copy``
+    The fallback everywhere.  Uses ``copy_file_range`` where available,
+    which lets the kernel (or an NFS/SMB server) copy without passing the
+    data through user space, then ``shutil.copy2``.
+
+:func:`transfer` brings in files from outside the project (ingest by
+path) with the same strategies, or a plain rename when the source may be
+moved.
+
+The strategy is chosen by ``[latest] materialize`` in shotbuddy.cfg.
+``auto`` probes each (source, destination) filesystem pair once, when a
+project is opened, and caches the result.
+"""
+
+from pathlib import Path
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from ..config.app_config import config_bool, config_str
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+REFLINK = 'reflink'
+HARDLINK = 'hardlink'
+COPY = 'copy'
+RENAME = 'rename'
+STRATEGIES = (REFLINK, HARDLINK, COPY)
+
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int)).
+FICLONE = 0x40049409
+
+_PROBE_PREFIX = '.shotbuddy-probe-'
+
+# {(source st_dev, destination st_dev): strategy}
+_detected = {}
+_detected_lock = threading.Lock()
+
+
+def _reflink(src, dest):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src, 'rb') as s, open(dest, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    shutil.copystat(src, dest)
+
+
+def _copy(src, dest):
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    if copy_file_range is None:
+        shutil.copy2(src, dest)
+        return
+    with open(src, 'rb') as s, open(dest, 'wb') as d:
+        try:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                n = copy_file_range(s.fileno(), d.fileno(), min(remaining, 1 << 30))
+                if n == 0:
+                    break
+                remaining -= n
+        except OSError as e:
+            # Unsupported by the filesystem pair (EXDEV on older kernels,
+            # EINVAL/ENOSYS elsewhere); copy through user space instead.
+            logger.debug("copy_file_range %s failed (%s); copying", src, e)
+            s.seek(0)
+            d.seek(0)
+            d.truncate()
+            shutil.copyfileobj(s, d, 8 << 20)
+    shutil.copystat(src, dest)
+
+
+def _place(strategy, src, dest):
+    if strategy == REFLINK:
+        _reflink(src, dest)
+    elif strategy == HARDLINK:
+        os.link(src, dest)
+    else:
+        _copy(src, dest)
+
+
+def _candidates():
+    """Return the strategies to try, best first, from shotbuddy.cfg."""
+    configured = config_str('latest', 'materialize', 'auto').strip().lower()
+    if configured in STRATEGIES:
+        candidates = [configured]
+    else:
+        if configured != 'auto':
+            logger.warning("Unknown [latest] materialize = %s; using auto", configured)
+        candidates = [REFLINK, HARDLINK]
+    if not config_bool('latest', 'allow_hardlinks', False) and HARDLINK in candidates:
+        candidates.remove(HARDLINK)
+    return [c for c in candidates if c != COPY]
+
+
+def _probe(src_dir, dest_dir):
+    """Try each candidate strategy on a scratch file; return the first that works."""
+    candidates = _candidates()
+    if not candidates:
+        return COPY
+    try:
+        fd, src = tempfile.mkstemp(dir=src_dir, prefix=_PROBE_PREFIX)
+    except OSError as e:
+        logger.debug("Cannot probe %s: %s", src_dir, e)
+        return COPY
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'shotbuddy')
+        for strategy in candidates:
+            dest = Path(dest_dir) / f"{_PROBE_PREFIX}{Path(src).name[len(_PROBE_PREFIX):]}"
+            try:
+                _place(strategy, src, dest)
+                return strategy
+            except OSError:
+                continue
+            finally:
+                dest.unlink(missing_ok=True)
+        return COPY
+    finally:
+        Path(src).unlink(missing_ok=True)
+
+
+def detect_strategy(src_dir, dest_dir):
+    """Return the materialization strategy for files from ``src_dir`` into ``dest_dir``.
+
+    Probed once per pair of filesystems and cached.
+    """
+    try:
+        key = (os.stat(src_dir).st_dev, os.stat(dest_dir).st_dev)
+    except OSError:
+        return COPY
+    with _detected_lock:
+        strategy = _detected.get(key)
+        if strategy is None:
+            strategy = _probe(src_dir, dest_dir)
+            _detected[key] = strategy
+            logger.info("Materializing latest files from %s with %s", src_dir, strategy)
+        return strategy
+
+
+def materialize(src, dest):
+    """Place WIP file ``src`` at ``dest`` without writing through to ``src``.
+
+    The file is created under a temporary name next to ``dest`` and renamed
+    over it, so an existing ``dest`` (possibly a hardlink to another WIP
+    version) is replaced rather than overwritten.  Falls back to a copy if
+    the detected strategy fails for this file.  Returns the strategy used.
+    """
+    src, dest = Path(src), Path(dest)
+    strategy = detect_strategy(src.parent, dest.parent)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix='.part')
+    os.close(fd)
+    tmp = Path(tmp)
+    try:
+        tmp.unlink()
+        try:
+            _place(strategy, src, tmp)
+        except OSError as e:
+            if strategy == COPY:
+                raise
+            logger.debug("%s of %s failed (%s); copying", strategy, src, e)
+            tmp.unlink(missing_ok=True)
+            strategy = COPY
+            _place(COPY, src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return strategy
+
+
+def transfer(src, dest, move=False):
+    """Bring external file ``src`` in as the new file ``dest``.
+
+    With ``move`` the source is renamed when both are on one filesystem
+    and otherwise copied and then removed; links are not tried, since they
+    would leave the source in place.  Without it, the strategies of
+    :func:`materialize` are tried on the file itself, since probing a
+    source folder (a render output share) may not be possible.  Returns
+    the strategy used.
+    """
+    src, dest = Path(src), Path(dest)
+    if move:
+        try:
+            os.rename(src, dest)
+            return RENAME
+        except OSError as e:
+            logger.debug("Cannot rename %s (%s); copying", src, e)
+        _place(COPY, src, dest)
+        src.unlink()
+        return COPY
+    for strategy in _candidates():
+        try:
+            _place(strategy, src, dest)
+            return strategy
+        except OSError:
+            dest.unlink(missing_ok=True)
+    _place(COPY, src, dest)
+    return COPY
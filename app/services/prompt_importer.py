@@ -1,9 +1,17 @@
 import json
 import logging
+import struct
+import zlib
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Upper bound on the bytes buffered while looking for PNG text chunks;
+# ComfyUI workflows are large but far below this.
+PNG_TEXT_LIMIT = 16 << 20
+
 
 def extract_prompt_from_png(path):
     """Return prompt and negative prompt from PNG metadata if available."""
@@ -19,6 +27,11 @@ def extract_prompt_from_png(path):
         logger.warning("Failed to read image metadata for %s: %s", path, e)
         return None
 
+    return prompt_from_metadata(metadata, path)
+
+
+def prompt_from_metadata(metadata, path):
+    """Return prompt and negative prompt from a PNG text-chunk dict."""
     if not metadata:
         logger.info("No PNG metadata found in %s", path)
         return None
@@ -45,6 +58,71 @@ def extract_prompt_from_png(path):
     return None
 
 
+class PngTextReader:
+    """Collect PNG text chunks from data fed in order, e.g. while streaming.
+
+    Generators write their metadata before the image data, so reading stops
+    at the first ``IDAT`` chunk (or after :data:`PNG_TEXT_LIMIT` bytes).
+    ``text`` holds ``{keyword: value}`` from tEXt, zTXt and iTXt chunks.
+    """
+
+    def __init__(self):
+        self.text = {}
+        self.done = False
+        self._buf = bytearray()
+        self._started = False
+        self._seen = 0
+
+    def feed(self, data):
+        if self.done:
+            return
+        self._buf += data
+        self._seen += len(data)
+        if not self._started:
+            if len(self._buf) < len(PNG_SIGNATURE):
+                return
+            if not self._buf.startswith(PNG_SIGNATURE):
+                self._finish()
+                return
+            del self._buf[:len(PNG_SIGNATURE)]
+            self._started = True
+        while len(self._buf) >= 8:
+            length, ctype = struct.unpack('>I4s', bytes(self._buf[:8]))
+            if ctype in (b'IDAT', b'IEND'):
+                self._finish()
+                return
+            end = 8 + length + 4
+            if len(self._buf) < end:
+                break
+            if ctype in (b'tEXt', b'zTXt', b'iTXt'):
+                self._read_text(ctype, bytes(self._buf[8:8 + length]))
+            del self._buf[:end]
+        if self._seen > PNG_TEXT_LIMIT:
+            self._finish()
+
+    def _finish(self):
+        self.done = True
+        self._buf = bytearray()
+
+    def _read_text(self, ctype, data):
+        try:
+            keyword, _, rest = data.partition(b'\0')
+            key = keyword.decode('latin-1')
+            if ctype == b'tEXt':
+                value = rest.decode('latin-1')
+            elif ctype == b'zTXt':
+                value = zlib.decompress(rest[1:]).decode('latin-1')
+            else:
+                compressed, rest = rest[0], rest[2:]
+                _lang, _, rest = rest.partition(b'\0')
+                _translated, _, rest = rest.partition(b'\0')
+                value = (zlib.decompress(rest) if compressed else rest).decode('utf-8')
+        except (IndexError, UnicodeDecodeError, zlib.error) as e:
+            logger.debug("Skipping unreadable PNG %s chunk: %s", ctype.decode(), e)
+            return
+        self.text[key] = value
+
+
 def _find_key(metadata, names):
     """Return the key from metadata matching one of the names."""
     lower = {k.lower(): k for k in metadata.keys()}
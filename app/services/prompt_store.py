@@ -0,0 +1,190 @@
+"""Per-project store of asset prompts.
+
+Prompts used to live in one ``{shot}_v###_{type}_prompt.txt`` file per
+version, so every lookup meant a glob or an ``open``.  They now live in
+``<project>/.shotbuddy/prompts.sqlite`` keyed by (shot, asset type,
+version); loads, saves and version lists are single indexed queries.
+
+Unlike the shot index this store is the source of truth, so it is never
+dropped on a schema change.  Existing ``.txt`` prompts are imported once
+per project and again whenever a shot turns up files the store does not
+know yet; ShotManager can keep writing ``.txt`` copies for tools that
+read them (``[prompts] export_txt`` in shotbuddy.cfg).
+"""
+
+from pathlib import Path
+import logging
+import sqlite3
+import threading
+import time
+
+from .shot_index import INDEX_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+PROMPT_STORE_FILENAME = 'prompts.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS prompts (
+    shot TEXT NOT NULL,
+    asset_type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    prompt TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (shot, asset_type, version)
+);
+"""
+
+
+class PromptStore:
+    """SQLite-backed prompts keyed by ``(shot, asset_type, version)``.
+
+    Read failures are logged and return ``None`` so callers can fall back
+    to ``.txt`` files; :meth:`put` reports failure through its return value.
+    """
+
+    def __init__(self, project_path):
+        self.db_path = Path(project_path) / INDEX_DIRNAME / PROMPT_STORE_FILENAME
+        self._lock = threading.RLock()
+        self._conn = None
+        self._disabled = False
+
+    def _connect(self):
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Prompt store unavailable at %s: %s", self.db_path, e)
+            self._disabled = True
+        return self._conn
+
+    @property
+    def available(self):
+        with self._lock:
+            return self._connect() is not None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                return conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Prompt store read failed: %s", e)
+                return None
+
+    def _execute(self, sql, params=(), many=False):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return False
+            try:
+                with conn:
+                    if many:
+                        conn.executemany(sql, params)
+                    else:
+                        conn.execute(sql, params)
+                return True
+            except sqlite3.Error as e:
+                logger.warning("Prompt store write failed: %s", e)
+                return False
+
+    def get_meta(self, key):
+        rows = self._query('SELECT value FROM meta WHERE key = ?', (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key, value):
+        self._execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def get(self, shot_name, asset_type, version):
+        """Return the prompt text, ``''`` if there is none, or ``None`` on error."""
+        rows = self._query(
+            'SELECT prompt FROM prompts WHERE shot = ? AND asset_type = ? AND version = ?',
+            (shot_name, asset_type, version))
+        if rows is None:
+            return None
+        return rows[0][0] if rows else ''
+
+    def put(self, shot_name, asset_type, version, prompt):
+        """Store a prompt; a blank prompt removes the version.  Returns success."""
+        if not prompt.strip():
+            return self._execute(
+                'DELETE FROM prompts WHERE shot = ? AND asset_type = ? AND version = ?',
+                (shot_name, asset_type, version))
+        return self._execute(
+            'INSERT OR REPLACE INTO prompts (shot, asset_type, version, prompt, updated_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (shot_name, asset_type, version, prompt, time.time()))
+
+    def import_many(self, rows):
+        """Add ``(shot, asset_type, version, prompt)`` rows without overwriting."""
+        now = time.time()
+        return self._execute(
+            'INSERT OR IGNORE INTO prompts (shot, asset_type, version, prompt, updated_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(shot, asset, ver, text, now) for shot, asset, ver, text in rows if text.strip()],
+            many=True)
+
+    def versions(self, shot_name, asset_type):
+        """Return the sorted versions that have a prompt, or ``None`` on error."""
+        rows = self._query(
+            'SELECT version FROM prompts WHERE shot = ? AND asset_type = ? ORDER BY version',
+            (shot_name, asset_type))
+        return None if rows is None else [r[0] for r in rows]
+
+    def shot_versions(self, shot_name):
+        """Return ``{asset_type: set(versions)}`` for one shot, or ``None`` on error."""
+        rows = self._query('SELECT asset_type, version FROM prompts WHERE shot = ?', (shot_name,))
+        if rows is None:
+            return None
+        result = {}
+        for asset_type, version in rows:
+            result.setdefault(asset_type, set()).add(version)
+        return result
+
+    def history(self, shot_name):
+        """Return ``{asset_type: [{version, prompt, updated_at}]}`` for one shot."""
+        rows = self._query(
+            'SELECT asset_type, version, prompt, updated_at FROM prompts '
+            'WHERE shot = ? ORDER BY asset_type, version', (shot_name,))
+        result = {}
+        for asset_type, version, prompt, updated_at in rows or ():
+            result.setdefault(asset_type, []).append(
+                {'version': version, 'prompt': prompt, 'updated_at': updated_at})
+        return result
+
+    def stamps(self, shot_name=None):
+        """Return ``{shot: stamp}`` that changes whenever a shot's prompts do.
+
+        Covers every shot with prompts, or just ``shot_name`` when given.
+        """
+        if shot_name is None:
+            rows = self._query(
+                'SELECT shot, COUNT(*), MAX(updated_at) FROM prompts GROUP BY shot')
+        else:
+            rows = self._query(
+                'SELECT shot, COUNT(*), MAX(updated_at) FROM prompts WHERE shot = ? '
+                'GROUP BY shot', (shot_name,))
+        return {shot: f'{count}:{updated}' for shot, count, updated in rows or ()}
+
+    def rename_shot(self, old_name, new_name):
+        self._execute('UPDATE OR REPLACE prompts SET shot = ? WHERE shot = ?', (new_name, old_name))
+
+    def delete_shot(self, shot_name):
+        self._execute('DELETE FROM prompts WHERE shot = ?', (shot_name,))
@@ -1,11 +1,15 @@
-import filecmp
+import os
 import re
 import shutil
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
-from ..utils import create_image_thumbnail
+from .event_bus import publish_event
+from .materialize import detect_strategy, materialize
+from .version_manifest import VersionManifest, manifest_dir, resolve_active_version
+from .thumbnail_queue import THUMBNAIL_QUEUE, queue_thumbnail
+from ..utils import make_etag
 from ..config.constants import THUMBNAIL_CACHE_DIR, ALLOWED_IMAGE_EXTENSIONS
 
 logger = logging.getLogger(__name__)
@@ -14,6 +18,42 @@ THUMBNAIL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 VERSION_RE = re.compile(r'_v(\d{3})')
 
+# Manifest key under which reference image markers are stored.
+REF_MANIFEST_KEY = 'ref-images'
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return '-'
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def reference_listing_etag(project_path) -> str:
+    """Return an ETag for the reference listing without building it.
+
+    Hashes the latest files' sizes and mtimes (files can be overwritten in
+    place without touching the directory), the WIP folder, the version
+    manifest and the thumbnail cache, which together determine every field
+    of :meth:`ReferenceManager.get_reference_images`.  The ``ref-images``
+    folder itself is included so that loose files dropped into it are
+    migrated by the next listing instead of being answered with a 304.
+    """
+    project_path = Path(project_path)
+    ref_images_dir = project_path / "ref-images"
+    parts = [project_path, _stat_key(ref_images_dir)]
+    try:
+        with os.scandir(ref_images_dir / "latest") as it:
+            for entry in sorted(it, key=lambda e: e.name):
+                parts.append(f"{entry.name}={_stat_key(entry.path)}")
+    except OSError:
+        parts.append('-')
+    parts.append(_stat_key(ref_images_dir / "wip"))
+    parts.append(_stat_key(manifest_dir(project_path) / f"{REF_MANIFEST_KEY}.json"))
+    parts.append(_stat_key(THUMBNAIL_CACHE_DIR))
+    return make_etag(*parts)
+
 
 class ReferenceManager:
     """Manages reference images for a project."""
@@ -25,6 +65,8 @@ class ReferenceManager:
         self.ref_wip_dir = self.ref_images_dir / "wip"
         self._ensure_ref_images_dir()
         self._migrate_flat_to_versioned()
+        self._manifest = VersionManifest(self.project_path, REF_MANIFEST_KEY)
+        detect_strategy(self.ref_wip_dir, self.ref_latest_dir)
 
     def _ensure_ref_images_dir(self):
         """Create ref-images directory structure if it doesn't exist."""
@@ -66,8 +108,8 @@ class ReferenceManager:
                     versions.append(int(m.group(1)))
         return versions
 
-    def _build_version_index(self) -> Dict[str, List[int]]:
-        """Scan WIP directory once and return {base_stem: [version_numbers]}."""
+    def _build_version_index(self) -> Dict[str, Dict[int, Path]]:
+        """Scan WIP directory once and return {base_stem: {version: path}}."""
         index = {}
         for f in self.ref_wip_dir.iterdir():
             if not f.is_file():
@@ -75,17 +117,28 @@ class ReferenceManager:
             m = VERSION_RE.search(f.stem)
             if m:
                 base = self._strip_version_suffix(f.stem)
-                index.setdefault(base, []).append(int(m.group(1)))
+                index.setdefault(base, {})[int(m.group(1))] = f
         return index
 
     def _get_active_version(self, latest_file: Path, base_stem: str,
-                            versions: List[int]) -> int:
-        """Determine which WIP version matches the latest file."""
-        for v in sorted(versions, reverse=True):
-            wip_file = self.find_wip_version_file(base_stem, v)
-            if wip_file and filecmp.cmp(str(latest_file), str(wip_file), shallow=True):
-                return v
-        return max(versions) if versions else 0
+                            versions: Dict[int, Path]) -> int:
+        """Determine which WIP version the latest file was copied from."""
+        if not versions:
+            return 0
+        active, rebuilt = resolve_active_version(
+            latest_file, versions, self._manifest.get_latest(base_stem))
+        if rebuilt:
+            self._manifest.put_latest(base_stem, rebuilt)
+        return active
+
+    def _record_latest(self, base_stem: str, version: int, latest_path: Path,
+                       source_path: Path):
+        """Record which WIP version was just copied into latest/."""
+        versions = self._collect_versions(base_stem)
+        with self._manifest.locked():
+            self._manifest.set_latest(base_stem, version, latest_path, source_path,
+                                      max_version=max(versions) if versions else version)
+            self._manifest.save()
 
     def find_wip_version_file(self, base_stem: str, version: int) -> Optional[Path]:
         """Find the WIP file for a specific version of a reference image."""
@@ -102,9 +155,13 @@ class ReferenceManager:
                 f.unlink()
 
     def _thumbnail_url(self, filename: str) -> Optional[str]:
-        """Return the thumbnail URL for a reference image, or None."""
+        """Return the thumbnail URL for a reference image, or None.
+
+        Queued thumbnails already have a URL; the thumbnail route waits for
+        them.
+        """
         thumb_path = self._get_thumbnail_path(filename)
-        if thumb_path and thumb_path.exists():
+        if thumb_path.exists() or THUMBNAIL_QUEUE.is_pending(thumb_path.name):
             return f"/api/reference/thumbnail/{thumb_path.name}"
         return None
 
@@ -116,22 +173,25 @@ class ReferenceManager:
 
         version_index = self._build_version_index()
 
-        for img_path in sorted(self.ref_latest_dir.iterdir()):
-            if img_path.is_file() and img_path.suffix.lower() in ALLOWED_IMAGE_EXTENSIONS:
-                base_stem = img_path.stem
-                versions = version_index.get(base_stem, [])
-                max_version = max(versions) if versions else 0
-                active_version = self._get_active_version(
-                    img_path, base_stem, versions)
-
-                images.append({
-                    'filename': img_path.name,
-                    'path': str(img_path.relative_to(self.project_path)),
-                    'thumbnail': self._thumbnail_url(img_path.name),
-                    'version': max_version,
-                    'active_version': active_version,
-                })
-
+        with self._manifest.locked():
+            for img_path in sorted(self.ref_latest_dir.iterdir()):
+                if img_path.is_file() and img_path.suffix.lower() in ALLOWED_IMAGE_EXTENSIONS:
+                    base_stem = img_path.stem
+                    versions = version_index.get(base_stem, {})
+                    max_version = max(versions) if versions else 0
+                    active_version = self._get_active_version(
+                        img_path, base_stem, versions)
+
+                    images.append({
+                        'filename': img_path.name,
+                        'path': str(img_path.relative_to(self.project_path)),
+                        'thumbnail': self._thumbnail_url(img_path.name),
+                        'version': max_version,
+                        'active_version': active_version,
+                    })
+
+            if self._manifest.dirty:
+                self._manifest.save()
         return images
 
     def save_reference_image(self, file, filename: str) -> Dict:
@@ -152,9 +212,12 @@ class ReferenceManager:
         self._remove_latest_by_stem(base_stem)
         latest_filename = f"{base_stem}{file_ext}"
         latest_path = self.ref_latest_dir / latest_filename
-        shutil.copy2(str(wip_path), str(latest_path))
+        materialize(wip_path, latest_path)
+        self._record_latest(base_stem, version, latest_path, wip_path)
 
-        self._create_thumbnail(str(latest_path), latest_filename)
+        self._queue_thumbnail(str(latest_path), latest_filename)
+        publish_event(self.project_path, 'reference', action='versioned',
+                      filename=latest_filename, version=version)
 
         return {
             'filename': latest_filename,
@@ -174,13 +237,16 @@ class ReferenceManager:
         self._remove_latest_by_stem(base_stem)
         latest_filename = f"{base_stem}{wip_file.suffix}"
         latest_path = self.ref_latest_dir / latest_filename
-        shutil.copy2(str(wip_file), str(latest_path))
+        materialize(wip_file, latest_path)
+        self._record_latest(base_stem, version, latest_path, wip_file)
 
         # Regenerate thumbnail (old one may have different extension)
         old_thumb = self._get_thumbnail_path(filename)
         if old_thumb.exists():
             old_thumb.unlink()
-        self._create_thumbnail(str(latest_path), latest_filename)
+        self._queue_thumbnail(str(latest_path), latest_filename)
+        publish_event(self.project_path, 'reference', action='restored',
+                      filename=latest_filename, version=version)
 
         return {
             'filename': latest_filename,
@@ -194,13 +260,11 @@ class ReferenceManager:
         thumb_filename = f"{project_name}_ref_{file_stem}_thumb.jpg"
         return THUMBNAIL_CACHE_DIR / thumb_filename
 
-    def _create_thumbnail(self, image_path: str, filename: str):
-        """Create thumbnail for reference image and save it to the central cache."""
-        project_name = self.project_path.name
-        file_stem = Path(filename).stem
-        thumb_filename = f"{project_name}_ref_{file_stem}_thumb.jpg"
-        thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-        return create_image_thumbnail(image_path, thumb_path)
+    def _queue_thumbnail(self, image_path: str, filename: str):
+        """Queue the thumbnail of a reference image for background rendering."""
+        thumb_filename = self._get_thumbnail_path(filename).name
+        return queue_thumbnail(self.project_path, image_path, thumb_filename,
+                               url=f"/api/reference/thumbnail/{thumb_filename}", force=True)
 
     def rename_reference_image(self, old_name: str, new_name: str) -> Dict:
         """Rename a reference image and all its versions."""
@@ -225,12 +289,16 @@ class ReferenceManager:
         if old_ext not in ALLOWED_IMAGE_EXTENSIONS:
             raise ValueError(f"Invalid file extension. Allowed: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}")
 
-        old_thumb_path = self._get_thumbnail_path(old_name)
-        if old_thumb_path.exists():
-            old_thumb_path.unlink()
-
         old_path.rename(new_path)
 
+        with self._manifest.locked():
+            entry = self._manifest.get_latest(old_stem)
+            if entry:
+                self._manifest.drop_latest(old_stem)
+                entry['file'] = new_name
+                self._manifest.put_latest(new_stem, entry)
+                self._manifest.save()
+
         for f in list(self.ref_wip_dir.iterdir()):
             if not f.is_file():
                 continue
@@ -243,7 +311,17 @@ class ReferenceManager:
                     except OSError as e:
                         logger.error("Failed to rename WIP file %s: %s", f.name, e)
 
-        self._create_thumbnail(str(new_path), new_name)
+        # The image itself is unchanged, so keep its thumbnail under the new
+        # name rather than decoding it again.
+        old_thumb_path = self._get_thumbnail_path(old_name)
+        new_thumb_path = self._get_thumbnail_path(new_name)
+        try:
+            if old_thumb_path != new_thumb_path:
+                old_thumb_path.rename(new_thumb_path)
+        except OSError:
+            self._queue_thumbnail(str(new_path), new_name)
+        publish_event(self.project_path, 'reference', action='renamed',
+                      filename=new_name, old_filename=old_name)
 
         return {
             'filename': new_name,
@@ -271,6 +349,11 @@ class ReferenceManager:
 
         file_path.unlink()
 
+        with self._manifest.locked():
+            self._manifest.drop_latest(base_stem)
+            if self._manifest.dirty:
+                self._manifest.save()
+
         for f in list(self.ref_wip_dir.iterdir()):
             if not f.is_file():
                 continue
@@ -280,4 +363,5 @@ class ReferenceManager:
                 except OSError as e:
                     logger.error("Failed to delete WIP file %s: %s", f.name, e)
 
+        publish_event(self.project_path, 'reference', action='deleted', filename=filename)
         return True
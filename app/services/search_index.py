@@ -0,0 +1,239 @@
+"""Full-text search over shot names, notes, prompts and artists.
+
+The index lives in ``<project>/.shotbuddy/search.sqlite`` as an SQLite FTS5
+table with one document per shot.  ShotManager rewrites a shot's document
+whenever the shot changes, so searching never has to read ``notes.txt``
+or prompt files.  Like the shot index it is derived data: deleting the
+file is safe and it is rebuilt on the next search.
+"""
+
+from html import escape
+from pathlib import Path
+import logging
+import re
+import sqlite3
+import threading
+
+from .shot_index import INDEX_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_FILENAME = 'search.sqlite'
+
+# Bump when the table layout changes; older indexes are dropped and rebuilt.
+SCHEMA_VERSION = 1
+
+# bm25 weights for the name, artist, notes and prompts columns.
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Snippet markers; replaced by <mark> after the snippet is HTML-escaped.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    shot TEXT NOT NULL UNIQUE,
+    stamp TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS shot_text USING fts5(
+    name, artist, notes, prompts,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query matching every word as a prefix.
+
+    Returns ``None`` when ``text`` contains no searchable words.  Words are
+    quoted so FTS5 operators typed by the user are matched literally.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(snippet):
+    return (escape(snippet)
+            .replace(_MARK_START, '<mark>')
+            .replace(_MARK_END, '</mark>'))
+
+
+class SearchIndex:
+    """FTS5 documents keyed by shot name.
+
+    Each document carries a *stamp* chosen by the caller (notes mtime and
+    prompt stamp) so an out-of-date document can be detected without
+    re-reading it.  Failures are logged and swallowed; an unavailable index
+    returns no results.
+    """
+
+    def __init__(self, project_path):
+        self.db_path = Path(project_path) / INDEX_DIRNAME / SEARCH_INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._conn = None
+        self._disabled = False
+
+    def _connect(self):
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                conn.executescript('DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS shot_text;')
+                conn.executescript(_SCHEMA)
+                conn.execute('DELETE FROM meta')
+                conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)",
+                             (str(SCHEMA_VERSION),))
+                conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error) as e:
+            # Also covers SQLite builds without FTS5.
+            logger.warning("Search index unavailable at %s: %s", self.db_path, e)
+            self._disabled = True
+        return self._conn
+
+    @property
+    def available(self):
+        with self._lock:
+            return self._connect() is not None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_meta(self, key):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Search index read failed: %s", e)
+                return None
+            return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                 (key, value))
+            except sqlite3.Error as e:
+                logger.warning("Search index write failed: %s", e)
+
+    def stamps(self):
+        """Return ``{shot_name: stamp}`` for every indexed shot."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            try:
+                return dict(conn.execute('SELECT shot, stamp FROM docs').fetchall())
+            except sqlite3.Error as e:
+                logger.warning("Search index read failed: %s", e)
+                return {}
+
+    def put(self, shot_name, stamp, artist, notes, prompts):
+        """Insert or replace the document of one shot."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    row = conn.execute('SELECT id FROM docs WHERE shot = ?', (shot_name,)).fetchone()
+                    if row is None:
+                        doc_id = conn.execute('INSERT INTO docs (shot, stamp) VALUES (?, ?)',
+                                              (shot_name, stamp)).lastrowid
+                    else:
+                        doc_id = row[0]
+                        conn.execute('UPDATE docs SET stamp = ? WHERE id = ?', (stamp, doc_id))
+                        conn.execute('DELETE FROM shot_text WHERE rowid = ?', (doc_id,))
+                    conn.execute(
+                        'INSERT INTO shot_text (rowid, name, artist, notes, prompts) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (doc_id, shot_name, artist, notes, prompts))
+            except sqlite3.Error as e:
+                logger.warning("Search index write failed: %s", e)
+
+    def delete(self, shot_name):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    row = conn.execute('SELECT id FROM docs WHERE shot = ?', (shot_name,)).fetchone()
+                    if row is not None:
+                        conn.execute('DELETE FROM shot_text WHERE rowid = ?', (row[0],))
+                        conn.execute('DELETE FROM docs WHERE id = ?', (row[0],))
+            except sqlite3.Error as e:
+                logger.warning("Search index write failed: %s", e)
+
+    def set_artists(self, artists):
+        """Update the artist column of every document from ``{shot: name}``."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    rows = conn.execute(
+                        'SELECT docs.id, docs.shot, shot_text.artist FROM docs '
+                        'JOIN shot_text ON shot_text.rowid = docs.id').fetchall()
+                    for doc_id, shot_name, current in rows:
+                        artist = artists.get(shot_name, '')
+                        if artist != current:
+                            conn.execute('UPDATE shot_text SET artist = ? WHERE rowid = ?',
+                                         (artist, doc_id))
+            except sqlite3.Error as e:
+                logger.warning("Search index write failed: %s", e)
+
+    def search(self, text, limit=50):
+        """Return ranked matches for free ``text``.
+
+        Returns:
+            list of ``{'name', 'snippet', 'score'}``; ``snippet`` is HTML
+            with matches wrapped in ``<mark>``.  Higher scores rank better.
+        """
+        query = build_match_query(text)
+        if query is None:
+            return []
+        weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+        sql = (
+            f'SELECT docs.shot, bm25(shot_text, {weights}) AS rank, '
+            f"snippet(shot_text, -1, '{_MARK_START}', '{_MARK_END}', '…', 12) "
+            'FROM shot_text JOIN docs ON docs.id = shot_text.rowid '
+            'WHERE shot_text MATCH ? ORDER BY rank LIMIT ?'
+        )
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return []
+            try:
+                rows = conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Search failed for %r: %s", text, e)
+                return []
+        return [{'name': shot_name, 'snippet': _highlight(snippet), 'score': round(-rank, 4)}
+                for shot_name, rank, snippet in rows]
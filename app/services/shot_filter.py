@@ -0,0 +1,129 @@
+"""Server-side shot filters.
+
+ShotManager keeps a small dict of *facts* per shot (asset presence,
+version counts, prompt coverage, notes, artist) derived from the shot's
+index record.  Filters are evaluated against those facts, so answering a
+query never builds the full ``/api/shots`` payload.
+
+Query parameters understood by :func:`parse_filters`:
+
+``image``, ``video``, ``lipsync``, ``notes``
+    ``1`` to require the asset (or non-empty notes), ``0`` to require its
+    absence.
+``artist``
+    Artist name or id (case-insensitive); an empty value matches shots
+    without an artist.
+``versions_gt``
+    Keep shots with more than N versions of ``versions_asset``
+    (``image``, ``video`` or ``any``; default ``any``).
+``prompt_missing``
+    ``image``, ``video`` or ``any``: the active version of that asset
+    exists but has no prompt.
+"""
+
+from ..config.constants import AssetType
+
+LIPSYNC_PARTS = (AssetType.DRIVER, AssetType.TARGET, AssetType.RESULT)
+
+PRESENCE_KEYS = ('image', 'video', 'lipsync', 'notes')
+ASSET_CHOICES = ('image', 'video', 'any')
+
+_TRUE = ('1', 'true', 'yes')
+_FALSE = ('0', 'false', 'no')
+
+
+def shot_facts(record, artist=None):
+    """Return the filterable facts of one shot index record."""
+    assets = record.get('assets', {})
+
+    def entry(slot):
+        return assets.get(slot) or {}
+
+    def prompt_missing(slot):
+        e = entry(slot)
+        return bool(e.get('active_version')) and not e.get('has_prompt')
+
+    return {
+        'image': bool(entry(AssetType.IMAGE).get('file')),
+        'video': bool(entry(AssetType.VIDEO).get('file')),
+        'lipsync': bool(record.get('custom_files'))
+        or any(entry(part).get('file') for part in LIPSYNC_PARTS),
+        'notes': bool(record.get('notes', '').strip()),
+        'artist': artist,
+        'versions': {
+            'image': entry(AssetType.IMAGE).get('version_count', 0),
+            'video': entry(AssetType.VIDEO).get('version_count', 0),
+        },
+        'prompt_missing': {
+            'image': prompt_missing(AssetType.IMAGE),
+            'video': prompt_missing(AssetType.VIDEO),
+        },
+    }
+
+
+def _parse_bool(key, value):
+    value = value.strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"Invalid value for {key}: expected 1 or 0")
+
+
+def _parse_asset(key, value):
+    value = value.strip().lower() or 'any'
+    if value not in ASSET_CHOICES:
+        raise ValueError(f"Invalid value for {key}: expected image, video or any")
+    return value
+
+
+def parse_filters(args):
+    """Validate filter query parameters into a filter dict.
+
+    Raises:
+        ValueError: If a parameter has an invalid value.
+    """
+    filters = {}
+    for key in PRESENCE_KEYS:
+        if key in args:
+            filters[key] = _parse_bool(key, args[key])
+    if 'artist' in args:
+        filters['artist'] = args['artist'].strip().lower()
+    if 'versions_gt' in args:
+        try:
+            filters['versions_gt'] = int(args['versions_gt'])
+        except ValueError:
+            raise ValueError("Invalid value for versions_gt: expected an integer")
+        filters['versions_asset'] = _parse_asset('versions_asset', args.get('versions_asset', 'any'))
+    if 'prompt_missing' in args:
+        filters['prompt_missing'] = _parse_asset('prompt_missing', args['prompt_missing'])
+    return filters
+
+
+def _any_or(values, asset):
+    return any(values.values()) if asset == 'any' else values[asset]
+
+
+def matches(facts, filters):
+    """Return True if a shot's facts satisfy every filter."""
+    for key in PRESENCE_KEYS:
+        if key in filters and facts[key] != filters[key]:
+            return False
+    if 'artist' in filters:
+        artist = facts['artist']
+        wanted = filters['artist']
+        if not wanted:
+            if artist:
+                return False
+        elif not artist or wanted not in (artist['id'].lower(), artist['name'].lower()):
+            return False
+    if 'versions_gt' in filters:
+        counts = facts['versions']
+        asset = filters['versions_asset']
+        count = max(counts.values()) if asset == 'any' else counts[asset]
+        if count <= filters['versions_gt']:
+            return False
+    if 'prompt_missing' in filters:
+        if not _any_or(facts['prompt_missing'], filters['prompt_missing']):
+            return False
+    return True
@@ -0,0 +1,238 @@
+"""Persistent per-project cache of shot metadata.
+
+The index lives in ``<project>/.shotbuddy/index.sqlite`` and holds one row
+per shot (directory signature and notes) plus one row per asset slot
+(latest file, versions, prompt presence and thumbnail key).  It is purely a cache:
+deleting the file is always safe and it is rebuilt on the next listing.
+"""
+
+from pathlib import Path
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = '.shotbuddy'
+INDEX_FILENAME = 'index.sqlite'
+
+# Bump when the table layout changes; older indexes are dropped and rebuilt.
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS shots (
+    name TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS assets (
+    shot TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    file TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    version_count INTEGER NOT NULL DEFAULT 0,
+    active_version INTEGER NOT NULL DEFAULT 0,
+    has_prompt INTEGER NOT NULL DEFAULT 0,
+    thumb_key TEXT,
+    PRIMARY KEY (shot, slot)
+);
+"""
+
+_ASSET_FIELDS = ('file', 'version', 'version_count', 'active_version', 'has_prompt', 'thumb_key')
+
+
+class ShotIndex:
+    """SQLite-backed store of shot records keyed by shot name.
+
+    A *record* is the plain metadata dict produced by
+    ``ShotManager._collect_shot_record``::
+
+        {'notes': str,
+         'assets': {slot: {'file', 'version', 'version_count',
+                           'active_version', 'has_prompt', 'thumb_key'}},
+         'custom_files': [{'file', 'thumb_key'}, ...]}
+
+    All failures are logged and swallowed so a read-only or locked project
+    share degrades to uncached listings instead of breaking them.
+    """
+
+    def __init__(self, project_path):
+        self.db_path = Path(project_path) / INDEX_DIRNAME / INDEX_FILENAME
+        self._lock = threading.RLock()
+        self._conn = None
+        self._disabled = False
+
+    def _connect(self):
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION):
+                conn.executescript('DROP TABLE IF EXISTS shots; DROP TABLE IF EXISTS assets;')
+                conn.executescript(_SCHEMA)
+                conn.execute('DELETE FROM meta')
+                conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)",
+                             (str(SCHEMA_VERSION),))
+                conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning("Shot index unavailable at %s: %s", self.db_path, e)
+            self._disabled = True
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_meta(self, key):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Shot index read failed: %s", e)
+                return None
+            return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                             (key, value))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Shot index write failed: %s", e)
+
+    def load_all(self):
+        """Return ``{name: (signature, record)}`` for every indexed shot."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            try:
+                shots = conn.execute('SELECT name, signature, notes FROM shots').fetchall()
+                assets = conn.execute(
+                    'SELECT shot, slot, file, version, version_count, active_version, has_prompt, '
+                    'thumb_key '
+                    'FROM assets ORDER BY shot, position'
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Shot index read failed: %s", e)
+                return {}
+
+        result = {}
+        for name, signature, notes in shots:
+            result[name] = (signature, {'notes': notes, 'assets': {}, 'custom_files': []})
+        for shot, slot, *values in assets:
+            if shot not in result:
+                continue
+            record = result[shot][1]
+            entry = dict(zip(_ASSET_FIELDS, values))
+            if slot.startswith('custom/'):
+                record['custom_files'].append(
+                    {'file': entry['file'], 'thumb_key': entry['thumb_key']})
+            else:
+                entry['has_prompt'] = bool(entry['has_prompt'])
+                record['assets'][slot] = entry
+        return result
+
+    def get(self, name):
+        """Return ``(signature, record)`` for one shot or ``None``."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute('SELECT signature, notes FROM shots WHERE name = ?',
+                                   (name,)).fetchone()
+                if row is None:
+                    return None
+                assets = conn.execute(
+                    'SELECT slot, file, version, version_count, active_version, has_prompt, '
+                    'thumb_key '
+                    'FROM assets WHERE shot = ? ORDER BY position', (name,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Shot index read failed: %s", e)
+                return None
+
+        record = {'notes': row[1], 'assets': {}, 'custom_files': []}
+        for slot, *values in assets:
+            entry = dict(zip(_ASSET_FIELDS, values))
+            if slot.startswith('custom/'):
+                record['custom_files'].append(
+                    {'file': entry['file'], 'thumb_key': entry['thumb_key']})
+            else:
+                entry['has_prompt'] = bool(entry['has_prompt'])
+                record['assets'][slot] = entry
+        return row[0], record
+
+    def put_many(self, items):
+        """Store ``(name, signature, record)`` tuples in one transaction."""
+        items = list(items)
+        if not items:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    for name, signature, record in items:
+                        self._write(conn, name, signature, record)
+            except sqlite3.Error as e:
+                logger.warning("Shot index write failed: %s", e)
+
+    def put(self, name, signature, record):
+        self.put_many([(name, signature, record)])
+
+    @staticmethod
+    def _write(conn, name, signature, record):
+        conn.execute('INSERT OR REPLACE INTO shots (name, signature, notes) VALUES (?, ?, ?)',
+                     (name, signature, record.get('notes', '')))
+        conn.execute('DELETE FROM assets WHERE shot = ?', (name,))
+        rows = []
+        for slot, entry in record.get('assets', {}).items():
+            rows.append((name, slot, 0, entry.get('file'), entry.get('version', 0),
+                         entry.get('version_count', 0), entry.get('active_version', 0),
+                         int(bool(entry.get('has_prompt'))), entry.get('thumb_key')))
+        for position, custom in enumerate(record.get('custom_files', [])):
+            rows.append((name, f"custom/{position:04d}", position, custom.get('file'), 0, 0, 0,
+                         0, custom.get('thumb_key')))
+        conn.executemany(
+            'INSERT INTO assets (shot, slot, position, file, version, version_count, '
+            'active_version, has_prompt, thumb_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def delete_many(self, names):
+        names = list(names)
+        if not names:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.executemany('DELETE FROM shots WHERE name = ?', [(n,) for n in names])
+                    conn.executemany('DELETE FROM assets WHERE shot = ?', [(n,) for n in names])
+            except sqlite3.Error as e:
+                logger.warning("Shot index write failed: %s", e)
+
+    def delete(self, name):
+        self.delete_many([name])
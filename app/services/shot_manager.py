@@ -1,13 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import filecmp
+import json
 import logging
+import os
 import re
-
-from ..utils import create_image_thumbnail, create_video_thumbnail, ProjectPaths
+import threading
+import time
+
+from .asset_scanner import LatestFolder, ShotScan, scan_latest_folders
+from .change_log import ADDED, MODIFIED, REMOVED, ChangeLog
+from .event_bus import publish_event
+from .job_queue import JobQueue
+from .latest_sync import LatestSyncTask, RehashQueue, SyncJournal
+from .materialize import detect_strategy, materialize
+from .prompt_store import PromptStore
+from .search_index import SearchIndex
+from .shot_filter import matches, shot_facts
+from .shot_index import ShotIndex
+from .shot_registry import ShotRegistry
+from .thumbnail_queue import THUMBNAIL_QUEUE, queue_thumbnail, thumbnail_url
+from .version_manifest import (
+    VersionManifest,
+    content_digest,
+    entry_matches,
+    resolve_active_version,
+)
+from .watcher import ShotWatcher
+from ..utils import make_etag, ProjectPaths
+from ..config.app_config import config_bool, config_float, config_int, config_str
 from ..config.constants import (
     ALLOWED_AUDIO_EXTENSIONS,
     ALLOWED_IMAGE_EXTENSIONS,
-    ALLOWED_LIPSYNC_EXTENSIONS,
     ALLOWED_VIDEO_EXTENSIONS,
     THUMBNAIL_CACHE_DIR,
     AssetType,
@@ -26,6 +49,30 @@ SHOT_NUMBER_INCREMENT = 10  # Shots are numbered in increments of 10 (SH010, SH0
 INITIAL_SHOT_NUMBER = 10    # First shot starts at SH010
 INITIAL_SUBSHOT_NUMBER = 50 # Sub-shots start at _050 (e.g., SH010_050)
 
+# Threads used to stat and scan shot folders during cold listings; see the
+# [listing] section of shotbuddy.cfg.
+DEFAULT_LISTING_WORKERS = 8
+
+# How sync decides a latest file is current: 'digest' compares content
+# digests recorded at ingest, 'size' only compares file sizes.  See the
+# [sync] section of shotbuddy.cfg.
+DEFAULT_SYNC_VERIFY = 'digest'
+
+# Read speed cap of the background rehash in MB/s (0 = unlimited).
+DEFAULT_REHASH_RATE = 64.0
+
+# Seconds during which the watcher ignores a path the app itself wrote,
+# as long as the path still looks the way the app left it.
+OWN_WRITE_TTL = 30.0
+
+# Shared project data (artists and their shot assignments).
+SHARED_PROJECT_FILENAME = '.shotbuddy_project.json'
+
+# Serializes construction of cached managers: a manager starts a watcher
+# and background workers, so a second one for the same project must not
+# be built by a concurrent first request.
+_manager_cache_lock = threading.RLock()
+
 
 def validate_shot_name(name):
     if not SHOT_NAME_RE.match(name):
@@ -59,6 +106,46 @@ class ShotManager:
         self.latest_images_dir = self._paths.latest_images_dir
         self.latest_videos_dir = self._paths.latest_videos_dir
         self.legacy_dir = self.project_path / '_legacy'
+        self._index = ShotIndex(self.project_path)
+        self._registry = ShotRegistry(self.wip_dir)
+        self._changes = ChangeLog(self._index, listener=self._on_change)
+        self.listing_workers = max(1, config_int('listing', 'workers', DEFAULT_LISTING_WORKERS))
+        # In-memory memo in front of the index:
+        # {shot_name: (shot_signature, latest_signature, record)}
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._memo_hits = 0
+        self._memo_misses = 0
+        self._prompts = PromptStore(self.project_path)
+        self.export_prompt_txt = config_bool('prompts', 'export_txt', False)
+        self._migrate_prompt_files()
+        self._search = SearchIndex(self.project_path)
+        self._search_lock = threading.Lock()
+        self._search_synced = False
+        self._search_artists_mtime = None
+        self._artists = (None, {})
+        # Filterable facts per shot, see shot_filter.shot_facts().
+        self._facts = {}
+        self._facts_lock = threading.Lock()
+        self._sync_journal = SyncJournal(self.project_path)
+        self._sync_run_lock = threading.Lock()
+        self._sync_task = LatestSyncTask(self.sync_latest_folders, publish=self._publish_sync)
+        self.verify_digests = config_str('sync', 'verify', DEFAULT_SYNC_VERIFY).strip().lower() == 'digest'
+        self.rehash_rate = max(0.0, config_float('sync', 'rehash_rate', DEFAULT_REHASH_RATE)) * (1 << 20)
+        self._rehash = RehashQueue(self._rehash_shot)
+        # Post-upload work; see job_queue.py.
+        self.jobs = JobQueue(self.project_path, {
+            'latest': self._job_latest,
+            'prompt': self._job_prompt,
+            'thumbnail': self._job_thumbnail,
+            'probe': self._job_probe,
+        }, publish=self._publish_job)
+        self._started = False
+        self._watcher = None
+        # {path: (stat key, time)} of files the app wrote or removed itself;
+        # see note_write().
+        self._own_writes = {}
+        self._own_writes_lock = threading.Lock()
 
     @staticmethod
     def _normalize_path(path):
@@ -165,6 +252,21 @@ class ShotManager:
             logger.info(f"  Renaming thumbnail {thumb.name} -> {new_name_file}")
             thumb.rename(THUMBNAIL_CACHE_DIR / new_name_file)
 
+    def _rename_manifest(self, old_name, new_name):
+        """Move a shot's manifest and point its markers at the renamed files."""
+        manifest = self._manifest(old_name)
+        with manifest.locked():
+            manifest.rename(new_name)
+        with manifest.locked():
+            data = manifest.load()
+            entries = list(data['latest'].values())
+            for versions in data['versions'].values():
+                entries.extend(versions.values())
+            for entry in entries:
+                entry['file'] = entry.get('file', '').replace(old_name, new_name, 1)
+            if entries:
+                manifest.save()
+
     def rename_shot(self, old_name, new_name):
         """Rename a shot and all associated files."""
         validate_shot_name(old_name)
@@ -181,6 +283,7 @@ class ShotManager:
 
         # Rename the shot folder
         old_dir.rename(new_dir)
+        self._registry.rename(old_name, new_name)
 
         # Rename files in each subdirectory
         self._rename_versioned_files(new_dir / "images", old_name, new_name, "_image_prompt.txt")
@@ -191,6 +294,11 @@ class ShotManager:
         self._rename_latest_files(old_name, new_name)
         self._rename_thumbnails(old_name, new_name)
 
+        self._rename_manifest(old_name, new_name)
+        self._prompts.rename_shot(old_name, new_name)
+        self.invalidate_shot(old_name, kind=REMOVED, detail={'renamed_to': new_name})
+        self.refresh_shot(new_name, kind=ADDED, detail={'renamed_from': old_name})
+
         logger.info(f"Successfully renamed shot from {old_name} to {new_name}")
         return self.get_shot_info(new_name)
 
@@ -213,6 +321,10 @@ class ShotManager:
 
         # Remove the shot folder
         shutil.rmtree(shot_dir)
+        self._registry.remove(shot_name)
+        self._manifest(shot_name).delete()
+        self._prompts.delete_shot(shot_name)
+        self.invalidate_shot(shot_name, kind=REMOVED)
 
         # Clean up any thumbnails
         project_name = self.project_path.name
@@ -226,7 +338,10 @@ class ShotManager:
         """Create folder structure for a shot."""
         validate_shot_name(shot_name)
         shot_dir = self.wip_dir / shot_name
+        created = not shot_dir.exists()
         shot_dir.mkdir(parents=True, exist_ok=True)
+        if created:
+            self._registry.add(shot_name)
 
         # Create subfolders
         (shot_dir / 'images').mkdir(exist_ok=True)
@@ -235,35 +350,59 @@ class ShotManager:
 
         self.latest_images_dir.mkdir(parents=True, exist_ok=True)
         self.latest_videos_dir.mkdir(parents=True, exist_ok=True)
+        self.note_write(*(shot_dir / sub for sub in ('images', 'videos', 'lipsync')))
 
+        if created:
+            self._changes.record(shot_name, ADDED, {'action': 'created'})
         return shot_dir
 
     def get_next_shot_number(self):
         """Get next available shot number."""
-        existing_shots = []
-        if self.wip_dir.exists():
-            for shot_dir in self.wip_dir.iterdir():
-                if shot_dir.is_dir() and shot_dir.name.startswith('SH'):
-                    try:
-                        existing_shots.append(int(shot_dir.name[2:]))
-                    except ValueError:
-                        continue
-
-        next_num = (max(existing_shots) + SHOT_NUMBER_INCREMENT) if existing_shots else INITIAL_SHOT_NUMBER
+        last_number = self._registry.last_number()
+        next_num = (last_number + SHOT_NUMBER_INCREMENT) if last_number is not None else INITIAL_SHOT_NUMBER
         if next_num > 999:
             raise ValueError("Cannot create more shots: shot number would exceed 999. Consider splitting your project into individual sequences.")
         return next_num
 
-    def get_shots(self, generate=True):
-        """Get all shots in the project."""
-        if not self.wip_dir.exists():
-            return []
+    def _shot_names(self):
+        """Return the sorted names of the shot folders in WIP."""
+        return self._registry.names()
 
-        shots = []
-        for shot_dir in sorted(self.wip_dir.iterdir()):
-            if shot_dir.is_dir() and shot_dir.name.startswith('SH'):
-                shots.append(self.get_shot_info(shot_dir.name, generate=generate))
-        return shots
+    def listing_etag(self):
+        """Return an ETag for :meth:`get_shots` without building the listing.
+
+        While the watcher runs, the change token covers edits inside shot
+        folders.  Without it each shot's signature is hashed in as well,
+        which costs a few ``stat`` calls per shot but no directory scans.
+        """
+        parts = [
+            self.project_path,
+            self._changes.token,
+            self._mtime_ns(self.wip_dir),
+            self._latest_signature(),
+            self._mtime_ns(THUMBNAIL_CACHE_DIR),
+        ]
+        if self._watcher is None or not self._watcher.running:
+            parts.extend(self._shot_signature(name) for name in self._shot_names())
+        return make_etag(*parts)
+
+    def get_shots(self, generate=False, names=None):
+        """Get all shots in the project, or only ``names`` in that order.
+
+        With ``generate`` missing thumbnails are queued; see
+        :meth:`_resolve_thumbnail`.
+        """
+        if names is None:
+            names = self._shot_names()
+        for name in names:
+            validate_shot_name(name)
+
+        records = self._load_records(names)
+        existing = self._existing_thumbnails()
+        return [
+            self._build_shot_info(name, records[name], generate=generate, existing=existing)
+            for name in names
+        ]
 
     def create_shot_between(self, after_shot=None):
         """Create a new shot between existing shots.
@@ -283,19 +422,18 @@ class ShotManager:
         if after_shot:
             validate_shot_name(after_shot)
 
-        existing = [s["name"] for s in self.get_shots()]
+        registry = self._registry
 
         if not after_shot:
             # Insert before the first shot using the original numeric scheme
-            if not existing:
+            first_number = registry.first_number()
+            if first_number is None:
                 new_number = INITIAL_SHOT_NUMBER
             else:
-                first_number = min(int(s[2:]) for s in existing)
                 candidate = max(first_number // 2, 1)
-                existing_numbers = {int(s[2:]) for s in existing}
-                while candidate in existing_numbers and candidate > 1:
+                while registry.has_number(candidate) and candidate > 1:
                     candidate -= 1
-                if candidate in existing_numbers:
+                if registry.has_number(candidate):
                     raise ValueError("No available shot numbers before first shot")
                 new_number = candidate
             shot_name = f"SH{new_number:03d}"
@@ -304,32 +442,29 @@ class ShotManager:
 
             if '_' in after_shot:
                 # After a sub-shot: simply append a new sub-shot for the same base
-                shot_name = self._create_subshot_name(base_shot, existing)
+                shot_name = self._create_subshot_name(base_shot)
             else:
                 after_num = int(base_shot[2:])
-                next_numbers = sorted(
-                    n for n in (int(s[2:5]) for s in existing if '_' not in s) if n > after_num
-                )
+                next_num = registry.number_after(after_num)
 
-                if next_numbers:
-                    next_num = next_numbers[0]
+                if next_num is not None:
                     if next_num - after_num > 1:
                         new_number = after_num + ((next_num - after_num) // 2)
                         shot_name = f"SH{new_number:03d}"
                     else:
-                        shot_name = self._create_subshot_name(base_shot, existing)
+                        shot_name = self._create_subshot_name(base_shot)
                 else:
                     new_number = after_num + SHOT_NUMBER_INCREMENT
                     shot_name = f"SH{new_number:03d}"
 
         validate_shot_name(shot_name)
-        if shot_name in existing:
+        if shot_name in registry:
             raise ValueError(f"Shot {shot_name} already exists")
 
         self.create_shot_structure(shot_name)
         return self.get_shot_info(shot_name)
 
-    def _create_subshot_name(self, base_shot, existing):
+    def _create_subshot_name(self, base_shot):
         """Return a new sub-shot name under ``base_shot``.
 
         ``base_shot`` should be a top-level shot name (no underscore).  The new
@@ -340,16 +475,8 @@ class ShotManager:
         if '_' in base_shot:
             raise ValueError('Nested sub-shots are not supported')
 
-        prefix = base_shot + '_'
-        sub_numbers = []
-        for name in existing:
-            if name.startswith(prefix) and '_' not in name[len(prefix):]:
-                try:
-                    sub_numbers.append(int(name.split('_')[1]))
-                except ValueError:
-                    continue
-
-        next_num = (max(sub_numbers) + SHOT_NUMBER_INCREMENT) if sub_numbers else INITIAL_SUBSHOT_NUMBER
+        last_sub = self._registry.last_subshot(int(base_shot[2:]))
+        next_num = (last_sub + SHOT_NUMBER_INCREMENT) if last_sub is not None else INITIAL_SUBSHOT_NUMBER
         if next_num > 999:
             raise ValueError('No available sub-shot numbers')
 
@@ -366,93 +493,182 @@ class ShotManager:
                 logger.warning("Failed to read notes file %s: %s", notes_file, e)
         return ''
 
-    def _get_asset_info(self, shot_name, shot_dir, asset_type, generate=True):
-        """Get info for an image or video asset.
+    def _thumb_key(self, file_path, owner):
+        """Return the cache filename of the thumbnail for ``file_path``.
+
+        ``owner`` is the shot name or ``{shot}_{part}`` key the thumbnail is
+        stored under.  Audio files have no thumbnail and return ``None``.
+        """
+        if not file_path:
+            return None
+        path = Path(file_path)
+        ext = path.suffix.lower()
+        project_name = self.project_path.name
+        if ext in ALLOWED_VIDEO_EXTENSIONS:
+            return f"{project_name}_{owner}_{path.stem}_vthumb.jpg"
+        if ext in ALLOWED_IMAGE_EXTENSIONS:
+            return f"{project_name}_{owner}_{path.stem}_thumb.jpg"
+        return None
+
+    def _resolve_thumbnail(self, file_path, thumb_key, generate, existing=None,
+                           shot_name=None, asset=None):
+        """Return the thumbnail URL for an indexed asset.
+
+        ``existing`` is an optional set of filenames already present in the
+        thumbnail cache, letting listings avoid one ``stat`` per asset.
+        Missing thumbnails are ``None`` unless ``generate`` is set, in which
+        case they are queued and the URL they will resolve at is returned;
+        media is never decoded here.
+        """
+        if not file_path or not thumb_key:
+            return None
+        if existing is None:
+            cached = (THUMBNAIL_CACHE_DIR / thumb_key).is_file()
+        else:
+            cached = thumb_key in existing
+        if cached:
+            return thumbnail_url(thumb_key)
+        if not generate:
+            return None
+        return queue_thumbnail(self.project_path, file_path, thumb_key,
+                               shot=shot_name, asset=asset)
+
+    def queue_asset_thumbnail(self, shot_name, asset_type):
+        """Queue the thumbnail of an asset's current file if it is missing.
+
+        Returns the thumbnail's cache filename, or ``None`` if the asset has
+        no file with a thumbnail.
+        """
+        validate_shot_name(shot_name)
+        entry = self._get_record(shot_name)['assets'].get(asset_type) or {}
+        thumb_key = entry.get('thumb_key')
+        if not self._resolve_thumbnail(entry.get('file'), thumb_key, True,
+                                       shot_name=shot_name, asset=asset_type):
+            return None
+        return thumb_key
+
+    def _get_asset_info(self, shot_name, scan, asset_type, latest_folder, manifest):
+        """Collect the index record for an image or video asset.
 
         Args:
             shot_name: Name of the shot
-            shot_dir: Path to the shot directory
+            scan: ShotScan of the shot's WIP folders
             asset_type: AssetType.IMAGE or AssetType.VIDEO
-            generate: If True, generate thumbnails if missing
+            latest_folder: LatestFolder for the matching latest directory
+            manifest: VersionManifest holding the shot's active-version markers
 
         Returns:
-            dict with file, version, thumbnail, and prompt keys
+            dict with file, version, version_count, active_version,
+            has_prompt and thumb_key keys.  Prompt bodies are not read here; see :meth:`load_prompts`.
         """
-        if asset_type == AssetType.IMAGE:
-            final_dir = self.latest_images_dir
-            wip_subdir = 'images'
-            extensions = ALLOWED_IMAGE_EXTENSIONS
-            get_thumb = self.get_thumbnail_path
-        else:
-            final_dir = self.latest_videos_dir
-            wip_subdir = 'videos'
-            extensions = ALLOWED_VIDEO_EXTENSIONS
-            get_thumb = self.get_video_thumbnail_path
-
+        slot = scan.asset(asset_type)
         file_path, version, active_version = self._get_latest_asset(
-            final_dir, shot_dir / wip_subdir, shot_name, extensions
+            latest_folder.find(shot_name), slot, manifest, asset_type
         )
         file_path = self._normalize_path(file_path)
 
-        prompt = ''
-        if active_version > 0:
-            prompt = self.load_prompt(shot_name, asset_type, active_version)
-
-        thumbnail = get_thumb(file_path, shot_name, generate=generate) if file_path else None
-
         return {
             'file': file_path,
             'version': version,
+            'version_count': len(slot.versions),
             'active_version': active_version,
-            'thumbnail': thumbnail,
-            'prompt': prompt,
+            'has_prompt': active_version in slot.prompt_versions,
+            'thumb_key': self._thumb_key(file_path, shot_name),
         }
 
-    def _get_lipsync_info(self, shot_name, shot_dir, generate=True):
-        """Get info for all lipsync assets (driver, target, result, custom)."""
-        lipsync_dir = shot_dir / 'lipsync'
-        lipsync = {}
+    def _get_lipsync_info(self, shot_name, scan):
+        """Collect index records for all lipsync assets.
+
+        Returns:
+            (parts, custom_files) where *parts* maps driver/target/result to
+            asset records and *custom_files* lists custom-labeled files.
+        """
+        parts = {}
 
         for part in [AssetType.DRIVER, AssetType.TARGET, AssetType.RESULT]:
-            file_path, ver, active_ver = self._get_latest_asset(
-                lipsync_dir, lipsync_dir,
-                f'{shot_name}_{part}', ALLOWED_LIPSYNC_EXTENSIONS
-            )
+            slot = scan.asset(part)
+            file_path, ver, active_ver = self._get_latest_asset(slot.unversioned, slot)
             file_path = self._normalize_path(file_path)
 
-            prompt_text = ''
-            if active_ver > 0:
-                prompt_text = self.load_prompt(shot_name, part, active_ver)
-
-            thumbnail = None
-            if file_path:
-                ext = Path(file_path).suffix.lower()
-                if ext in ALLOWED_VIDEO_EXTENSIONS:
-                    thumbnail = self.get_video_thumbnail_path(file_path, f"{shot_name}_{part}", generate=generate)
-                elif ext in ALLOWED_IMAGE_EXTENSIONS:
-                    thumbnail = self.get_thumbnail_path(file_path, f"{shot_name}_{part}", generate=generate)
-
-            lipsync[part] = {
+            parts[part] = {
                 'file': file_path,
                 'version': ver,
+                'version_count': len(slot.versions),
                 'active_version': active_ver,
-                'thumbnail': thumbnail,
-                'prompt': prompt_text,
+                'has_prompt': active_ver in slot.prompt_versions,
+                'thumb_key': self._thumb_key(file_path, f"{shot_name}_{part}"),
             }
 
-        # Scan for custom-labeled lipsync files
         custom_files = []
-        if lipsync_dir.exists():
-            standard_markers = tuple(f'_{p}_v' for p in [AssetType.DRIVER, AssetType.TARGET, AssetType.RESULT])
-            for f in lipsync_dir.iterdir():
-                if not f.is_file() or f.suffix.lower() not in ALLOWED_LIPSYNC_EXTENSIONS:
-                    continue
-                if any(marker in f.name for marker in standard_markers):
-                    continue
-                if '_prompt.txt' in f.name:
-                    continue
-                custom_files.append(self._normalize_path(str(f)))
-        lipsync['custom_files'] = custom_files
+        for f in scan.custom_files:
+            file_path = self._normalize_path(str(f))
+            custom_files.append({
+                'file': file_path,
+                'thumb_key': self._thumb_key(file_path, f"{shot_name}_custom"),
+            })
+
+        return parts, custom_files
+
+    def _scan_latest(self):
+        """Classify both latest folders with one directory listing each."""
+        return scan_latest_folders(self.latest_images_dir, self.latest_videos_dir)
+
+    def _collect_shot_record(self, shot_name, latest=None):
+        """Read a shot's metadata from disk without touching thumbnails.
+
+        ``latest`` is the result of :meth:`_scan_latest`; listings pass one
+        shared scan so the latest folders are read once, not once per shot.
+        """
+        if latest is None:
+            latest = self._scan_latest()
+        shot_dir = self.wip_dir / shot_name
+        scan = ShotScan(shot_dir, shot_name)
+        # has_prompt comes from the prompt store; any .txt prompts dropped
+        # in from outside are imported on the way.
+        stored = self._import_prompt_files(shot_name, scan)
+        if stored is not None:
+            for asset_type, slot in scan.assets.items():
+                slot.prompt_versions = stored.get(asset_type, set())
+        manifest = self._manifest(shot_name)
+        with manifest.locked():
+            assets = {
+                AssetType.IMAGE: self._get_asset_info(
+                    shot_name, scan, AssetType.IMAGE, latest[AssetType.IMAGE], manifest),
+                AssetType.VIDEO: self._get_asset_info(
+                    shot_name, scan, AssetType.VIDEO, latest[AssetType.VIDEO], manifest),
+            }
+            if manifest.dirty:
+                manifest.save()
+        parts, custom_files = self._get_lipsync_info(shot_name, scan)
+        assets.update(parts)
+        return {
+            'notes': self._load_shot_notes(shot_dir),
+            'assets': assets,
+            'custom_files': custom_files,
+        }
+
+    def _asset_view(self, entry, shot_name, asset, generate, existing):
+        """Turn an asset record into the API representation."""
+        entry = entry or {}
+        return {
+            'file': entry.get('file'),
+            'version': entry.get('version', 0),
+            'active_version': entry.get('active_version', 0),
+            'thumbnail': self._resolve_thumbnail(
+                entry.get('file'), entry.get('thumb_key'), generate, existing,
+                shot_name=shot_name, asset=asset),
+            'has_prompt': bool(entry.get('has_prompt')),
+        }
+
+    def _lipsync_view(self, shot_name, record, generate, existing):
+        """Build the lipsync section of the API representation."""
+        lipsync = {}
+        for part in [AssetType.DRIVER, AssetType.TARGET, AssetType.RESULT]:
+            lipsync[part] = self._asset_view(
+                record['assets'].get(part), shot_name, part, generate, existing)
+
+        custom_files = record.get('custom_files', [])
+        lipsync['custom_files'] = [cf['file'] for cf in custom_files]
 
         # Best thumbnail: priority Result > Target > Driver > image file > None
         # Also flag if all assets are audio-only
@@ -470,12 +686,10 @@ class ShotManager:
         # If no standard thumbnail, check custom files for an image/video
         if not best_thumbnail and custom_files:
             for cf in custom_files:
-                ext = Path(cf).suffix.lower()
-                if ext in ALLOWED_VIDEO_EXTENSIONS:
-                    best_thumbnail = self.get_video_thumbnail_path(cf, f"{shot_name}_custom", generate=generate)
-                    break
-                elif ext in ALLOWED_IMAGE_EXTENSIONS:
-                    best_thumbnail = self.get_thumbnail_path(cf, f"{shot_name}_custom", generate=generate)
+                ext = Path(cf['file']).suffix.lower()
+                if ext in ALLOWED_VIDEO_EXTENSIONS or ext in ALLOWED_IMAGE_EXTENSIONS:
+                    best_thumbnail = self._resolve_thumbnail(
+                        cf['file'], cf['thumb_key'], generate, existing)
                     break
                 elif ext in ALLOWED_AUDIO_EXTENSIONS:
                     has_audio_only = True
@@ -485,156 +699,598 @@ class ShotManager:
 
         return lipsync
 
-    def get_shot_info(self, shot_name, generate=True):
-        """Get information about a specific shot."""
-        validate_shot_name(shot_name)
-        shot_dir = self.wip_dir / shot_name
-
-        notes = self._load_shot_notes(shot_dir)
-        image_info = self._get_asset_info(shot_name, shot_dir, AssetType.IMAGE, generate=generate)
-        video_info = self._get_asset_info(shot_name, shot_dir, AssetType.VIDEO, generate=generate)
-        lipsync_info = self._get_lipsync_info(shot_name, shot_dir, generate=generate)
+    def _build_shot_info(self, shot_name, record, generate=False, existing=None):
+        """Combine an index record with thumbnail lookups into shot info."""
+        image_info = self._asset_view(
+            record['assets'].get(AssetType.IMAGE), shot_name, AssetType.IMAGE, generate, existing)
+        video_info = self._asset_view(
+            record['assets'].get(AssetType.VIDEO), shot_name, AssetType.VIDEO, generate, existing)
+        lipsync_info = self._lipsync_view(shot_name, record, generate, existing)
 
         logger.debug("%s -> Image thumbnail: %s", shot_name, image_info['thumbnail'])
         logger.debug("%s -> Video thumbnail: %s", shot_name, video_info['thumbnail'])
 
         return {
             'name': shot_name,
-            'notes': notes,
+            'notes': record.get('notes', ''),
             'image': image_info,
             'video': video_info,
             'lipsync': lipsync_info,
             'archived': False  # TODO: Implement archiving
         }
 
+    @staticmethod
+    def _mtime_ns(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
 
-    def _get_latest_asset(self, final_dir, wip_dir, shot_name, extensions):
-        """Helper for finding the latest final or highest versioned WIP asset.
+    def _shot_signature(self, shot_name):
+        """Return a string that changes whenever a shot's directories change.
 
-        Searches for files containing ``shot_name`` to support custom naming
-        patterns.
+        Covers the shot folder, its images/videos/lipsync subfolders and the
+        notes file, since in-place edits do not touch directory mtimes.
+        """
+        shot_dir = self.wip_dir / shot_name
+        return ':'.join(str(self._mtime_ns(p)) for p in (
+            shot_dir,
+            shot_dir / 'images',
+            shot_dir / 'videos',
+            shot_dir / 'lipsync',
+            shot_dir / 'notes.txt',
+        ))
+
+    def _latest_signature(self):
+        """Return a string that changes whenever a latest folder changes."""
+        return f"{self._mtime_ns(self.latest_images_dir)}:{self._mtime_ns(self.latest_videos_dir)}"
+
+    def _parallel_map(self, func, items):
+        """Return ``[func(item) for item in items]`` using the listing pool.
+
+        Results keep the order of ``items``.  Small batches and a worker
+        count of 1 run inline.
+        """
+        items = list(items)
+        workers = min(self.listing_workers, len(items))
+        if workers <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shot-scan') as pool:
+            return list(pool.map(func, items))
+
+    def _memo_get(self, shot_name, signature, latest_sig):
+        """Return the memoised record for a shot if its stats still match."""
+        with self._memo_lock:
+            entry = self._memo.get(shot_name)
+            if entry and entry[0] == signature and entry[1] == latest_sig:
+                self._memo_hits += 1
+                return entry[2]
+            self._memo_misses += 1
+            return None
+
+    def _memo_put(self, shot_name, signature, latest_sig, record):
+        with self._memo_lock:
+            self._memo[shot_name] = (signature, latest_sig, record)
+
+    def _memo_drop(self, shot_name=None):
+        """Forget one shot's memo entry, or all of them."""
+        with self._memo_lock:
+            if shot_name is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(shot_name, None)
+
+    def cache_stats(self):
+        """Return hit/miss counters of the in-memory shot memo."""
+        with self._memo_lock:
+            lookups = self._memo_hits + self._memo_misses
+            return {
+                'entries': len(self._memo),
+                'hits': self._memo_hits,
+                'misses': self._memo_misses,
+                'hit_rate': round(self._memo_hits / lookups, 3) if lookups else None,
+            }
+
+    def _load_records(self, shot_names):
+        """Return ``{name: record}``, revalidating cached records by signature.
+
+        Records come from the in-memory memo when the shot's signature and
+        the latest folders are unchanged, then from the SQLite index, and
+        are only recollected from disk when both are stale.
+        """
+        latest_sig = self._latest_signature()
+
+        # Signatures and collection are dominated by filesystem round
+        # trips on network shares, so both phases fan out over a pool.
+        signatures = self._parallel_map(self._shot_signature, shot_names)
+
+        records = {}
+        misses = []
+        for name, signature in zip(shot_names, signatures):
+            record = self._memo_get(name, signature, latest_sig)
+            if record is not None:
+                records[name] = record
+            else:
+                misses.append((name, signature))
+
+        cached = {}
+        latest_changed = False
+        stale = []
+        if misses:
+            latest_changed = self._index.get_meta('latest_signature') != latest_sig
+            cached = self._index.load_all()
+            for name, signature in misses:
+                hit = cached.get(name)
+                if hit and hit[0] == signature and not latest_changed:
+                    records[name] = hit[1]
+                    self._memo_put(name, signature, latest_sig, hit[1])
+                else:
+                    stale.append((name, signature))
+
+        latest = self._scan_latest() if stale else None
+        collected = self._parallel_map(
+            lambda name: self._collect_shot_record(name, latest),
+            [name for name, _ in stale],
+        )
+
+        updates = []
+        for (name, signature), record in zip(stale, collected):
+            hit = cached.get(name)
+            records[name] = record
+            updates.append((name, signature, record))
+            self._memo_put(name, signature, latest_sig, record)
+            # Changes made behind the app's back (watcher disabled or
+            # events missed) still reach incremental clients.
+            if hit and hit[1] != record:
+                self._changes.record(name, MODIFIED)
+
+        self._index.put_many(updates)
+        with self._memo_lock:
+            memo_names = set(self._memo)
+        vanished = (set(cached) | memo_names) - set(shot_names)
+        self._index.delete_many(vanished)
+        for name in sorted(vanished):
+            self._memo_drop(name)
+            self._changes.record(name, REMOVED)
+        if latest_changed:
+            self._index.set_meta('latest_signature', latest_sig)
+        return records
+
+    def _get_record(self, shot_name):
+        """Return the record for one shot, recollecting it if stale."""
+        signature = self._shot_signature(shot_name)
+        latest_sig = self._latest_signature()
+        record = self._memo_get(shot_name, signature, latest_sig)
+        if record is not None:
+            return record
+        if self._index.get_meta('latest_signature') == latest_sig:
+            hit = self._index.get(shot_name)
+            if hit and hit[0] == signature:
+                self._memo_put(shot_name, signature, latest_sig, hit[1])
+                return hit[1]
+        record = self._collect_shot_record(shot_name)
+        self._index.put(shot_name, signature, record)
+        self._memo_put(shot_name, signature, latest_sig, record)
+        return record
+
+    def refresh_shot(self, shot_name, latest=None, kind=MODIFIED, detail=None):
+        """Recollect a shot after an in-app mutation and update the index.
+
+        ``kind`` and ``detail`` describe the change for the change log and
+        live event stream.
+        """
+        validate_shot_name(shot_name)
+        signature = self._shot_signature(shot_name)
+        latest_sig = self._latest_signature()
+        record = self._collect_shot_record(shot_name, latest)
+        self._index.put(shot_name, signature, record)
+        self._index.set_meta('latest_signature', latest_sig)
+        self._memo_put(shot_name, signature, latest_sig, record)
+        self._changes.record(shot_name, kind, detail)
+        return record
+
+    def invalidate_shot(self, shot_name, kind=MODIFIED, detail=None):
+        """Drop a shot from the memo and index so the next read recollects it."""
+        self._memo_drop(shot_name)
+        self._index.delete(shot_name)
+        self._changes.record(shot_name, kind, detail)
+
+    def _on_change(self, token, shot_name, kind, detail):
+        """Update the search index and notify live clients of a change."""
+        with self._facts_lock:
+            self._facts.pop(shot_name, None)
+        if self._search_synced:
+            self._index_search_doc(shot_name)
+        self._publish_change(token, shot_name, kind, detail)
+
+    def _publish_change(self, token, shot_name, kind, detail):
+        """Forward a change-log entry to live ``/api/shots/events`` clients."""
+        publish_event(self.project_path, 'shot', shot=shot_name, change=kind,
+                      token=token, **(detail or {}))
+
+    @property
+    def change_token(self):
+        """Current change token; see :class:`ChangeLog`."""
+        return self._changes.token
+
+    def get_changes(self, since):
+        """Return shots added, modified or removed after token ``since``.
 
         Returns:
-            (file_path, max_version, active_version) where *max_version* is
-            the highest version in WIP and *active_version* is the version
-            whose content matches the file in the latest folder.
-        """
-        latest_final = None
-        if final_dir.exists():
-            for ext in extensions:
-                # Try exact match first (default pattern), then broad match
-                candidate = final_dir / f'{shot_name}{ext}'
-                if candidate.exists():
-                    latest_final = str(candidate)
-                    break
-                matches = list(final_dir.glob(f'*{shot_name}*{ext}'))
-                if matches:
-                    latest_final = str(matches[0])
-                    break
+            dict with ``token``, ``reset``, ``added``, ``modified`` and
+            ``removed``.  ``reset`` is True when ``since`` is no longer
+            covered by the change log and a full listing is required.
+        """
+        token = self._changes.token
+        changed = self._changes.since(since)
+        result = {'token': token, 'reset': changed is None,
+                  'added': [], 'modified': [], 'removed': []}
+        if not changed:
+            return result
+
+        existing = self._existing_thumbnails()
+        for shot_name in sorted(changed):
+            if not (self.wip_dir / shot_name).is_dir():
+                result['removed'].append(shot_name)
+                continue
+            record = self._get_record(shot_name)
+            info = self._build_shot_info(shot_name, record, generate=False, existing=existing)
+            key = 'added' if ADDED in changed[shot_name] else 'modified'
+            result[key].append(info)
+        return result
 
-        version = 0
-        wip_version_map = {}
-        if wip_dir.exists():
-            wip_files = []
-            for ext in extensions:
-                wip_files.extend(wip_dir.glob(f'*{shot_name}*_v*{ext}'))
+    def _drop_stale_thumbnails(self, record):
+        """Delete cached thumbnails older than the file they were made from.
 
-            for f in wip_files:
-                m = VERSION_RE.search(f.stem)
-                if m:
-                    wip_version_map[int(m.group(1))] = f
+        Thumbnail names only depend on the source filename, so a file that
+        is overwritten in place would otherwise keep its old thumbnail.
+        """
+        entries = list(record.get('assets', {}).values()) + record.get('custom_files', [])
+        for entry in entries:
+            source, thumb_key = entry.get('file'), entry.get('thumb_key')
+            if not source or not thumb_key:
+                continue
+            thumb_path = THUMBNAIL_CACHE_DIR / thumb_key
+            try:
+                if thumb_path.stat().st_mtime_ns < os.stat(source).st_mtime_ns:
+                    thumb_path.unlink()
+            except OSError:
+                continue
 
-            if wip_version_map:
-                version = max(wip_version_map)
+    @staticmethod
+    def _write_key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
 
-        # Determine which WIP version matches the file in the latest folder.
-        active_version = version
-        if latest_final and wip_version_map:
-            for ver in sorted(wip_version_map, reverse=True):
-                try:
-                    if filecmp.cmp(latest_final, str(wip_version_map[ver]), shallow=True):
-                        active_version = ver
-                        break
-                except OSError:
-                    continue
+    def note_write(self, *paths):
+        """Remember files the app just wrote or removed, and their folders.
 
-        # Fall back to the highest versioned file when no "latest" copy exists
-        if not latest_final and wip_version_map:
-            latest_final = str(wip_version_map[version])
+        The watcher skips events for these paths while they still have the
+        recorded size and mtime (or are still missing), so the app's own
+        writes are not reported again as external changes.
+        """
+        now = time.monotonic()
+        keys = {}
+        for path in paths:
+            path = Path(path)
+            for p in (path, path.parent):
+                keys[str(p)] = (self._write_key(p), now)
+        with self._own_writes_lock:
+            self._own_writes.update(keys)
+            expired = [p for p, (_key, t) in self._own_writes.items() if now - t > OWN_WRITE_TTL]
+            for p in expired:
+                del self._own_writes[p]
+
+    def is_own_write(self, path):
+        """Return True if ``path`` is as the app itself last left it."""
+        with self._own_writes_lock:
+            entry = self._own_writes.get(str(path))
+        if entry is None or time.monotonic() - entry[1] > OWN_WRITE_TTL:
+            return False
+        return self._write_key(path) == entry[0]
+
+    def apply_fs_changes(self, changes, rescan=False):
+        """Update the index for changes seen by the filesystem watcher.
+
+        Args:
+            changes: ``{shot_name: set_of_areas}`` collected by the watcher
+            rescan: If True, events were lost and every shot is revalidated
+                on the next listing instead.
+        """
+        if rescan:
+            self._memo_drop()
+            self._index.set_meta('latest_signature', '')
+            with self._facts_lock:
+                self._facts.clear()
+        # Shots known before this batch; a shot the registry has never seen
+        # is new.  (The index is no guide: in-app edits drop index rows.)
+        known = self._registry.cached_names()
+        self._registry.names()
+        for shot_name in sorted(changes):
+            try:
+                validate_shot_name(shot_name)
+            except ValueError:
+                continue
+            if (self.wip_dir / shot_name).is_dir():
+                kind = ADDED if known is not None and shot_name not in known else MODIFIED
+                record = self.refresh_shot(shot_name, kind=kind, detail={'action': 'external'})
+                self._drop_stale_thumbnails(record)
+                # Files rewritten in place keep their directory mtimes, so
+                # the sync journal would not notice them; rehash instead.
+                if self.verify_digests:
+                    self._rehash.submit(shot_name)
+            elif (known is not None and shot_name in known) or self._index.get(shot_name):
+                self.invalidate_shot(shot_name, kind=REMOVED)
+        if changes:
+            logger.debug("Applied filesystem changes for %d shot(s)", len(changes))
+
+    def start(self):
+        """Start background work: resume jobs interrupted by a shutdown,
+        probe the filesystem and watch the shots folder.
+
+        Kept out of ``__init__`` so that only the manager cached by
+        :func:`get_shot_manager` runs workers; calling it again is a no-op.
+        """
+        if self._started:
+            return
+        self._started = True
+        self.jobs.start()
+        self.jobs.submit('probe', {})
+        self.start_watcher()
+
+    def start_watcher(self):
+        """Start the filesystem watcher configured in ``shotbuddy.cfg``."""
+        if self._watcher is not None or not config_bool('watcher', 'enabled', True):
+            return self._watcher
+        self._watcher = ShotWatcher(
+            self,
+            backend=config_str('watcher', 'backend', 'auto'),
+            debounce=config_float('watcher', 'debounce', 0.5),
+            poll_interval=config_float('watcher', 'poll_interval', 5.0),
+        )
+        try:
+            self._watcher.start()
+        except Exception as e:
+            logger.warning("Failed to start filesystem watcher: %s", e)
+            self._watcher = None
+        return self._watcher
+
+    def close(self):
+        """Stop the watcher and background work and release the index connection."""
+        self._sync_task.stop()
+        self._rehash.stop()
+        self.jobs.stop()
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._memo_drop()
+        self._index.close()
+        self._prompts.close()
+        self._search.close()
+
+    def _existing_thumbnails(self):
+        """Return the set of filenames currently in the thumbnail cache."""
+        try:
+            return set(os.listdir(THUMBNAIL_CACHE_DIR))
+        except OSError:
+            return set()
 
-        return latest_final, version, active_version
+    def get_shot_info(self, shot_name, generate=False):
+        """Get information about a specific shot.
 
-    def sync_latest_folders(self):
-        """Ensure latest_images/ and latest_videos/ match the highest WIP versions.
+        A pure metadata read unless ``generate`` queues missing thumbnails.
+        """
+        validate_shot_name(shot_name)
+        record = self._get_record(shot_name)
+        return self._build_shot_info(shot_name, record, generate=generate)
 
-        For each shot in wip/, finds the highest versioned image and video,
-        then verifies the corresponding file in the latest folder is correct.
-        Also removes orphaned latest files for shots that no longer exist.
+    def _get_latest_asset(self, latest_file, slot, manifest=None, marker_slot=None):
+        """Helper for resolving the latest final or highest versioned WIP asset.
+
+        Args:
+            latest_file: Path of the shot's file in the latest folder, if any
+            slot: AssetVersions classified from the WIP folder
+            manifest: Optional VersionManifest recording the active version
+            marker_slot: Key of this asset in ``manifest``
 
         Returns:
-            dict with 'synced', 'removed', 'skipped', and 'errors' counts.
+            (file_path, max_version, active_version) where *max_version* is
+            the highest version in WIP and *active_version* is the version
+            the file in the latest folder was copied from.
         """
-        import shutil
+        version, best_file = slot.best()
 
-        stats = {'synced': 0, 'removed': 0, 'skipped': 0, 'errors': 0}
-        wip_shot_names = set()
+        # Determine which WIP version the file in the latest folder is.
+        active_version = version
+        if latest_file and slot.versions:
+            entry = manifest.get_latest(marker_slot) if manifest else None
+            active_version, rebuilt = resolve_active_version(latest_file, slot.versions, entry)
+            if rebuilt and manifest:
+                manifest.put_latest(marker_slot, rebuilt)
 
-        if not self.wip_dir.exists():
-            return stats
+        # Fall back to the highest versioned file when no "latest" copy exists
+        if not latest_file and best_file:
+            latest_file = best_file
 
-        for shot_dir in self.wip_dir.iterdir():
-            if not shot_dir.is_dir() or not shot_dir.name.startswith('SH'):
-                continue
+        return (str(latest_file) if latest_file else None), version, active_version
+
+    def _manifest(self, shot_name):
+        """Return the active-version manifest for a shot."""
+        return VersionManifest(self.project_path, shot_name)
+
+    def record_latest(self, shot_name, asset_type, version, latest_path, source_path=None,
+                      digest=None, defer_digest=False):
+        """Record which WIP version was just copied into a latest folder.
+
+        Called by every code path that writes ``latest_images`` or
+        ``latest_videos`` so listings never need to compare media content.
+        ``digest`` is the content digest of ``source_path`` when the caller
+        already computed it (uploads hash while streaming).  With
+        ``defer_digest`` an unknown digest is left to the rehash thread
+        instead of being computed now.
+        """
+        slot = ShotScan(self.wip_dir / shot_name, shot_name, include_lipsync=False).asset(asset_type)
+        manifest = self._manifest(shot_name)
+        with manifest.locked():
+            if digest is not None and self.verify_digests and source_path:
+                content = manifest.set_version(asset_type, version, source_path, digest=digest)
+            elif defer_digest:
+                content = None
+            else:
+                content = self._version_digest(manifest, asset_type, version, source_path)
+            manifest.set_latest(asset_type, version, latest_path, source_path,
+                                max_version=slot.max_version, content=content)
+            manifest.save()
+        if content is None and self.verify_digests and source_path:
+            self._rehash.submit(shot_name)
+
+    def _version_digest(self, manifest, asset_type, version, path):
+        """Return the content digest of a WIP version, hashing it if needed.
+
+        Returns ``None`` when digest verification is off or ``path`` is
+        unknown.
+        """
+        if not self.verify_digests or not path:
+            return None
+        return (manifest.version_digest(asset_type, version, path)
+                or manifest.set_version(asset_type, version, path))
 
-            shot_name = shot_dir.name
-            wip_shot_names.add(shot_name)
+    def _rehash_shot(self, shot_name):
+        """Rehash WIP versions of a shot whose files changed since they were hashed.
 
-            for subdir, extensions, latest_dir in [
-                ('images', ALLOWED_IMAGE_EXTENSIONS, self.latest_images_dir),
-                ('videos', ALLOWED_VIDEO_EXTENSIONS, self.latest_videos_dir),
-            ]:
-                wip_subdir = shot_dir / subdir
-                if not wip_subdir.exists():
+        Runs on the rehash thread at ``[sync] rehash_rate``.  Markers written
+        before digests were recorded get the digest of their latest file.
+        If the version in a latest folder no longer matches the WIP file it
+        was copied from (re-rendered in place), the shot is re-synced.
+        """
+        if not (self.wip_dir / shot_name).is_dir():
+            return
+        scan = ShotScan(self.wip_dir / shot_name, shot_name, include_lipsync=False)
+        manifest = self._manifest(shot_name)
+        latest_dirs = {
+            AssetType.IMAGE: self.latest_images_dir,
+            AssetType.VIDEO: self.latest_videos_dir,
+        }
+
+        # Hash without holding on to the manifest, then apply the results
+        # to a fresh copy so markers written meanwhile are kept.
+        hashed = []
+        backfill = {}
+        for asset_type, latest_dir in latest_dirs.items():
+            slot = scan.asset(asset_type)
+            for version, path in sorted(slot.versions.items()):
+                if manifest.version_digest(asset_type, version, path) is not None:
                     continue
+                try:
+                    st = path.stat()
+                    hashed.append((asset_type, version, path,
+                                   content_digest(path, self.rehash_rate), st))
+                except OSError as e:
+                    logger.warning("Rehash: cannot read %s: %s", path, e)
+            marker = manifest.get_latest(asset_type)
+            if marker and not marker.get('content'):
+                latest_path = latest_dir / marker['file']
+                if entry_matches(marker, latest_path):
+                    try:
+                        backfill[asset_type] = (marker['file'], marker['mtime_ns'],
+                                                content_digest(latest_path, self.rehash_rate))
+                    except OSError as e:
+                        logger.warning("Rehash: cannot read %s: %s", latest_path, e)
+
+        manifest = self._manifest(shot_name)
+        with manifest.locked():
+            for asset_type, version, path, digest, st in hashed:
+                manifest.put_version(asset_type, version, path, digest, st)
+            stale = False
+            for asset_type in latest_dirs:
+                slot = scan.asset(asset_type)
+                manifest.retain_versions(asset_type, slot.versions)
+                marker = manifest.get_latest(asset_type)
+                if not marker:
+                    continue
+                if asset_type in backfill and backfill[asset_type][:2] == (marker['file'], marker['mtime_ns']):
+                    marker['content'] = backfill[asset_type][2]
+                    manifest.dirty = True
+                source = slot.versions.get(marker.get('version'))
+                expected = manifest.version_digest(asset_type, marker.get('version'), source) if source else None
+                if expected and marker.get('content') and expected != marker['content']:
+                    stale = True
+            if manifest.dirty:
+                manifest.save()
+        if stale:
+            logger.info("Rehash: %s changed in place, re-syncing its latest files", shot_name)
+            self.sync_shot_latest(shot_name)
+
+    def _sync_stamp(self, signature, latest, shot_name):
+        """Journal stamp of a shot: its WIP signature and latest filenames."""
+        return '|'.join([signature] + [
+            ','.join(latest[asset_type].names(shot_name))
+            for asset_type in (AssetType.IMAGE, AssetType.VIDEO)
+        ])
+
+    def _sync_shot(self, shot_name, latest, manifest, stats):
+        """Bring one shot's latest files in line with WIP.
+
+        Returns True if a latest file was replaced.
+        """
+        latest_dirs = {
+            AssetType.IMAGE: self.latest_images_dir,
+            AssetType.VIDEO: self.latest_videos_dir,
+        }
+        scan = ShotScan(self.wip_dir / shot_name, shot_name, include_lipsync=False)
+        changed = False
 
+        with manifest.locked():
+            for asset_type, latest_dir in latest_dirs.items():
                 # Find the highest versioned file (any naming pattern)
-                best_version = 0
-                best_file = None
-                for ext in extensions:
-                    for f in wip_subdir.glob(f'*_v*{ext}'):
-                        m = VERSION_RE.search(f.stem)
-                        if not m:
-                            continue
-                        ver = int(m.group(1))
-                        if ver > best_version:
-                            best_version = ver
-                            best_file = f
-
+                slot = scan.asset(asset_type)
+                best_version, best_file = slot.best()
                 if best_file is None:
                     continue
 
                 # Find existing latest file (any naming pattern)
-                existing_latest = None
-                for ext in extensions:
-                    candidate = latest_dir / f'{shot_name}{ext}'
-                    if candidate.exists():
-                        existing_latest = candidate
-                        break
-                    matches = list(latest_dir.glob(f'*{shot_name}*{ext}'))
-                    if matches:
-                        existing_latest = matches[0]
-                        break
+                existing_latest = latest[asset_type].find(shot_name)
+                marker = manifest.get_latest(asset_type)
 
                 # Determine if update is needed
                 needs_update = False
                 if existing_latest is None:
                     needs_update = True
+                elif (existing_latest and marker and marker.get('version') in slot.versions
+                        and entry_matches(marker, existing_latest)):
+                    # The marker proves which version is in latest.  Keep a
+                    # deliberately restored version until a newer one arrives.
+                    if best_version <= marker.get('max_version', marker['version']):
+                        best_version = marker['version']
+                        best_file = slot.versions[best_version]
+                    needs_update = best_version != marker['version']
+                    if not needs_update and self.verify_digests:
+                        # Compare the digest recorded for the WIP file with the
+                        # one of the data that was copied; never read media here.
+                        expected = manifest.version_digest(asset_type, best_version, best_file)
+                        if expected is None or not marker.get('content'):
+                            self._rehash.submit(shot_name)
+                            stats['rehash_queued'] += 1
+                        elif expected != marker['content']:
+                            needs_update = True
                 elif existing_latest.suffix != best_file.suffix:
                     needs_update = True
                 else:
                     try:
                         if existing_latest.stat().st_size != best_file.stat().st_size:
                             needs_update = True
+                        elif self.verify_digests:
+                            # No usable marker: compare content once and record
+                            # a marker so later syncs only compare digests.
+                            expected = self._version_digest(manifest, asset_type, best_version, best_file)
+                            content = content_digest(existing_latest)
+                            needs_update = expected != content
+                            if not needs_update:
+                                manifest.set_latest(asset_type, best_version, existing_latest, best_file,
+                                                    max_version=best_version, content=content)
                     except OSError:
                         needs_update = True
 
@@ -643,38 +1299,124 @@ class ShotManager:
                     continue
 
                 try:
-                    # Remove old latest files for this shot (any naming pattern)
-                    for old in latest_dir.glob(f'*{shot_name}*'):
-                        if old.is_file():
-                            old.unlink()
                     # Derive latest filename from WIP file by stripping version
                     dest_stem = VERSION_RE.sub('', best_file.stem)
                     dest = latest_dir / f'{dest_stem}{best_file.suffix}'
-                    shutil.copy2(str(best_file), str(dest))
+                    # Remove old latest files for this shot (any naming pattern)
+                    removed = [old for old in latest[asset_type].by_shot.get(shot_name, [])
+                               if old != dest]
+                    for old in removed:
+                        old.unlink(missing_ok=True)
+                    materialize(best_file, dest)
+                    self.note_write(dest, *removed)
+                    manifest.set_latest(asset_type, best_version, dest, best_file,
+                                        max_version=slot.max_version,
+                                        content=self._version_digest(manifest, asset_type,
+                                                                     best_version, best_file))
                     stats['synced'] += 1
+                    changed = True
                     logger.info("Sync: updated %s in %s from v%03d",
                                 shot_name, latest_dir.name, best_version)
                 except OSError as e:
                     stats['errors'] += 1
                     logger.error("Sync: failed to update %s: %s", shot_name, e)
 
-        # Remove orphaned latest files
-        for latest_dir in [self.latest_images_dir, self.latest_videos_dir]:
-            if not latest_dir.exists():
-                continue
-            for latest_file in latest_dir.iterdir():
-                if not latest_file.is_file():
-                    continue
-                # Check if any known shot name appears in the filename
-                if not any(sn in latest_file.stem for sn in wip_shot_names):
-                    try:
-                        latest_file.unlink()
-                        stats['removed'] += 1
-                        logger.info("Sync: removed orphaned %s", latest_file.name)
-                    except OSError as e:
-                        stats['errors'] += 1
-                        logger.error("Sync: failed to remove %s: %s",
-                                     latest_file.name, e)
+            if manifest.dirty:
+                manifest.save()
+        return changed
+
+    def sync_latest_folders(self, full=False, progress=None, stopped=None):
+        """Ensure latest_images/ and latest_videos/ match the highest WIP versions.
+
+        Only shots whose WIP folders or latest files changed since their
+        last sync (see :class:`SyncJournal`) are visited, unless ``full``
+        is set.  For each visited shot, finds the highest versioned image
+        and video, then verifies the corresponding file in the latest
+        folder is correct.  Latest files naming no existing shot are
+        removed as orphans.
+
+        Args:
+            full: Visit every shot regardless of the journal.
+            progress: Optional ``progress(done, total, stats)`` callback.
+            stopped: Optional callable; the sync returns early once it
+                returns True.
+
+        Returns:
+            dict with 'synced', 'removed', 'skipped', 'errors', 'visited',
+            'unchanged' and 'rehash_queued' counts.
+        """
+        stats = {'synced': 0, 'removed': 0, 'skipped': 0, 'errors': 0,
+                 'visited': 0, 'unchanged': 0, 'rehash_queued': 0}
+
+        if not self.wip_dir.exists():
+            return stats
+
+        with self._sync_run_lock:
+            return self._sync_latest_folders(full, progress, stopped, stats)
+
+    def _sync_latest_folders(self, full, progress, stopped, stats):
+        journal = self._sync_journal
+        latest = self._scan_latest()
+        shot_names = self._registry.names()
+        signatures = dict(zip(shot_names, self._parallel_map(self._shot_signature, shot_names)))
+
+        pending = []
+        for shot_name in shot_names:
+            stamp = self._sync_stamp(signatures[shot_name], latest, shot_name)
+            if not full and journal.get(shot_name) == stamp:
+                stats['unchanged'] += 1
+            else:
+                pending.append(shot_name)
+
+        total = len(pending)
+        if progress:
+            progress(0, total, stats)
+
+        synced_shots = set()
+        clean = []
+        for done, shot_name in enumerate(pending, 1):
+            if stopped and stopped():
+                break
+            errors = stats['errors']
+            if self._sync_shot(shot_name, latest, self._manifest(shot_name), stats):
+                synced_shots.add(shot_name)
+            if stats['errors'] == errors:
+                clean.append(shot_name)
+            stats['visited'] += 1
+            if progress:
+                progress(done, total, stats)
+
+        # Orphaned latest files: a set lookup per shot name parsed from the
+        # filename instead of a substring test against every shot.
+        existing = set(shot_names)
+        for asset_type in (AssetType.IMAGE, AssetType.VIDEO):
+            for latest_file in latest[asset_type].orphans(existing):
+                try:
+                    latest_file.unlink()
+                    self.note_write(latest_file)
+                    stats['removed'] += 1
+                    logger.info("Sync: removed orphaned %s", latest_file.name)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    stats['errors'] += 1
+                    logger.error("Sync: failed to remove %s: %s",
+                                 latest_file.name, e)
+
+        if synced_shots:
+            latest = self._scan_latest()
+        for shot_name in sorted(synced_shots):
+            try:
+                self.refresh_shot(shot_name, latest, detail={'action': 'synced'})
+            except ValueError:
+                self.invalidate_shot(shot_name)
+
+        # Journal the stamps taken before each visit, so a shot changed
+        # while it was being synced is visited again next time.
+        for shot_name in clean:
+            journal.put(shot_name, self._sync_stamp(signatures[shot_name], latest, shot_name))
+        journal.retain(existing)
+        journal.save()
 
         if stats['synced'] or stats['removed']:
             logger.info("Sync complete: %d synced, %d removed, %d skipped, %d errors",
@@ -682,6 +1424,102 @@ class ShotManager:
                         stats['skipped'], stats['errors'])
         return stats
 
+    def sync_shot_latest(self, shot_name):
+        """Sync the latest files of one shot now, ignoring the journal."""
+        stats = {'synced': 0, 'removed': 0, 'skipped': 0, 'errors': 0,
+                 'visited': 1, 'unchanged': 0, 'rehash_queued': 0}
+        with self._sync_run_lock:
+            if self._sync_shot(shot_name, self._scan_latest(), self._manifest(shot_name), stats):
+                self.refresh_shot(shot_name, self._scan_latest(), detail={'action': 'synced'})
+            self._sync_journal.discard(shot_name)
+            self._sync_journal.save()
+        return stats
+
+    def start_latest_sync(self, full=False):
+        """Start :meth:`sync_latest_folders` in the background.
+
+        Progress is published as ``sync`` events.  Returns the task status;
+        an already running sync is left alone.
+        """
+        return self._sync_task.start(full=full)
+
+    def latest_sync_status(self):
+        """Return the status of the last background sync."""
+        return self._sync_task.status()
+
+    def wait_latest_sync(self, timeout=None):
+        return self._sync_task.wait(timeout)
+
+    def _publish_sync(self, status):
+        publish_event(self.project_path, 'sync', **status)
+
+    def _publish_job(self, job):
+        publish_event(self.project_path, 'job', **job)
+
+    def place_latest(self, shot_name, asset_type, version, wip_path, final_path, replaced=(),
+                     digest=None, defer_digest=False):
+        """Put WIP ``version`` at ``final_path`` in a latest folder and record it.
+
+        ``replaced`` are the shot's other latest files, which are removed;
+        a file at ``final_path`` itself is replaced by :func:`materialize`.
+        The writes are noted so the watcher does not report them back.
+        ``digest`` and ``defer_digest`` are passed to :meth:`record_latest`.
+        """
+        final_path = Path(final_path)
+        removed = [Path(f) for f in replaced if Path(f) != final_path]
+        for existing_file in removed:
+            existing_file.unlink(missing_ok=True)
+        materialize(wip_path, final_path)
+        self.note_write(final_path, *removed)
+        self.record_latest(shot_name, asset_type, version, final_path, wip_path,
+                           digest=digest, defer_digest=defer_digest)
+
+    def _job_latest(self, job):
+        """Place an uploaded WIP version into its latest folder."""
+        payload = job.payload
+        asset_type = payload['asset_type']
+        wip_path = Path(payload['wip_path'])
+        final_path = Path(payload['final_path'])
+        if not wip_path.is_file():
+            # Renamed or deleted since; the next sync settles the latest folder.
+            logger.info("Skipping latest copy of %s: file is gone", wip_path)
+            return
+
+        # Remove old latest files for this shot (any naming pattern);
+        # a file with the final name is replaced by materialize().
+        extensions = ALLOWED_IMAGE_EXTENSIONS if asset_type == AssetType.IMAGE else ALLOWED_VIDEO_EXTENSIONS
+        digest = payload.get('digest')
+        self.place_latest(
+            job.shot, asset_type, payload['version'], wip_path, final_path,
+            LatestFolder(final_path.parent, extensions).by_shot.get(job.shot, []),
+            digest=digest, defer_digest=digest is None)
+        self.refresh_shot(job.shot, detail={
+            'action': 'latest', 'asset': asset_type, 'version': payload['version']})
+
+    def _job_prompt(self, job):
+        """Store a prompt imported from an uploaded file's metadata."""
+        payload = job.payload
+        self.save_prompt(job.shot, payload['asset_type'], payload['version'], payload['prompt'])
+
+    def _job_thumbnail(self, job):
+        """Render an uploaded file's thumbnail and wait for it."""
+        payload = job.payload
+        if not Path(payload['source']).is_file():
+            return
+        queue_thumbnail(self.project_path, payload['source'], payload['thumb_key'],
+                        shot=job.shot, asset=payload.get('asset'), force=True)
+        if not THUMBNAIL_QUEUE.wait(payload['thumb_key']):
+            raise RuntimeError(f"No thumbnail could be rendered for {Path(payload['source']).name}")
+
+    def _job_probe(self, job):
+        """Detect how WIP files are placed into the latest folders.
+
+        The result is cached per filesystem pair by :func:`detect_strategy`,
+        so the first upload does not pay for the probe.
+        """
+        for latest_dir in (self.latest_images_dir, self.latest_videos_dir):
+            detect_strategy(self.wip_dir, latest_dir)
+
     def save_shot_notes(self, shot_name, notes):
         """Save notes for a shot."""
         validate_shot_name(shot_name)
@@ -695,6 +1533,12 @@ class ShotManager:
                 f.write(notes)
         except Exception as e:
             raise ValueError(f"Failed to save notes: {str(e)}")
+        self.note_write(notes_file)
+        # notes.txt is part of the signature, but coarse mtimes on some
+        # shares can hide a quick second save.
+        self._memo_drop(shot_name)
+        self._index.delete(shot_name)
+        self._changes.record(shot_name, MODIFIED, {'action': 'notes'})
 
     def _prompt_file_path(self, shot_name, asset_type, version):
         """Return the path to the prompt file for a specific asset version."""
@@ -712,9 +1556,7 @@ class ShotManager:
             raise ValueError('Invalid asset type')
         return base_dir / filename
 
-    def load_prompt(self, shot_name, asset_type, version):
-        """Load a prompt for a specific asset version."""
-        path = self._prompt_file_path(shot_name, asset_type, version)
+    def _read_prompt_file(self, path):
         if path.exists():
             try:
                 with open(path, 'r', encoding='utf-8') as f:
@@ -723,19 +1565,117 @@ class ShotManager:
                 logger.warning("Failed to read prompt file %s: %s", path, e)
         return ''
 
+    def _import_prompt_files(self, shot_name, scan):
+        """Copy ``.txt`` prompts the store does not know yet into it.
+
+        Returns ``{asset_type: set(versions)}`` of prompts in the store after
+        the import, or ``None`` when the store is unavailable.
+        """
+        stored = self._prompts.shot_versions(shot_name)
+        if stored is None:
+            return None
+        rows = []
+        for asset_type, slot in scan.assets.items():
+            for version in slot.prompt_versions - stored.get(asset_type, set()):
+                text = self._read_prompt_file(
+                    self._prompt_file_path(shot_name, asset_type, version))
+                if text:
+                    rows.append((shot_name, asset_type, version, text))
+                    stored.setdefault(asset_type, set()).add(version)
+        if rows and self._prompts.import_many(rows):
+            logger.info("Imported %d prompt file(s) for %s", len(rows), shot_name)
+        return stored
+
+    def _migrate_prompt_files(self):
+        """Import every shot's ``.txt`` prompts once per project."""
+        if not self._prompts.available or self._prompts.get_meta('txt_imported'):
+            return
+        for shot_name in self._shot_names():
+            if SHOT_NAME_RE.match(shot_name):
+                self._import_prompt_files(shot_name, ShotScan(self.wip_dir / shot_name, shot_name))
+        self._prompts.set_meta('txt_imported', '1')
+
+    def load_prompt(self, shot_name, asset_type, version):
+        """Load a prompt for a specific asset version."""
+        path = self._prompt_file_path(shot_name, asset_type, version)
+        prompt = self._prompts.get(shot_name, asset_type, version)
+        if prompt is None:
+            return self._read_prompt_file(path)
+        return prompt.strip()
+
+    def prompt_history(self, shot_name):
+        """Return every stored prompt of a shot grouped by asset type.
+
+        Returns:
+            ``{asset_type: [{'version', 'prompt', 'updated_at'}, ...]}``
+            sorted by version.
+        """
+        validate_shot_name(shot_name)
+        return self._prompts.history(shot_name)
+
+    def load_prompts(self, items):
+        """Load several prompts at once.
+
+        Args:
+            items: iterable of ``(shot_name, asset_type, version)``; a
+                ``None`` version means the asset's active version.
+
+        Returns:
+            list of dicts with shot_name, asset_type, version and prompt, in
+            the order of ``items``.  Unknown shots or assets yield an empty
+            prompt.
+        """
+        results = []
+        for shot_name, asset_type, version in items:
+            validate_shot_name(shot_name)
+            if version is None:
+                entry = self._get_record(shot_name)['assets'].get(asset_type) or {}
+                version = entry.get('active_version') or 0
+                has_prompt = entry.get('has_prompt', False)
+            else:
+                has_prompt = True
+            prompt = ''
+            if version and has_prompt:
+                prompt = self.load_prompt(shot_name, asset_type, version)
+            results.append({
+                'shot_name': shot_name,
+                'asset_type': asset_type,
+                'version': version,
+                'prompt': prompt,
+            })
+        return results
+
     def save_prompt(self, shot_name, asset_type, version, prompt):
         """Save prompt for a specific asset version."""
         validate_shot_name(shot_name)
         path = self._prompt_file_path(shot_name, asset_type, version)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(prompt)
-        except Exception as e:
-            raise ValueError(f"Failed to save prompt: {str(e)}")
+        stored = self._prompts.put(shot_name, asset_type, version, prompt)
+
+        # Keep .txt copies when exporting, when the store is unavailable, and
+        # for legacy files so they never contradict the store.
+        if self.export_prompt_txt or not stored or path.exists():
+            try:
+                if prompt.strip() or not stored:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(prompt)
+                else:
+                    path.unlink(missing_ok=True)
+                self.note_write(path)
+            except Exception as e:
+                raise ValueError(f"Failed to save prompt: {str(e)}")
+        self.invalidate_shot(shot_name, detail={'action': 'prompt', 'asset': asset_type, 'version': version})
 
     def get_prompt_versions(self, shot_name, asset_type):
         """Return a sorted list of prompt versions for the given asset."""
+        self._prompt_file_path(shot_name, asset_type, 0)  # validates asset_type
+        versions = self._prompts.versions(shot_name, asset_type)
+        if versions is not None:
+            return versions
+        return self._prompt_file_versions(shot_name, asset_type)
+
+    def _prompt_file_versions(self, shot_name, asset_type):
+        """Return prompt versions from ``.txt`` files (store unavailable)."""
         shot_dir = self.wip_dir / shot_name
         if asset_type == AssetType.IMAGE:
             base_dir = shot_dir / 'images'
@@ -763,61 +1703,118 @@ class ShotManager:
                     continue
         return sorted(set(versions))
 
-    def get_thumbnail_path(self, image_path, shot_name, generate=True):
-        """Return (and optionally create) the thumbnail for an image.
-
-        Args:
-            image_path: Path to the source image
-            shot_name: Name of the shot
-            generate: If True, generate thumbnail if missing. If False, return None for missing.
-        """
-        if not image_path:
-            return None
-
-        image_path = Path(image_path)
-        project_name = self.project_path.name
-        thumb_filename = f"{project_name}_{shot_name}_{image_path.stem}_thumb.jpg"
-        thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
-
-        if thumb_path.exists():
-            return f"/static/thumbnails/{thumb_filename}"
-
-        if not generate:
-            return None
-
-        result = create_image_thumbnail(image_path, thumb_path)
-        if not result:
-            return None
-
-        return f"/static/thumbnails/{thumb_filename}"
+    def _shared_project_file(self):
+        return self.project_path / SHARED_PROJECT_FILENAME
 
-    def get_video_thumbnail_path(self, video_path, shot_name, generate=True):
-        """Return (and optionally create) the thumbnail for a video.
+    def shot_artists(self):
+        """Return ``{shot_name: {'id', 'name'}}`` from the shared project file.
 
-        Args:
-            video_path: Path to the source video
-            shot_name: Name of the shot
-            generate: If True, generate thumbnail if missing. If False, return None for missing.
+        The file is re-read only when its modification time changes.
         """
-        if not video_path:
-            return None
+        mtime = self._mtime_ns(self._shared_project_file())
+        cached_mtime, artists = self._artists
+        if mtime == cached_mtime:
+            return artists
+        try:
+            with open(self._shared_project_file(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read shared project data: %s", e)
+            return artists
+        by_id = {a.get('id'): a for a in data.get('artists', []) if isinstance(a, dict)}
+        artists = {
+            shot: {'id': artist_id, 'name': by_id[artist_id].get('name', '')}
+            for shot, artist_id in data.get('shot_artists', {}).items()
+            if artist_id in by_id
+        }
+        self._artists = (mtime, artists)
+        return artists
 
-        video_path = Path(video_path)
-        project_name = self.project_path.name
-        thumb_filename = f"{project_name}_{shot_name}_{video_path.stem}_vthumb.jpg"
-        thumb_path = THUMBNAIL_CACHE_DIR / thumb_filename
+    def query_shots(self, filters):
+        """Return the names of shots matching ``filters``.
 
-        if thumb_path.exists():
-            return f"/static/thumbnails/{thumb_filename}"
+        ``filters`` comes from :func:`shot_filter.parse_filters`.  Facts are
+        cached per shot and dropped by the change log; without a running
+        watcher every query revalidates the shots like a listing does.
+        """
+        names = [n for n in self._shot_names() if SHOT_NAME_RE.match(n)]
+        watching = self._watcher is not None and self._watcher.running
+        with self._facts_lock:
+            facts = {n: self._facts[n] for n in names if watching and n in self._facts}
+        missing = [n for n in names if n not in facts]
+        if missing:
+            records = self._load_records(missing)
+            computed = {n: shot_facts(records[n]) for n in missing}
+            with self._facts_lock:
+                self._facts.update(computed)
+            facts.update(computed)
+        artists = self.shot_artists()
+        return [n for n in names
+                if matches(dict(facts[n], artist=artists.get(n)), filters)]
+
+    def _search_stamp(self, shot_name, prompt_stamp):
+        notes_mtime = self._mtime_ns(self.wip_dir / shot_name / 'notes.txt')
+        return f'{notes_mtime}|{prompt_stamp or ""}'
+
+    def _index_search_doc(self, shot_name, artists=None, prompt_stamp=None):
+        """Rewrite the search document of one shot, or drop it if gone."""
+        shot_dir = self.wip_dir / shot_name
+        if not shot_dir.is_dir():
+            self._search.delete(shot_name)
+            return
+        if artists is None:
+            artists = self.shot_artists()
+        if prompt_stamp is None:
+            prompt_stamp = self._prompts.stamps(shot_name).get(shot_name)
+        prompts = '\n'.join(
+            entry['prompt']
+            for entries in self._prompts.history(shot_name).values()
+            for entry in entries
+        )
+        self._search.put(shot_name, self._search_stamp(shot_name, prompt_stamp),
+                         artists.get(shot_name, {}).get('name', ''),
+                         self._load_shot_notes(shot_dir), prompts)
 
-        if not generate:
-            return None
+    def _sync_search_index(self):
+        """Bring the search index up to date before a search.
 
-        result = create_video_thumbnail(video_path, thumb_path)
-        if not result:
-            return None
+        The first search in a process compares every shot's stamp (notes
+        mtime and prompt stamp) with the index and rewrites stale documents;
+        after that the change log keeps it current.  Artist assignments are
+        re-read whenever the shared project file changes.
+        """
+        with self._search_lock:
+            artists_mtime = self._mtime_ns(self._shared_project_file())
+            if not self._search_synced:
+                artists = self.shot_artists()
+                indexed = self._search.stamps()
+                prompt_stamps = self._prompts.stamps()
+                names = [n for n in self._shot_names() if SHOT_NAME_RE.match(n)]
+                stale = [n for n in names
+                         if indexed.get(n) != self._search_stamp(n, prompt_stamps.get(n))]
+                for shot_name in stale:
+                    self._index_search_doc(shot_name, artists, prompt_stamps.get(shot_name))
+                for shot_name in set(indexed) - set(names):
+                    self._search.delete(shot_name)
+                if stale:
+                    logger.info("Indexed %d shot(s) for search", len(stale))
+                self._search_synced = True
+            elif artists_mtime == self._search_artists_mtime:
+                return
+            self._search.set_artists(
+                {shot: artist['name'] for shot, artist in self.shot_artists().items()})
+            self._search_artists_mtime = artists_mtime
+
+    def search(self, query, limit=50):
+        """Search shot names, notes, prompts and artists.
 
-        return f"/static/thumbnails/{thumb_filename}"
+        Returns:
+            list of ``{'name', 'snippet', 'score'}``, best match first.
+        """
+        self._sync_search_index()
+        return self._search.search(query, limit)
 
 def get_shot_manager(project_path, cache=None):
     """Retrieve a cached ``ShotManager`` for the given path."""
@@ -827,9 +1824,16 @@ def get_shot_manager(project_path, cache=None):
         cache = current_app.config.setdefault('SHOT_MANAGER_CACHE', {})
 
     path_key = str(Path(project_path).resolve())
-    if path_key not in cache:
-        cache[path_key] = ShotManager(path_key)
-    return cache[path_key]
+    manager = cache.get(path_key)
+    if manager is not None:
+        return manager
+    with _manager_cache_lock:
+        manager = cache.get(path_key)
+        if manager is None:
+            manager = ShotManager(path_key)
+            manager.start()
+            cache[path_key] = manager
+    return manager
 
 
 def clear_shot_manager_cache(cache=None):
@@ -840,4 +1844,7 @@ def clear_shot_manager_cache(cache=None):
         cache = current_app.config.get('SHOT_MANAGER_CACHE')
 
     if cache is not None:
-        cache.clear()
+        with _manager_cache_lock:
+            for manager in cache.values():
+                manager.close()
+            cache.clear()
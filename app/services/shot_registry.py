@@ -0,0 +1,177 @@
+"""In-memory registry of the shot names in a project's WIP folder.
+
+Shot numbering (next shot, gap between two shots, next sub-shot) only needs
+the set of existing names, not any shot metadata.  The registry keeps those
+names sorted, together with the top-level numbers and the sub-shot numbers
+per base shot, so each numbering question is a bisect instead of a
+directory listing.
+
+The registry trusts itself as long as the mtime of ``wip/`` is the one it
+last saw; any other change to the folder (shots created in Explorer, a
+rename by another user) triggers one rescan.  Changes made through
+ShotManager are applied in place with :meth:`add` and :meth:`remove`.
+"""
+
+from bisect import bisect_right, insort
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_NAME_RE = re.compile(r'^SH(\d{3})(?:_(\d{3}))?$')
+
+
+class ShotRegistry:
+    """Sorted shot names of one WIP folder, revalidated by its mtime."""
+
+    def __init__(self, wip_dir):
+        self.wip_dir = wip_dir
+        self._lock = threading.RLock()
+        self._mtime = None
+        self._names = []
+        # Sorted top-level shot numbers (SH010 -> 10).
+        self._numbers = []
+        # {base number: sorted sub-shot numbers} (SH010_050 -> {10: [50]}).
+        self._subshots = {}
+
+    def _wip_mtime(self):
+        try:
+            return os.stat(self.wip_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self):
+        try:
+            with os.scandir(self.wip_dir) as it:
+                names = [e.name for e in it if e.name.startswith('SH') and e.is_dir()]
+        except FileNotFoundError:
+            names = []
+        self._names = []
+        self._numbers = []
+        self._subshots = {}
+        for name in sorted(names):
+            self._insert(name)
+
+    def _refresh(self):
+        mtime = self._wip_mtime()
+        if mtime is None or mtime != self._mtime:
+            self._scan()
+            self._mtime = mtime
+
+    def _insert(self, name):
+        index = bisect_right(self._names, name)
+        if index and self._names[index - 1] == name:
+            return
+        self._names.insert(index, name)
+        m = _NAME_RE.match(name)
+        if not m:
+            return
+        number = int(m.group(1))
+        if m.group(2) is None:
+            insort(self._numbers, number)
+        else:
+            insort(self._subshots.setdefault(number, []), int(m.group(2)))
+
+    def _discard(self, name):
+        index = bisect_right(self._names, name) - 1
+        if index < 0 or self._names[index] != name:
+            return
+        del self._names[index]
+        m = _NAME_RE.match(name)
+        if not m:
+            return
+        number = int(m.group(1))
+        values = self._numbers if m.group(2) is None else self._subshots.get(number, [])
+        value = number if m.group(2) is None else int(m.group(2))
+        pos = bisect_right(values, value) - 1
+        if pos >= 0 and values[pos] == value:
+            del values[pos]
+        if m.group(2) is not None and not values:
+            self._subshots.pop(number, None)
+
+    def _adopt_mtime(self, fresh):
+        # Take over the new mtime so our own change does not force a
+        # rescan; a registry that was never validated stays unvalidated.
+        self._mtime = self._wip_mtime() if fresh else None
+
+    def add(self, name):
+        """Record a shot folder created by this process."""
+        with self._lock:
+            fresh = self._mtime is not None
+            self._insert(name)
+            self._adopt_mtime(fresh)
+
+    def remove(self, name):
+        """Record a shot folder removed by this process."""
+        with self._lock:
+            fresh = self._mtime is not None
+            self._discard(name)
+            self._adopt_mtime(fresh)
+
+    def rename(self, old_name, new_name):
+        with self._lock:
+            fresh = self._mtime is not None
+            self._discard(old_name)
+            self._insert(new_name)
+            self._adopt_mtime(fresh)
+
+    def names(self):
+        """Return the sorted shot folder names."""
+        with self._lock:
+            self._refresh()
+            return list(self._names)
+
+    def cached_names(self):
+        """Return the shot names known before any pending rescan, or ``None``.
+
+        Lets the watcher tell a new shot folder from one it already knew;
+        ``None`` means the folder has never been scanned.
+        """
+        with self._lock:
+            return set(self._names) if self._mtime is not None else None
+
+    def __contains__(self, name):
+        with self._lock:
+            self._refresh()
+            index = bisect_right(self._names, name) - 1
+            return index >= 0 and self._names[index] == name
+
+    def has_number(self, number):
+        """Return True if top-level shot ``number`` exists."""
+        with self._lock:
+            self._refresh()
+            index = bisect_right(self._numbers, number) - 1
+            return index >= 0 and self._numbers[index] == number
+
+    def last_number(self):
+        """Return the highest top-level shot number, or ``None``."""
+        with self._lock:
+            self._refresh()
+            return self._numbers[-1] if self._numbers else None
+
+    def first_number(self):
+        """Return the lowest shot number including sub-shot bases, or ``None``."""
+        with self._lock:
+            self._refresh()
+            # Names are zero-padded, so the first valid name has the lowest base.
+            for name in self._names:
+                m = _NAME_RE.match(name)
+                if m:
+                    return int(m.group(1))
+            return None
+
+    def number_after(self, number):
+        """Return the next top-level shot number above ``number``, or ``None``."""
+        with self._lock:
+            self._refresh()
+            index = bisect_right(self._numbers, number)
+            return self._numbers[index] if index < len(self._numbers) else None
+
+    def last_subshot(self, number):
+        """Return the highest sub-shot number under shot ``number``, or ``None``."""
+        with self._lock:
+            self._refresh()
+            subs = self._subshots.get(number)
+            return subs[-1] if subs else None
@@ -0,0 +1,241 @@
+"""Background thumbnail production.
+
+Reading shot or reference metadata never decodes media.  Code that wants a
+thumbnail queues it here and gets back the URL it will be served under;
+the thumbnail routes wait for a queued thumbnail before answering, so the
+URL resolves as soon as a worker has rendered it.  Requests for a
+thumbnail that is already queued share the pending job.
+
+Image thumbnails are decoded and resized in a pool of worker processes,
+so a freshly opened project uses every core instead of one thread
+holding the GIL.  Video thumbnails are extracted by ffmpeg, itself a
+separate process; a small thread pool bounds how many run at once.
+"""
+
+from concurrent.futures import (
+    CancelledError, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError)
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+
+from .event_bus import publish_event
+from ..config.app_config import config_float, config_int
+from ..config.constants import THUMBNAIL_CACHE_DIR
+from ..utils import create_image_thumbnail, create_video_thumbnail
+
+logger = logging.getLogger(__name__)
+
+# Processes rendering image thumbnails (0: one per CPU core) and ffmpeg
+# runs at a time; see the [thumbnails] section of shotbuddy.cfg.
+DEFAULT_THUMBNAIL_PROCESSES = 0
+DEFAULT_FFMPEG_WORKERS = 2
+
+# Seconds a thumbnail route waits for a queued thumbnail before giving up.
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+
+def thumbnail_url(thumb_key):
+    return f"/static/thumbnails/{thumb_key}"
+
+
+def pending_thumbnail_url(thumb_key):
+    """URL that waits for a queued shot thumbnail, then serves it."""
+    return f"/api/shots/thumbnail/{thumb_key}"
+
+
+def _is_video_key(thumb_key):
+    return thumb_key.endswith('_vthumb.jpg')
+
+
+def render_thumbnail(source, thumb_key):
+    """Render ``source`` into the thumbnail cache as ``thumb_key``.
+
+    Returns the thumbnail path, or ``None`` on failure.
+    """
+    thumb_path = THUMBNAIL_CACHE_DIR / thumb_key
+    if _is_video_key(thumb_key):
+        return create_video_thumbnail(source, thumb_path)
+    return create_image_thumbnail(source, thumb_path)
+
+
+class ThumbnailQueue:
+    """Deduplicating thumbnail renderer keyed by thumbnail filename.
+
+    Image keys go to a process pool, video keys to a thread pool running
+    ffmpeg.  If the process pool cannot be started or breaks (a worker
+    died), it is shut down and images are rendered on the ffmpeg threads
+    from then on.
+    """
+
+    def __init__(self, processes=None, ffmpeg_workers=None):
+        self._processes = processes
+        self._ffmpeg_workers = ffmpeg_workers
+        self._process_pool = None
+        # Set once the process pool has failed; images then stay on threads.
+        self._processes_failed = False
+        self._executor = None
+        self._lock = threading.RLock()
+        self._pending = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            workers = self._ffmpeg_workers or config_int(
+                'thumbnails', 'ffmpeg_workers',
+                config_int('thumbnails', 'workers', DEFAULT_FFMPEG_WORKERS))
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, workers), thread_name_prefix='thumbnail')
+        return self._executor
+
+    def _get_process_pool(self):
+        if self._process_pool is None:
+            processes = self._processes or config_int(
+                'thumbnails', 'processes', DEFAULT_THUMBNAIL_PROCESSES)
+            if processes <= 0:
+                processes = os.cpu_count() or 1
+            # Spawned rather than forked: forking a process with running
+            # threads can copy a held lock into the child.
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+        return self._process_pool
+
+    def _fail_process_pool(self, error):
+        """Shut the process pool down for good; images render on threads."""
+        with self._lock:
+            if self._processes_failed:
+                return
+            self._processes_failed = True
+            pool, self._process_pool = self._process_pool, None
+        logger.warning("Thumbnail processes unavailable (%s); rendering in threads", error)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_render(self, source, thumb_key):
+        if not _is_video_key(thumb_key) and not self._processes_failed:
+            try:
+                return self._get_process_pool().submit(
+                    create_image_thumbnail, source, str(THUMBNAIL_CACHE_DIR / thumb_key))
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                self._fail_process_pool(e)
+        return self._get_executor().submit(render_thumbnail, source, thumb_key)
+
+    def submit(self, source, thumb_key, on_done=None):
+        """Queue ``source`` for rendering unless ``thumb_key`` is already queued.
+
+        A job that has already started rendering is not reused, since it
+        may have read the file before it was replaced.  ``on_done(path_or_none)``
+        is called once when a newly queued job finishes.  Returns the job's
+        future.
+        """
+        with self._lock:
+            future = self._pending.get(thumb_key)
+            if future is not None and not (future.running() or future.done()):
+                return future
+            future = self._submit_render(str(source), thumb_key)
+            self._pending[thumb_key] = future
+        future.add_done_callback(lambda f: self._finished(thumb_key, f, on_done))
+        return future
+
+    def _finished(self, thumb_key, future, on_done):
+        with self._lock:
+            if self._pending.get(thumb_key) is future:
+                del self._pending[thumb_key]
+        if future.cancelled():
+            # Dropped by a pool shutdown; nothing was rendered.
+            return
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._fail_process_pool(future.exception())
+        if on_done is None:
+            return
+        try:
+            on_done(future.result())
+        except Exception as e:
+            logger.warning("Thumbnail callback for %s failed: %s", thumb_key, e)
+
+    def is_pending(self, thumb_key):
+        with self._lock:
+            return thumb_key in self._pending
+
+    def wait(self, thumb_key, timeout=None):
+        """Wait for a queued thumbnail; return True if it exists afterwards."""
+        with self._lock:
+            future = self._pending.get(thumb_key)
+        if future is not None:
+            if timeout is None:
+                timeout = config_float('thumbnails', 'wait_timeout', DEFAULT_WAIT_TIMEOUT)
+            try:
+                future.result(timeout=timeout)
+            except (TimeoutError, CancelledError):
+                return False
+            except Exception as e:
+                logger.warning("Thumbnail job %s failed: %s", thumb_key, e)
+        return (THUMBNAIL_CACHE_DIR / thumb_key).is_file()
+
+    def as_completed(self, thumb_keys, timeout=None):
+        """Yield ``(thumb_key, exists)`` for each key as its render finishes.
+
+        Keys that are not queued are yielded first.  If no render finishes
+        for ``timeout`` seconds (default ``[thumbnails] wait_timeout``) the
+        remaining keys are yielded as missing.
+        """
+        if timeout is None:
+            timeout = config_float('thumbnails', 'wait_timeout', DEFAULT_WAIT_TIMEOUT)
+        finished = queue.SimpleQueue()
+        with self._lock:
+            futures = {key: self._pending.get(key) for key in thumb_keys}
+        for key, future in futures.items():
+            if future is None:
+                finished.put(key)
+            else:
+                future.add_done_callback(lambda f, key=key: finished.put(key))
+        remaining = set(futures)
+        while remaining:
+            try:
+                key = finished.get(timeout=timeout)
+            except queue.Empty:
+                break
+            remaining.discard(key)
+            yield key, (THUMBNAIL_CACHE_DIR / key).is_file()
+        for key in remaining:
+            yield key, False
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            process_pool, self._process_pool = self._process_pool, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared by every project in the process.
+THUMBNAIL_QUEUE = ThumbnailQueue()
+
+
+def queue_thumbnail(project_path, source, thumb_key, shot=None, asset=None, url=None,
+                    force=False):
+    """Queue a thumbnail and return the URL it resolves at.
+
+    Cached thumbnails return their static URL without queueing anything
+    unless ``force`` is set (the source file was replaced).
+    When ``shot`` and ``asset`` are given a ``thumbnail`` event is
+    published once the file is ready.  ``url`` overrides the pending URL
+    (reference thumbnails are served by their own route).
+    """
+    if not source or not thumb_key:
+        return None
+    if (not force and (THUMBNAIL_CACHE_DIR / thumb_key).is_file()
+            and not THUMBNAIL_QUEUE.is_pending(thumb_key)):
+        return url or thumbnail_url(thumb_key)
+
+    def on_done(path):
+        if path and shot and asset:
+            publish_event(project_path, 'thumbnail', shot=shot, asset=asset,
+                          url=thumbnail_url(Path(path).name))
+
+    THUMBNAIL_QUEUE.submit(source, thumb_key, on_done)
+    return url or pending_thumbnail_url(thumb_key)
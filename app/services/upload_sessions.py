@@ -0,0 +1,268 @@
+"""Resumable chunked uploads.
+
+Large renders are sent as a series of chunks instead of one request:
+
+1. ``POST /api/shots/uploads`` opens a session for a file of known size.
+2. ``PUT /api/shots/uploads/<id>?offset=N`` appends one chunk; its SHA-256
+   (``X-Chunk-Sha256``) or, from browsers without WebCrypto, its CRC-32
+   (``X-Chunk-Crc32``) is verified before the chunk is acknowledged.
+3. ``POST /api/shots/uploads/<id>/finalize`` hands the assembled file to
+   :class:`~.file_handler.FileHandler`, which versions it like any other
+   upload.
+
+Sessions live in ``<project>/.shotbuddy/uploads/<id>/`` (``session.json``
+plus the partial ``data.part``) so they survive a dropped connection, a
+reloaded tab or a server restart.  ``GET /api/shots/uploads/<id>`` tells a
+client where to resume.  Sessions untouched for ``[uploads] session_ttl_hours``
+are removed when a new one is opened.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zlib
+
+from .shot_index import INDEX_DIRNAME
+from ..config.app_config import config_float, config_int
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIRNAME = 'uploads'
+SESSION_FILENAME = 'session.json'
+DATA_FILENAME = 'data.part'
+
+# Chunk size suggested to clients, and the largest chunk accepted; see
+# the [uploads] section of shotbuddy.cfg.
+DEFAULT_CHUNK_SIZE_MB = 8
+DEFAULT_MAX_CHUNK_MB = 64
+
+# Hours before an abandoned session is removed.
+DEFAULT_SESSION_TTL_HOURS = 48
+
+# Bytes of a chunk read from the request at a time.
+_READ_SIZE = 1 << 20
+
+_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# {session directory: lock} serializing requests for one session.
+_session_locks = {}
+_session_locks_guard = threading.Lock()
+
+
+def _session_lock(directory):
+    with _session_locks_guard:
+        return _session_locks.setdefault(str(directory), threading.Lock())
+
+
+class _Crc32:
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f'{self.value:08x}'
+
+
+CHECKSUMS = {'sha256': hashlib.sha256, 'crc32': _Crc32}
+
+
+class UploadNotFound(KeyError):
+    """No session with the given id exists (or it expired)."""
+
+
+class UploadOffsetError(ValueError):
+    """A chunk does not start where the session left off."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class UploadSessions:
+    """Chunked upload sessions of one project."""
+
+    def __init__(self, project_path):
+        self.root = Path(project_path) / INDEX_DIRNAME / UPLOADS_DIRNAME
+
+    @staticmethod
+    def chunk_size():
+        return max(1, config_int('uploads', 'chunk_size_mb', DEFAULT_CHUNK_SIZE_MB)) << 20
+
+    @staticmethod
+    def max_chunk_size():
+        return max(1, config_int('uploads', 'max_chunk_mb', DEFAULT_MAX_CHUNK_MB)) << 20
+
+    def _dir(self, upload_id):
+        if not upload_id or not _ID_RE.match(upload_id):
+            raise UploadNotFound(upload_id)
+        return self.root / upload_id
+
+    def _load(self, directory):
+        try:
+            with open(directory / SESSION_FILENAME, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadNotFound(directory.name)
+
+    def _save(self, directory, state):
+        state['updated_at'] = datetime.now().isoformat()
+        tmp_path = directory / (SESSION_FILENAME + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, directory / SESSION_FILENAME)
+
+    @staticmethod
+    def _status(state):
+        return {
+            'upload_id': state['id'],
+            'offset': state['offset'],
+            'size': state['size'],
+            'chunk_size': state['chunk_size'],
+            'filename': state['filename'],
+            'shot_name': state['shot_name'],
+            'file_type': state['file_type'],
+            'complete': state['offset'] == state['size'],
+        }
+
+    def create(self, shot_name, file_type, filename, size, custom_label=None):
+        """Open a session for a ``size``-byte file; return its status."""
+        if size < 0:
+            raise ValueError("Invalid upload size")
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        directory = self._dir(upload_id)
+        directory.mkdir(parents=True)
+        (directory / DATA_FILENAME).touch()
+        state = {
+            'id': upload_id,
+            'shot_name': shot_name,
+            'file_type': file_type,
+            'filename': filename,
+            'custom_label': custom_label,
+            'size': size,
+            'offset': 0,
+            'chunk_size': self.chunk_size(),
+            'created_at': datetime.now().isoformat(),
+        }
+        self._save(directory, state)
+        logger.info("Opened upload %s for %s (%d bytes)", upload_id, filename, size)
+        return self._status(state)
+
+    def status(self, upload_id):
+        return self._status(self._load(self._dir(upload_id)))
+
+    def write_chunk(self, upload_id, offset, stream, length, checksum, algorithm='sha256'):
+        """Append ``length`` bytes from ``stream`` at ``offset``.
+
+        ``checksum`` is the hex digest of the chunk with ``algorithm`` (a
+        key of :data:`CHECKSUMS`).  A chunk that arrives short or does not
+        match its checksum is discarded and the session stays at
+        ``offset``.  Returns the session status.
+
+        Raises:
+            UploadOffsetError: If ``offset`` is not the session's offset.
+            ValueError: If the chunk is too large, short or corrupt.
+        """
+        directory = self._dir(upload_id)
+        with _session_lock(directory):
+            state = self._load(directory)
+            if offset != state['offset']:
+                raise UploadOffsetError(
+                    f"Expected a chunk at offset {state['offset']}, got {offset}",
+                    self._status(state))
+            if length is None or length <= 0:
+                raise ValueError("Chunk length required")
+            if length > self.max_chunk_size():
+                raise ValueError("Chunk too large")
+            if offset + length > state['size']:
+                raise ValueError("Chunk extends past the end of the file")
+            if not checksum or algorithm not in CHECKSUMS:
+                raise ValueError("Chunk checksum required")
+
+            h = CHECKSUMS[algorithm]()
+            received = 0
+            with open(directory / DATA_FILENAME, 'r+b') as f:
+                # Drop bytes of an earlier chunk that was never acknowledged.
+                f.truncate(offset)
+                f.seek(offset)
+                try:
+                    while received < length:
+                        data = stream.read(min(_READ_SIZE, length - received))
+                        if not data:
+                            break
+                        f.write(data)
+                        h.update(data)
+                        received += len(data)
+                    if received != length:
+                        raise ValueError(f"Incomplete chunk: got {received} of {length} bytes")
+                    if h.hexdigest() != checksum.strip().lower():
+                        raise ValueError("Chunk checksum mismatch")
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    f.truncate(offset)
+                    raise
+
+            state['offset'] = offset + length
+            self._save(directory, state)
+            return self._status(state)
+
+    def finalize(self, upload_id, handler):
+        """Pass the complete file to ``handler(path, session)`` and close the session.
+
+        ``handler`` moves the file away (see ``FileHandler.save_staged``);
+        its return value is returned.  If it fails after taking the file
+        the session is removed, since there is nothing left to resume.
+        """
+        directory = self._dir(upload_id)
+        with _session_lock(directory):
+            state = self._load(directory)
+            if state['offset'] != state['size']:
+                raise UploadOffsetError(
+                    f"Upload incomplete: {state['offset']} of {state['size']} bytes",
+                    self._status(state))
+            data_path = directory / DATA_FILENAME
+            try:
+                result = handler(data_path, dict(state))
+            finally:
+                if not data_path.exists():
+                    shutil.rmtree(directory, ignore_errors=True)
+            return result
+
+    def abort(self, upload_id):
+        directory = self._dir(upload_id)
+        with _session_lock(directory):
+            if not directory.is_dir():
+                raise UploadNotFound(upload_id)
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def expire(self):
+        """Remove sessions untouched for longer than the configured TTL."""
+        ttl = config_float('uploads', 'session_ttl_hours', DEFAULT_SESSION_TTL_HOURS) * 3600
+        cutoff = time.time() - ttl
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if not entry.is_dir() or not _ID_RE.match(entry.name):
+                continue
+            try:
+                touched = os.stat(Path(entry.path) / SESSION_FILENAME).st_mtime
+            except OSError:
+                touched = entry.stat().st_mtime
+            if touched < cutoff:
+                logger.info("Removing expired upload %s", entry.name)
+                shutil.rmtree(entry.path, ignore_errors=True)
@@ -0,0 +1,231 @@
+"""Single-pass streaming of uploaded files.
+
+An upload used to be spooled by the request parser, copied to its WIP
+path, copied again into the latest folder and finally reopened to look
+for an embedded prompt.  :func:`stream_to_temp` reads the request body
+once, in large chunks, into a temporary file in the destination folder.
+The same pass computes the content digest recorded in the version
+manifest, keeps the first bytes for type sniffing and parses PNG text
+chunks, so the finished file only has to be renamed to its versioned
+name.  Memory use is bounded by the chunk size whatever the upload size.
+
+Files ingested by path (:func:`ingest_file`) are not read through at
+all: only their header and PNG text chunks are read, and the data is
+placed with :func:`.materialize.transfer`.  Their digest is computed
+later by the background rehash.
+"""
+
+from pathlib import Path
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from .materialize import transfer
+from .prompt_importer import PngTextReader
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the request body at a time.
+UPLOAD_CHUNK_SIZE = 8 << 20
+
+# Leading bytes kept for sniffing the file type.
+HEADER_SIZE = 64 << 10
+
+TEMP_PREFIX = '.upload-'
+TEMP_SUFFIX = '.part'
+
+# mkstemp() creates files readable by the owner only; uploaded files get
+# the permissions a plain open() would have given them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_IMAGE_BRANDS = {b'avif', b'avis', b'heic', b'heix', b'mif1', b'msf1'}
+_AUDIO_BRANDS = {b'M4A ', b'M4B ', b'M4P '}
+
+
+def sniff_kind(header):
+    """Return ``'image'``, ``'video'`` or ``'audio'`` from leading bytes, or ``None``."""
+    if header.startswith(b'\x89PNG\r\n\x1a\n') or header.startswith(b'\xff\xd8\xff'):
+        return 'image'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image'
+    if header[:4] == b'RIFF':
+        return {b'WEBP': 'image', b'AVI ': 'video', b'WAVE': 'audio'}.get(header[8:12])
+    if header[4:8] == b'ftyp':
+        brand = header[8:12]
+        if brand in _IMAGE_BRANDS:
+            return 'image'
+        return 'audio' if brand in _AUDIO_BRANDS else 'video'
+    if header[4:8] in (b'moov', b'mdat', b'free', b'wide'):
+        return 'video'
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'video'
+    if header.startswith((b'ID3', b'fLaC', b'OggS')):
+        return 'audio'
+    if len(header) >= 2 and header[0] == 0xff and header[1] & 0xe0 == 0xe0:
+        return 'audio'
+    return None
+
+
+class StreamedUpload:
+    """A request body written to a temporary file."""
+
+    def __init__(self, tmp_path, size, digest, header, text, source=None):
+        self.tmp_path = tmp_path
+        self.size = size
+        self.digest = digest
+        self.header = header
+        self.kind = sniff_kind(header)
+        # PNG text chunks ({keyword: text}); empty for other files.
+        self.text = text
+        # File the data was moved from (ingest with ``move``); it is put
+        # back rather than deleted if the upload is discarded.
+        self.source = source
+
+    def discard(self):
+        if self.source is None:
+            self.tmp_path.unlink(missing_ok=True)
+            return
+        try:
+            shutil.move(self.tmp_path, self.source)
+        except OSError as e:
+            logger.error("Cannot move %s back to %s; leaving it in place: %s",
+                         self.tmp_path, self.source, e)
+
+
+class _Scanner:
+    """Digest, header and PNG text of data seen one chunk at a time."""
+
+    def __init__(self, png_text):
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.header = bytearray()
+        self.reader = PngTextReader() if png_text else None
+        self.size = 0
+
+    def update(self, chunk):
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        if len(self.header) < HEADER_SIZE:
+            self.header += chunk[:HEADER_SIZE - len(self.header)]
+        if self.reader is not None and not self.reader.done:
+            self.reader.feed(chunk)
+
+    def result(self, tmp_path):
+        return StreamedUpload(tmp_path, self.size, self.hash.hexdigest(), bytes(self.header),
+                              self.reader.text if self.reader is not None else {})
+
+
+def fsync_dir(directory):
+    """Flush a directory entry change (a rename into ``directory``) to disk.
+
+    A no-op where directories cannot be opened (Windows).
+    """
+    if os.name != 'posix':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.debug("Cannot fsync %s: %s", directory, e)
+    finally:
+        os.close(fd)
+
+
+def stream_to_temp(stream, dest_dir, png_text=False):
+    """Copy ``stream`` into a temporary file in ``dest_dir`` in one pass.
+
+    The file is flushed to disk before returning so the caller's rename
+    publishes complete content.  Set ``png_text`` to collect PNG text
+    chunks while streaming.  The temporary file is removed on error.
+    """
+    fd, tmp = tempfile.mkstemp(dir=dest_dir, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+    tmp_path = Path(tmp)
+    scanner = _Scanner(png_text)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                scanner.update(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return scanner.result(tmp_path)
+
+
+def adopt_file(path, dest_dir, png_text=False):
+    """Move a finished file (an assembled chunked upload) into ``dest_dir``.
+
+    The file is read once for its digest, header and PNG text, then
+    renamed to a temporary name in ``dest_dir``; across filesystems it is
+    copied with :func:`stream_to_temp` instead.  ``path`` is gone afterwards.
+    """
+    path = Path(path)
+    scanner = _Scanner(png_text)
+    buf = bytearray(UPLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            scanner.update(view[:n])
+    fd, tmp = tempfile.mkstemp(dir=dest_dir, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+    os.close(fd)
+    tmp_path = Path(tmp)
+    try:
+        os.replace(path, tmp_path)
+    except OSError as e:
+        tmp_path.unlink(missing_ok=True)
+        logger.debug("Cannot rename %s into %s (%s); copying", path, dest_dir, e)
+        with open(path, 'rb') as f:
+            upload = stream_to_temp(f, dest_dir, png_text)
+        path.unlink(missing_ok=True)
+        return upload
+    os.chmod(tmp_path, 0o666 & ~_UMASK)
+    return scanner.result(tmp_path)
+
+
+def read_header(path, png_text=False):
+    """Return ``(header, png_text_chunks)`` of a file without reading it all."""
+    reader = PngTextReader() if png_text else None
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+        if reader is not None:
+            chunk = header
+            while chunk and not reader.done:
+                reader.feed(chunk)
+                chunk = f.read(HEADER_SIZE)
+    return header, reader.text if reader is not None else {}
+
+
+def ingest_file(src, dest_dir, png_text=False, move=False):
+    """Bring server-side file ``src`` into ``dest_dir`` under a temporary name.
+
+    The returned upload has no digest.  With ``move`` the source is gone
+    afterwards, until the upload is discarded (which moves it back).
+    """
+    src = Path(src)
+    header, text = read_header(src, png_text)
+    fd, tmp = tempfile.mkstemp(dir=dest_dir, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+    os.close(fd)
+    tmp_path = Path(tmp)
+    tmp_path.unlink()
+    try:
+        strategy = transfer(src, tmp_path, move=move)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    logger.info("Ingested %s with %s", src, strategy)
+    return StreamedUpload(tmp_path, tmp_path.stat().st_size, None, header, text,
+                          source=src if move else None)
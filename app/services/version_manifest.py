@@ -0,0 +1,354 @@
+"""Active-version markers for files copied into latest folders.
+
+Whenever a WIP version is copied into ``latest_images``/``latest_videos``
+(or a reference image into ``ref-images/latest``) a small JSON manifest
+records which version it came from together with the latest file's size,
+mtime and a quick content digest.  Listings can then tell which version is
+active from one ``stat`` instead of comparing media files byte by byte.
+
+Manifests live in ``<project>/.shotbuddy/manifests`` and are rebuildable:
+when one is missing or no longer matches the latest file, the active
+version is recovered by size and quick digest and the marker is rewritten.
+
+Shot manifests also hold a full BLAKE2 *content digest* of every WIP
+version, computed when the version is ingested, so sync can tell a
+same-size re-render from the file it copied without reading media.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .shot_index import INDEX_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIRNAME = 'manifests'
+
+# Bytes hashed from each end of a file by quick_digest().
+QUICK_DIGEST_CHUNK = 1 << 20
+
+# Read buffer used by content_digest().
+CONTENT_DIGEST_BUFFER = 8 << 20
+
+_write_lock = threading.Lock()
+
+# {manifest path: lock} held across a read-modify-write of one manifest.
+_manifest_locks = {}
+_manifest_locks_guard = threading.Lock()
+
+
+def _manifest_lock(path):
+    with _manifest_locks_guard:
+        return _manifest_locks.setdefault(str(path), threading.RLock())
+
+
+def quick_digest(path):
+    """Return a fast fingerprint of ``path`` without reading all of it.
+
+    Hashes the file size together with the first and last megabyte, which
+    is enough to tell apart renders of the same length without streaming
+    multi-gigabyte videos.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        h.update(str(size).encode())
+        h.update(f.read(QUICK_DIGEST_CHUNK))
+        if size > 2 * QUICK_DIGEST_CHUNK:
+            f.seek(-QUICK_DIGEST_CHUNK, os.SEEK_END)
+            h.update(f.read(QUICK_DIGEST_CHUNK))
+        elif size > QUICK_DIGEST_CHUNK:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def content_digest(path, rate=None):
+    """Return a BLAKE2 digest of the whole of ``path``.
+
+    Reads into one large reusable buffer.  ``rate`` caps the read speed in
+    bytes per second so background rehashing does not starve other I/O.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    buf = bytearray(CONTENT_DIGEST_BUFFER)
+    view = memoryview(buf)
+    started = time.monotonic()
+    total = 0
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+            total += n
+            if rate:
+                ahead = total / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+    return h.hexdigest()
+
+
+def manifest_dir(project_path):
+    return Path(project_path) / INDEX_DIRNAME / MANIFEST_DIRNAME
+
+
+class VersionManifest:
+    """Per-shot (or per-reference-library) manifest of latest markers.
+
+    The file holds ``{"latest": {slot: entry}, "versions": {...}}`` where
+    each latest entry is::
+
+        {"version": int, "max_version": int, "file": str,
+         "size": int, "mtime_ns": int, "digest": str or None,
+         "content": str or None}
+
+    ``max_version`` is the highest WIP version at the time of the copy so
+    sync can tell a deliberate restore from a newer version arriving, and
+    ``content`` is the content digest of the data that was copied.
+    ``versions`` maps ``slot -> {"<version>": {"file", "size", "mtime_ns",
+    "digest"}}`` with the content digest of each WIP version; an entry
+    whose stat no longer matches the file is stale.
+    """
+
+    def __init__(self, project_path, key):
+        self.project_path = Path(project_path)
+        self.key = key
+        self.path = manifest_dir(project_path) / f"{key}.json"
+        self._data = None
+        self.dirty = False
+
+    def load(self):
+        if self._data is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except FileNotFoundError:
+                self._data = {}
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable manifest %s: %s", self.path, e)
+                self._data = {}
+            self._data.setdefault('latest', {})
+            self._data.setdefault('versions', {})
+        return self._data
+
+    @contextmanager
+    def locked(self):
+        """Hold this manifest's lock across a load, modify and save.
+
+        Request handlers, jobs, the rehash thread and the latest sync all
+        update shot manifests; without the lock one thread's save drops
+        markers or digests another wrote since it loaded.  The data is
+        re-read on entry.  The lock is reentrant.
+        """
+        with _manifest_lock(self.path):
+            if not self.dirty:
+                self._data = None
+            yield self
+
+    def save(self):
+        data = self.load()
+        try:
+            with _write_lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning("Failed to write manifest %s: %s", self.path, e)
+
+    def get_latest(self, slot):
+        return self.load()['latest'].get(slot)
+
+    def set_latest(self, slot, version, latest_path, source_path=None, max_version=None, digest=None,
+                   content=None):
+        """Record that ``latest_path`` is a copy of WIP ``version``.
+
+        ``content`` is the content digest of the copied data, if known.
+        """
+        latest_path = Path(latest_path)
+        try:
+            st = latest_path.stat()
+            if digest is None:
+                digest = quick_digest(source_path or latest_path)
+        except OSError as e:
+            logger.warning("Cannot record latest marker for %s: %s", latest_path, e)
+            return None
+        entry = {
+            'version': version,
+            'max_version': max(version, max_version or 0),
+            'file': latest_path.name,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'digest': digest,
+            'content': content,
+        }
+        self.put_latest(slot, entry)
+        return entry
+
+    def put_latest(self, slot, entry):
+        self.load()['latest'][slot] = entry
+        self.dirty = True
+
+    def version_digest(self, slot, version, path):
+        """Return the stored content digest of a WIP version, or ``None``.
+
+        ``None`` means the version was never hashed or the file changed
+        since; it needs a (background) rehash.
+        """
+        entry = self.load()['versions'].get(slot, {}).get(str(version))
+        return entry['digest'] if entry_matches(entry, path) else None
+
+    def set_version(self, slot, version, path, digest=None, rate=None):
+        """Hash WIP ``version`` at ``path`` (unless ``digest`` is given) and store it.
+
+        Returns the digest, or ``None`` if the file could not be read.
+        """
+        path = Path(path)
+        try:
+            st = path.stat()
+            if digest is None:
+                digest = content_digest(path, rate)
+        except OSError as e:
+            logger.warning("Cannot hash %s: %s", path, e)
+            return None
+        return self.put_version(slot, version, path, digest, st)
+
+    def put_version(self, slot, version, path, digest, st):
+        """Store ``digest``, computed while ``path`` had the stat result ``st``.
+
+        Nothing is stored when the file has changed since.
+        """
+        path = Path(path)
+        try:
+            current = path.stat()
+        except OSError:
+            return None
+        if (current.st_size, current.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+            return None
+        self.load()['versions'].setdefault(slot, {})[str(version)] = {
+            'file': path.name,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'digest': digest,
+        }
+        self.dirty = True
+        return digest
+
+    def retain_versions(self, slot, versions):
+        """Forget stored digests of versions no longer in ``versions``."""
+        stored = self.load()['versions'].get(slot)
+        if not stored:
+            return
+        for key in set(stored) - {str(v) for v in versions}:
+            del stored[key]
+            self.dirty = True
+
+    def drop_latest(self, slot):
+        if self.load()['latest'].pop(slot, None) is not None:
+            self.dirty = True
+
+    def rename(self, new_key):
+        """Move the manifest file to a new key (e.g. after a shot rename)."""
+        new_path = manifest_dir(self.project_path) / f"{new_key}.json"
+        try:
+            if self.path.exists():
+                os.replace(self.path, new_path)
+        except OSError as e:
+            logger.warning("Failed to rename manifest %s: %s", self.path, e)
+        self.key = new_key
+        self.path = new_path
+
+    def delete(self):
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("Failed to delete manifest %s: %s", self.path, e)
+        self._data = None
+
+
+def entry_matches(entry, latest_path, st=None):
+    """Return True if a manifest entry still describes ``latest_path``."""
+    if not entry:
+        return False
+    latest_path = Path(latest_path)
+    if entry.get('file') != latest_path.name:
+        return False
+    try:
+        st = st or latest_path.stat()
+    except OSError:
+        return False
+    return entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns
+
+
+def resolve_active_version(latest_path, versions, entry=None):
+    """Work out which WIP version ``latest_path`` is a copy of.
+
+    Args:
+        latest_path: Path of the file in the latest folder
+        versions: ``{version: Path}`` of WIP files
+        entry: Manifest entry for this slot, if any
+
+    Returns:
+        (active_version, rebuilt_entry) where *rebuilt_entry* is ``None``
+        when the manifest was valid, or a fresh entry to persist after the
+        fallback identified the version.  *active_version* falls back to
+        the highest version when nothing matches.
+    """
+    max_version = max(versions) if versions else 0
+    try:
+        st = Path(latest_path).stat()
+    except OSError:
+        return max_version, None
+
+    if entry_matches(entry, latest_path, st) and entry.get('version') in versions:
+        return entry['version'], None
+
+    # Fallback: only versions with the same size can match; compare quick
+    # digests when more than one candidate remains.
+    candidates = []
+    for ver in sorted(versions, reverse=True):
+        try:
+            if os.stat(versions[ver]).st_size == st.st_size:
+                candidates.append(ver)
+        except OSError:
+            continue
+
+    active = None
+    digest = None
+    if len(candidates) == 1:
+        active = candidates[0]
+    elif candidates:
+        try:
+            digest = quick_digest(latest_path)
+        except OSError:
+            return max_version, None
+        for ver in candidates:
+            try:
+                if quick_digest(versions[ver]) == digest:
+                    active = ver
+                    break
+            except OSError:
+                continue
+
+    if active is None:
+        return max_version, None
+
+    # Without a marker we cannot tell a deliberate restore from a stale
+    # copy, so max_version is pinned to the active version and sync keeps
+    # promoting newer WIP versions as before.
+    rebuilt = {
+        'version': active,
+        'max_version': active,
+        'file': Path(latest_path).name,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'digest': digest,
+    }
+    return active, rebuilt
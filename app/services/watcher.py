@@ -0,0 +1,325 @@
+"""Filesystem watcher that keeps a ShotManager's cached state current.
+
+Artists often drop renders straight into ``shots/wip/SH###`` from Explorer
+or pipeline scripts.  The watcher notices those changes, debounces them,
+maps every path to the shot it belongs to and asks the ShotManager to
+recompute only those shots, so listings stay correct at O(changes) cost.
+
+Two backends are available: inotify on Linux (via ctypes, no extra
+dependency) and a portable polling backend that compares directory and
+file signatures.  Network shares usually do not deliver inotify events
+for changes made by other machines; use ``backend = polling`` there.
+"""
+
+from pathlib import Path
+import ctypes
+import ctypes.util
+import logging
+import os
+import platform
+import select
+import struct
+import threading
+import time
+
+from .asset_scanner import list_files, shot_tokens
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see inotify(7)).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+SHOT_SUBDIRS = ('images', 'videos', 'lipsync')
+
+# Suffixes of files that are still being written (uploads, copies into the
+# latest folders, atomic rewrites).
+TEMP_SUFFIXES = ('.part', '.tmp', '~')
+
+
+def is_temp_name(name):
+    """Return True for dotfiles and temporary files, which never change a listing."""
+    return name.startswith('.') or name.endswith(TEMP_SUFFIXES)
+
+
+def classify_path(shots_dir, path):
+    """Map a changed path to ``[(shot_name, area)]``.
+
+    *area* is ``'image'``, ``'video'``, ``'lipsync'``, ``'notes'`` or
+    ``'shot'`` (the shot folder itself).  Files in the latest folders may
+    name several shots; paths outside the shots tree, dotfiles and
+    temporary files map to nothing.
+    """
+    try:
+        rel = Path(path).relative_to(shots_dir)
+    except ValueError:
+        return []
+    parts = rel.parts
+    if not parts or any(is_temp_name(part) for part in parts):
+        return []
+
+    if parts[0] == 'wip':
+        if len(parts) < 2 or not parts[1].startswith('SH'):
+            return []
+        shot_name = parts[1]
+        if len(parts) == 2:
+            return [(shot_name, 'shot')]
+        area = {'images': 'image', 'videos': 'video', 'lipsync': 'lipsync'}.get(parts[2])
+        if area:
+            return [(shot_name, area)]
+        if parts[2] == 'notes.txt':
+            return [(shot_name, 'notes')]
+        return [(shot_name, 'shot')]
+
+    area = {'latest_images': 'image', 'latest_videos': 'video'}.get(parts[0])
+    if area and len(parts) >= 2:
+        return [(token, area) for token in set(shot_tokens(Path(parts[1]).stem))]
+    return []
+
+
+class _InotifyBackend:
+    """Recursive inotify watches over the shots tree."""
+
+    name = 'inotify'
+
+    def __init__(self, shots_dir):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.shots_dir = Path(shots_dir)
+        self._wd_paths = {}
+        for directory in (self.shots_dir / 'wip',
+                          self.shots_dir / 'latest_images',
+                          self.shots_dir / 'latest_videos'):
+            self._add_tree(directory)
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            logger.debug("inotify_add_watch failed for %s: errno %s",
+                         directory, ctypes.get_errno())
+            return
+        self._wd_paths[wd] = Path(directory)
+
+    def _add_tree(self, directory):
+        """Watch ``directory`` and, inside wip/, its shot and asset folders."""
+        if not os.path.isdir(directory):
+            return
+        self._add_watch(directory)
+        directory = Path(directory)
+        depth = len(directory.relative_to(self.shots_dir).parts)
+        if directory.relative_to(self.shots_dir).parts[:1] != ('wip',) or depth >= 3:
+            return
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [e.path for e in it if e.is_dir()]
+        except OSError:
+            return
+        for sub in subdirs:
+            self._add_tree(sub)
+
+    def poll(self, timeout):
+        """Return changed paths, or ``None`` if the kernel queue overflowed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._wd_paths.pop(wd, None)
+                continue
+            base = self._wd_paths.get(wd)
+            if base is None:
+                continue
+            path = base / os.fsdecode(name) if name else base
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            paths.append(path)
+        return paths
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _PollingBackend:
+    """Portable fallback comparing directory and latest-file signatures."""
+
+    name = 'polling'
+
+    def __init__(self, shots_dir, interval):
+        self.shots_dir = Path(shots_dir)
+        self.interval = interval
+        self._state = self._snapshot()
+        self._last_snapshot = time.monotonic()
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _snapshot(self):
+        state = {}
+        wip_dir = self.shots_dir / 'wip'
+        try:
+            with os.scandir(wip_dir) as it:
+                shot_dirs = [e.path for e in it if e.name.startswith('SH') and e.is_dir()]
+        except OSError:
+            shot_dirs = []
+        for shot_dir in shot_dirs:
+            state[shot_dir] = self._mtime(shot_dir)
+            for sub in SHOT_SUBDIRS:
+                state[os.path.join(shot_dir, sub)] = self._mtime(os.path.join(shot_dir, sub))
+            notes = os.path.join(shot_dir, 'notes.txt')
+            state[notes] = self._mtime(notes)
+        for latest in ('latest_images', 'latest_videos'):
+            for _name, path in list_files(self.shots_dir / latest):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def poll(self, timeout):
+        # Rescan at most every ``interval`` seconds; shorter timeouts (the
+        # debounce) only bound how long this call blocks.
+        remaining = self.interval - (time.monotonic() - self._last_snapshot)
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            if time.monotonic() - self._last_snapshot < self.interval:
+                return []
+        current = self._snapshot()
+        self._last_snapshot = time.monotonic()
+        previous = self._state
+        self._state = current
+        return [Path(p) for p in set(previous) | set(current)
+                if previous.get(p) != current.get(p)]
+
+    def close(self):
+        pass
+
+
+class ShotWatcher:
+    """Background thread feeding debounced shot changes to a ShotManager."""
+
+    def __init__(self, shot_manager, backend='auto', debounce=0.5, poll_interval=5.0):
+        self.shot_manager = shot_manager
+        self.shots_dir = Path(shot_manager.shots_dir)
+        self.backend_name = backend
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._backend = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _create_backend(self):
+        if self.backend_name in ('auto', 'inotify') and platform.system() == 'Linux':
+            try:
+                return _InotifyBackend(self.shots_dir)
+            except (OSError, AttributeError) as e:
+                logger.info("inotify unavailable (%s); falling back to polling", e)
+        return _PollingBackend(self.shots_dir, self.poll_interval)
+
+    def start(self):
+        if self.running:
+            return
+        self._backend = self._create_backend()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"shot-watcher-{self.shots_dir.parent.name}", daemon=True)
+        self._thread.start()
+        logger.info("Watching %s with %s backend", self.shots_dir, self._backend.name)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+    def _classify(self, paths):
+        """Group changed paths by shot, dropping the manager's own writes.
+
+        Run after the debounce so that writes the manager finished during
+        the burst are recognised.
+        """
+        changes = {}
+        for path in paths:
+            if self.shot_manager.is_own_write(path):
+                continue
+            for shot_name, area in classify_path(self.shots_dir, path):
+                changes.setdefault(shot_name, set()).add(area)
+        return changes
+
+    def _run(self):
+        pending = set()
+        rescan = False
+        last_event = None
+        while not self._stop.is_set():
+            timeout = self.debounce if last_event else 1.0
+            try:
+                paths = self._backend.poll(timeout)
+            except Exception as e:
+                logger.warning("Watcher poll failed: %s", e)
+                paths = []
+                self._stop.wait(1.0)
+
+            if paths is None:
+                rescan = True
+                last_event = time.monotonic()
+            elif paths:
+                pending.update(paths)
+                last_event = time.monotonic()
+
+            if last_event and time.monotonic() - last_event >= self.debounce:
+                changed, pending = pending, set()
+                full, rescan = rescan, False
+                last_event = None
+                try:
+                    changes = self._classify(changed)
+                    if changes or full:
+                        self.shot_manager.apply_fs_changes(changes, rescan=full)
+                except Exception as e:
+                    logger.warning("Failed to apply filesystem changes: %s", e)
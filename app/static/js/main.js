@@ -1,5 +1,6 @@
         let currentProject = null;
         let shots = [];
+        let shotsToken = null;
         let savedScrollY = 0;
         let savedRowId = null;
         const NEW_SHOT_DROP_TEXT = 'Drop an asset here to create a new shot.';
@@ -265,6 +266,8 @@
                 if (result.success) {
                     currentProject = null;
                     shots = [];
+                    shotsToken = null;
+                    closeShotEvents();
                     showSetupScreen();
                     showNotification('Project closed');
                 } else {
@@ -570,6 +573,7 @@
             document.getElementById('project-toggle-name').textContent = currentProject.name;
             document.getElementById('app-bar-controls').style.display = '';
             document.getElementById('close-project-btn').style.display = '';
+            resetShotSearch();
             closeProjectDrawer();
             const input = document.getElementById('manual-path-input');
             if (input && currentProject && currentProject.path) {
@@ -596,7 +600,9 @@
 
                 if (result.success) {
                     shots = result.data;
+                    shotsToken = result.token ?? null;
                     renderShots();
+                    openShotEvents();
 
                     // Ensure skeleton shows for minimum time to avoid jarring flash
                     const elapsed = Date.now() - skeletonStart;
@@ -608,17 +614,7 @@
                         restoreScroll();
                         startLazyThumbnailLoading();
                         checkOnboardingTips();
-
-                        // Trigger upload success animation if pending
-                        if (window.pendingUploadAnimation) {
-                            const { shotName, type } = window.pendingUploadAnimation;
-                            const thumbnail = document.querySelector(`#shot-row-${shotName} .drop-zone[ondragover*="${type}"] .preview-thumbnail`);
-                            if (thumbnail) {
-                                thumbnail.classList.add('upload-success');
-                                setTimeout(() => thumbnail.classList.remove('upload-success'), 700);
-                            }
-                            window.pendingUploadAnimation = null;
-                        }
+                        playPendingUploadAnimation();
                     }, remaining);
 
                     loadReferenceImages();
@@ -633,6 +629,263 @@
             }
         }
 
+        function playPendingUploadAnimation() {
+            if (!window.pendingUploadAnimation) return;
+            const { shotName, type } = window.pendingUploadAnimation;
+            const thumbnail = document.querySelector(`#shot-row-${shotName} .drop-zone[ondragover*="${type}"] .preview-thumbnail`);
+            if (thumbnail) {
+                thumbnail.classList.add('upload-success');
+                setTimeout(() => thumbnail.classList.remove('upload-success'), 700);
+            }
+            window.pendingUploadAnimation = null;
+        }
+
+        // Fetch only the shots changed since the last listing and patch their
+        // rows. Falls back to a full reload when the server has no history
+        // for our token (e.g. after a restart).
+        async function refreshShots(rowId = null) {
+            if (shotsToken === null) {
+                return loadShots(rowId);
+            }
+            try {
+                const response = await fetch(`/api/shots/changes?since=${shotsToken}`);
+                const result = await response.json();
+                if (!result.success || result.data.reset) {
+                    return loadShots(rowId);
+                }
+                applyShotChanges(result.data);
+                playPendingUploadAnimation();
+            } catch (error) {
+                console.error('Error loading shot changes:', error);
+                return loadShots(rowId);
+            }
+        }
+
+        // ===== LIVE UPDATES (Server-Sent Events) =====
+
+        let shotEvents = null;
+        let shotEventsProject = null;
+        let shotEventsTimer = null;
+        let referenceEventsTimer = null;
+
+        function openShotEvents() {
+            if (typeof EventSource === 'undefined') return;
+            // The stream is bound to the project open when it connected.
+            if (shotEvents && shotEventsProject === currentProject?.path) return;
+            closeShotEvents();
+            shotEvents = new EventSource('/api/shots/events');
+            shotEventsProject = currentProject?.path;
+
+            shotEvents.addEventListener('shot', (e) => {
+                const event = JSON.parse(e.data);
+                // Our own mutations are usually applied already.
+                if (shotsToken !== null && event.token <= shotsToken) return;
+                // Coalesce bursts (e.g. sync) into a single delta request.
+                clearTimeout(shotEventsTimer);
+                shotEventsTimer = setTimeout(() => refreshShots(), 150);
+            });
+
+            shotEvents.addEventListener('thumbnail', (e) => {
+                const event = JSON.parse(e.data);
+                const thumbnail = document.querySelector(
+                    `#shot-row-${CSS.escape(event.shot)} .drop-zone[ondragover*="'${event.asset}'"] .preview-thumbnail`);
+                if (!thumbnail || !event.url) return;
+                thumbnail.style.backgroundImage = `url('${event.url}?v=${Date.now()}')`;
+                thumbnail.style.backgroundSize = 'cover';
+                thumbnail.style.backgroundPosition = 'center';
+                thumbnail.classList.remove('loading');
+                thumbnail.removeAttribute('data-lazy-thumb');
+            });
+
+            shotEvents.addEventListener('reference', () => {
+                clearTimeout(referenceEventsTimer);
+                referenceEventsTimer = setTimeout(() => loadReferenceImages(), 150);
+            });
+
+            // Background sync of the latest folders (runs on project open).
+            shotEvents.addEventListener('sync', (e) => {
+                const event = JSON.parse(e.data);
+                if (event.state === 'done' && (event.synced || event.removed)) {
+                    showNotification(`Latest folders synced: ${event.synced} updated, ${event.removed} orphans removed`, 'info');
+                } else if (event.state === 'failed') {
+                    showNotification(`Syncing latest folders failed: ${event.error}`, 'error');
+                }
+            });
+
+            // Post-upload work runs as background jobs; the grid is updated
+            // by their shot and thumbnail events, so only failures are shown.
+            shotEvents.addEventListener('job', (e) => {
+                const job = JSON.parse(e.data);
+                if (job.state === 'failed' && job.kind !== 'thumbnail' && job.kind !== 'probe') {
+                    showNotification(`${job.shot || 'Background'}: ${job.kind} job failed: ${job.error}`, 'error');
+                }
+            });
+
+            // The server dropped events for us; start over from a full listing.
+            shotEvents.addEventListener('resync', () => loadShots());
+        }
+
+        function closeShotEvents() {
+            if (shotEvents) {
+                shotEvents.close();
+                shotEvents = null;
+                shotEventsProject = null;
+            }
+        }
+
+        // Active shot search: Map of shot name -> snippet HTML, or null.
+        let searchResults = null;
+        let searchTimer = null;
+        // Shots matching the active filter chips (a Set), or null.
+        let filterResults = null;
+
+        function onShotSearchInput(value) {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => runShotSearch(value), 150);
+        }
+
+        async function runShotSearch(value) {
+            const query = value.trim();
+            if (!query) {
+                searchResults = null;
+                applyRowFilters();
+                return;
+            }
+            try {
+                const response = await fetch(`/api/shots/search?q=${encodeURIComponent(query)}&limit=500`);
+                const result = await response.json();
+                // Ignore answers to queries the user has already typed past.
+                if (!result.success || document.getElementById('shot-search').value.trim() !== query) return;
+                searchResults = new Map(result.data.map(r => [r.name, r.snippet]));
+                applyRowFilters();
+            } catch (error) {
+                console.error('Error searching shots:', error);
+            }
+        }
+
+        function toggleFilterChip(chip) {
+            chip.classList.toggle('active');
+            runShotFilter();
+        }
+
+        // Ask the server which shots match the active chips.
+        async function runShotFilter() {
+            const params = Array.from(document.querySelectorAll('.filter-chip.active'))
+                .map(chip => chip.dataset.filter);
+            if (params.length === 0) {
+                filterResults = null;
+                applyRowFilters();
+                return;
+            }
+            const query = params.join('&');
+            try {
+                const response = await fetch(`/api/shots/query?${query}`);
+                const result = await response.json();
+                const current = Array.from(document.querySelectorAll('.filter-chip.active'))
+                    .map(chip => chip.dataset.filter).join('&');
+                if (!result.success || current !== query) return;
+                filterResults = new Set(result.data);
+                applyRowFilters();
+            } catch (error) {
+                console.error('Error filtering shots:', error);
+            }
+        }
+
+        function resetShotSearch() {
+            const input = document.getElementById('shot-search');
+            if (input) input.value = '';
+            searchResults = null;
+            document.querySelectorAll('.filter-chip.active').forEach(chip => chip.classList.remove('active'));
+            filterResults = null;
+        }
+
+        // Hide rows outside the search and filter results and show why the
+        // others matched the search.
+        function applyRowFilters() {
+            const filtering = searchResults !== null || filterResults !== null;
+            document.querySelectorAll('#shot-list .shot-row').forEach(row => {
+                const shotName = row.id.slice('shot-row-'.length);
+                const hidden = (searchResults !== null && !searchResults.has(shotName))
+                    || (filterResults !== null && !filterResults.has(shotName));
+                row.classList.toggle('search-hidden', hidden);
+                const zone = row.nextElementSibling;
+                if (zone && zone.classList.contains('drop-between-zone')) {
+                    zone.classList.toggle('search-hidden', filtering);
+                }
+
+                let snippet = row.querySelector('.search-snippet');
+                const html = searchResults && searchResults.get(shotName);
+                if (!html) {
+                    if (snippet) snippet.remove();
+                    return;
+                }
+                if (!snippet) {
+                    snippet = document.createElement('div');
+                    snippet.className = 'search-snippet';
+                    row.appendChild(snippet);
+                }
+                snippet.innerHTML = html;  // escaped by the server, only <mark> tags
+            });
+            const first = document.querySelector('#shot-list > .drop-between-zone');
+            if (first) first.classList.toggle('search-hidden', filtering);
+        }
+
+        function removeShotRow(shotName) {
+            const row = document.getElementById(`shot-row-${shotName}`);
+            if (!row) return;
+            const zone = row.nextElementSibling;
+            if (zone && zone.classList.contains('drop-between-zone')) zone.remove();
+            row.remove();
+        }
+
+        function applyShotChanges(changes) {
+            shotsToken = changes.token;
+            const hadShots = shots.length > 0;
+
+            for (const name of changes.removed) {
+                const index = shots.findIndex(s => s.name === name);
+                if (index >= 0) shots.splice(index, 1);
+                removeShotRow(name);
+            }
+
+            const shotList = document.getElementById('shot-list');
+            for (const shot of changes.added.concat(changes.modified)) {
+                const index = shots.findIndex(s => s.name === shot.name);
+                if (index >= 0) {
+                    shots[index] = shot;
+                    const row = document.getElementById(`shot-row-${shot.name}`);
+                    if (row) row.replaceWith(createShotRow(shot));
+                    continue;
+                }
+
+                const nextIndex = shots.findIndex(s => s.name > shot.name);
+                const nextRow = nextIndex >= 0 ? document.getElementById(`shot-row-${shots[nextIndex].name}`) : null;
+                shots.splice(nextIndex >= 0 ? nextIndex : shots.length, 0, shot);
+                if (!hadShots) continue;
+                const row = createShotRow(shot);
+                const zone = createDropBetweenZone(shot.name);
+                if (nextRow) {
+                    shotList.insertBefore(row, nextRow);
+                    shotList.insertBefore(zone, nextRow);
+                } else {
+                    shotList.appendChild(row);
+                    shotList.appendChild(zone);
+                }
+            }
+
+            // The empty state and the first row need the full layout.
+            if (!hadShots || shots.length === 0) {
+                renderShots();
+            }
+            if (searchResults !== null) {
+                runShotSearch(document.getElementById('shot-search').value);
+            }
+            if (filterResults !== null) {
+                runShotFilter();
+            }
+            startLazyThumbnailLoading();
+        }
+
         function renderShots() {
             applyGridTemplate();
             renderGridHeader();
@@ -667,6 +920,7 @@
                 shotList.appendChild(dropZone);
             });
 
+            applyRowFilters();
             restoreScroll();
         }
 
@@ -708,8 +962,12 @@
             event.preventDefault();
             event.currentTarget.classList.remove('drag-over');
 
-            const files = event.dataTransfer.files;
+            const files = Array.from(event.dataTransfer.files);
             if (files.length === 0) return;
+            if (files.length > 1) {
+                await dropFilesAsNewShots(files, afterShotName);
+                return;
+            }
 
             try {
                 // Create new shot
@@ -748,6 +1006,54 @@
             }
         }
 
+        // Give each dropped file its own new shot, inserted one after
+        // another, and upload them together.
+        async function dropFilesAsNewShots(files, afterShotName) {
+            const entries = [];
+            let after = afterShotName || null;
+            try {
+                for (const file of files) {
+                    const fileType = getFileType(file.name);
+                    if (!fileType) continue;
+                    const response = await fetch('/api/shots/create-between', {
+                        method: 'POST',
+                        headers: {'Content-Type': 'application/json'},
+                        body: JSON.stringify({ after_shot: after })
+                    });
+                    const result = await response.json();
+                    if (!result.success) {
+                        if (result.error && result.error.includes('shot number would exceed 999')) {
+                            showShotLimitModal();
+                        } else {
+                            showNotification(result.error || 'Failed to create shot', 'error');
+                        }
+                        break;
+                    }
+                    after = result.data.name;
+                    entries.push({ file, shot_name: after, file_type: fileType });
+                }
+            } catch (error) {
+                console.error('Error creating shots:', error);
+                showNotification('Error creating shot', 'error');
+            }
+            if (entries.length === 0) {
+                if (files.every(file => !getFileType(file.name))) {
+                    showNotification('Unsupported file type', 'error');
+                }
+                return;
+            }
+
+            showNotification(`Uploading ${entries.length} files...`);
+            const results = await uploadBatch(entries);
+            const failed = results.filter(result => !result.success);
+            if (failed.length) {
+                showNotification(`${failed.length} of ${entries.length} uploads failed: ${failed[0].error}`, 'error');
+            } else {
+                showNotification(`${entries.length} files uploaded successfully!`);
+            }
+            refreshShots();
+        }
+
         function createShotRow(shot) {
             const row = document.createElement('div');
             row.className = 'shot-row';
@@ -1221,7 +1527,7 @@
                                 <div class="version-badge" onclick="toggleShotVersionDropdown(event, this)">v${String(activeVersion).padStart(3, '0')}</div>
                                 <div class="version-dropdown-menu">${versionItems}</div>
                             </div>
-                            <button class="prompt-button"
+                            <button class="prompt-button${file.has_prompt ? ' has-prompt' : ''}"
                                     title="View and edit prompt"
                                     data-shot="${shot.name}"
                                     data-type="${type}"
@@ -1459,23 +1765,20 @@
             }
             if (!pendingCustomLipsyncFile || !pendingCustomLipsyncShot) return;
 
-            const formData = new FormData();
-            formData.append('file', pendingCustomLipsyncFile);
-            formData.append('shot_name', pendingCustomLipsyncShot);
-            formData.append('file_type', 'lipsync_custom');
-            formData.append('custom_label', label);
+            const file = pendingCustomLipsyncFile;
+            const shotName = pendingCustomLipsyncShot;
 
             closeLipsyncCustomModal();
 
             try {
-                const response = await fetch('/api/shots/upload', {
-                    method: 'POST',
-                    body: formData
+                const result = await postUpload(file, {
+                    shot_name: shotName,
+                    file_type: 'lipsync_custom',
+                    custom_label: label
                 });
-                const result = await response.json();
                 if (result.success) {
                     showNotification(`Uploaded custom lipsync file`);
-                    await loadShots();
+                    await refreshShots();
                 } else {
                     showNotification(result.error || 'Upload failed', 'error');
                 }
@@ -1613,27 +1916,216 @@
             await uploadFile(file, shotName, expectedType);
         }
 
-        async function uploadFile(file, shotName, fileType) {
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('shot_name', shotName);
-            formData.append('file_type', fileType);
+        // Files above this size are sent in resumable chunks.
+        const CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+        const CHUNK_RETRIES = 5;
+        const UPLOAD_SESSIONS_STORAGE_KEY = 'shotbuddy-upload-sessions';
+
+        // Upload a file and return the parsed JSON result.  Small files are
+        // sent as the raw request body so the server can stream them to disk
+        // in one pass; the other fields go in the query string.
+        async function postUpload(file, fields) {
+            if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+                return postChunkedUpload(file, fields);
+            }
+            const params = new URLSearchParams({ ...fields, filename: file.name });
+            const response = await fetch('/api/shots/upload?' + params.toString(), {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: file
+            });
+            return response.json();
+        }
+
+        function uploadSessionKey(file, fields) {
+            return [fields.shot_name, fields.file_type, fields.custom_label || '',
+                    file.name, file.size, file.lastModified].join('|');
+        }
+
+        function loadUploadSessions() {
+            try {
+                return JSON.parse(localStorage.getItem(UPLOAD_SESSIONS_STORAGE_KEY)) || {};
+            } catch (e) {
+                return {};
+            }
+        }
+
+        function storeUploadSession(key, uploadId) {
+            const sessions = loadUploadSessions();
+            if (uploadId) {
+                sessions[key] = uploadId;
+            } else {
+                delete sessions[key];
+            }
+            localStorage.setItem(UPLOAD_SESSIONS_STORAGE_KEY, JSON.stringify(sessions));
+        }
+
+        let crc32Table = null;
+
+        function crc32(bytes) {
+            if (!crc32Table) {
+                crc32Table = new Uint32Array(256);
+                for (let n = 0; n < 256; n++) {
+                    let c = n;
+                    for (let k = 0; k < 8; k++) {
+                        c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+                    }
+                    crc32Table[n] = c >>> 0;
+                }
+            }
+            let crc = 0xFFFFFFFF;
+            for (let i = 0; i < bytes.length; i++) {
+                crc = crc32Table[(crc ^ bytes[i]) & 0xFF] ^ (crc >>> 8);
+            }
+            return (crc ^ 0xFFFFFFFF) >>> 0;
+        }
+
+        // WebCrypto is only available on https and localhost; other origins
+        // fall back to CRC-32.
+        async function chunkChecksumHeaders(buffer) {
+            if (window.crypto && crypto.subtle) {
+                const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', buffer));
+                const hex = Array.from(digest, b => b.toString(16).padStart(2, '0')).join('');
+                return { 'X-Chunk-Sha256': hex };
+            }
+            return { 'X-Chunk-Crc32': crc32(new Uint8Array(buffer)).toString(16).padStart(8, '0') };
+        }
+
+        // Resume the stored session for this file if the server still has it.
+        async function openUploadSession(file, fields, key) {
+            const uploadId = loadUploadSessions()[key];
+            if (uploadId) {
+                const response = await fetch(`/api/shots/uploads/${uploadId}`);
+                const result = await response.json();
+                if (result.success) return result.data;
+                storeUploadSession(key, null);
+            }
+            const response = await fetch('/api/shots/uploads', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ...fields, filename: file.name, size: file.size })
+            });
+            const result = await response.json();
+            if (!result.success) throw new Error(result.error || 'Upload failed');
+            storeUploadSession(key, result.data.upload_id);
+            return result.data;
+        }
+
+        async function postChunkedUpload(file, fields) {
+            const key = uploadSessionKey(file, fields);
+            const session = await openUploadSession(file, fields, key);
+            let offset = session.offset;
+            let failures = 0;
+            while (offset < file.size) {
+                const end = Math.min(offset + session.chunk_size, file.size);
+                const buffer = await file.slice(offset, end).arrayBuffer();
+                try {
+                    const response = await fetch(`/api/shots/uploads/${session.upload_id}?offset=${offset}`, {
+                        method: 'PUT',
+                        headers: {
+                            'Content-Type': 'application/octet-stream',
+                            ...(await chunkChecksumHeaders(buffer))
+                        },
+                        body: buffer
+                    });
+                    const result = await response.json();
+                    if (response.status === 404) {
+                        storeUploadSession(key, null);
+                        throw new Error(result.error || 'Upload expired');
+                    }
+                    if (response.status === 409 && result.data) {
+                        offset = result.data.offset;
+                        continue;
+                    }
+                    if (!result.success) throw new Error(result.error || 'Chunk rejected');
+                    offset = result.data.offset;
+                    failures = 0;
+                    showNotification(`Uploading ${file.name}... ${Math.floor(offset * 100 / file.size)}%`);
+                } catch (e) {
+                    if (!loadUploadSessions()[key] || ++failures > CHUNK_RETRIES) throw e;
+                    await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+                }
+            }
+            const response = await fetch(`/api/shots/uploads/${session.upload_id}/finalize`, { method: 'POST' });
+            const result = await response.json();
+            if (response.status !== 409) storeUploadSession(key, null);
+            return result;
+        }
+
+        // Limits of one /api/shots/upload-batch request; larger files go
+        // through the chunked upload one by one.
+        const BATCH_UPLOAD_MAX_FILES = 50;
+        const BATCH_UPLOAD_MAX_BYTES = 256 * 1024 * 1024;
+
+        // Upload [{file, shot_name, file_type, custom_label?}] with as few
+        // requests as possible; returns one result per entry, in order.
+        async function uploadBatch(entries) {
+            const results = new Array(entries.length);
+            let group = [];
+            let groupBytes = 0;
+
+            const flush = async () => {
+                if (group.length === 0) return;
+                const formData = new FormData();
+                const items = [];
+                for (const index of group) {
+                    const { file, ...fields } = entries[index];
+                    formData.append('file', file);
+                    items.push(fields);
+                }
+                formData.append('items', JSON.stringify(items));
+                try {
+                    const response = await fetch('/api/shots/upload-batch', {
+                        method: 'POST',
+                        body: formData
+                    });
+                    const result = await response.json();
+                    group.forEach((index, i) => {
+                        results[index] = result.success
+                            ? result.data.results[i]
+                            : { success: false, error: result.error || 'Upload failed' };
+                    });
+                } catch (error) {
+                    group.forEach(index => { results[index] = { success: false, error: error.message }; });
+                }
+                group = [];
+                groupBytes = 0;
+            };
 
+            for (let index = 0; index < entries.length; index++) {
+                const { file, ...fields } = entries[index];
+                if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+                    try {
+                        results[index] = await postChunkedUpload(file, fields);
+                    } catch (error) {
+                        results[index] = { success: false, error: error.message };
+                    }
+                    continue;
+                }
+                if (group.length >= BATCH_UPLOAD_MAX_FILES || groupBytes + file.size > BATCH_UPLOAD_MAX_BYTES) {
+                    await flush();
+                }
+                group.push(index);
+                groupBytes += file.size;
+            }
+            await flush();
+            return results;
+        }
+
+        async function uploadFile(file, shotName, fileType) {
             try {
                 showNotification('Uploading file...');
                 
-                const response = await fetch('/api/shots/upload', {
-                    method: 'POST',
-                    body: formData
+                const result = await postUpload(file, {
+                    shot_name: shotName,
+                    file_type: fileType
                 });
 
-                const result = await response.json();
-
                 if (result.success) {
                     showNotification(`${file.name} uploaded successfully!`);
                     // Store upload target for animation after reload
                     window.pendingUploadAnimation = { shotName, type: fileType };
-                    loadShots(`shot-row-${shotName}`); // Refresh and keep scroll
+                    refreshShots(`shot-row-${shotName}`); // Patch the changed row
                 } else {
                     showNotification(result.error || 'Upload failed', 'error');
                 }
@@ -1849,7 +2341,7 @@ async function renameShot(oldName, newName) {
         const result = await response.json();
         if (result.success) {
             showNotification(`Renamed to ${newName}`);
-            loadShots(`shot-row-${newName}`);
+            refreshShots(`shot-row-${newName}`);
         } else {
             showNotification(result.error || 'Rename failed', 'error');
         }
@@ -1880,17 +2372,24 @@ async function revealFile(relPath, shotName, assetType) {
     }
 }
 
-async function fetchPrompt(shotName, assetType, version) {
+// Prompt texts of the asset open in the prompt modal, {version: text}.
+// Loaded once per modal so switching versions needs no requests.
+let promptHistory = {};
+
+async function fetchPromptHistory(shotName, assetType) {
+    const prompts = {};
     try {
-        const resp = await fetch(`/api/shots/prompt?shot_name=${encodeURIComponent(shotName)}&asset_type=${assetType}&version=${version}`);
+        const resp = await fetch(`/api/shots/prompt-history?shot_name=${encodeURIComponent(shotName)}`);
         const data = await resp.json();
         if (data.success) {
-            return data.data || '';
+            for (const item of data.data[assetType] || []) {
+                prompts[item.version] = item.prompt || '';
+            }
         }
     } catch (e) {
-        console.error('Failed to load prompt:', e);
+        console.error('Failed to load prompt history:', e);
     }
-    return '';
+    return prompts;
 }
 
 function buildVersionDropdown(versions, currentVersion) {
@@ -1921,6 +2420,7 @@ async function selectPromptVersion(v) {
     const prevVersion = parseInt(modal.dataset.version, 10);
     if (prevVersion && prevVersion !== v) {
         const prevPromptText = document.getElementById('prompt-text').value;
+        promptHistory[prevVersion] = prevPromptText;
         try {
             await fetch('/api/shots/prompt', {
                 method: 'POST',
@@ -1939,14 +2439,15 @@ async function selectPromptVersion(v) {
     modal.dataset.version = v;
     const versions = JSON.parse(modal.dataset.versions || '[]');
     buildVersionDropdown(versions, v);
-    let prompt = await fetchPrompt(shotName, assetType, v);
+    const isLatest = v === parseInt(modal.dataset.assetVersion, 10);
+    const prompt = promptHistory[v] || '';
 
     const copyBtn = document.getElementById('copy-prompt-btn');
     copyBtn.style.display = 'none';
     modal.dataset.prevPrompt = '';
 
-    if (!prompt && v === parseInt(modal.dataset.assetVersion, 10)) {
-        const prevPrompt = await fetchPrompt(shotName, assetType, v - 1);
+    if (!prompt && isLatest) {
+        const prevPrompt = promptHistory[v - 1];
         if (prevPrompt) {
             modal.dataset.prevPrompt = prevPrompt;
             copyBtn.style.display = 'inline-block';
@@ -1968,13 +2469,14 @@ async function openPromptModal(shotName, assetType, version) {
     modal.dataset.assetVersion = version;
     buildVersionDropdown(versions, version);
 
-    let prompt = await fetchPrompt(shotName, assetType, version);
+    promptHistory = await fetchPromptHistory(shotName, assetType);
+    const prompt = promptHistory[version] || '';
     const copyBtn = document.getElementById('copy-prompt-btn');
     copyBtn.style.display = 'none';
     modal.dataset.prevPrompt = '';
 
     if (!prompt && version > 1) {
-        const prevPrompt = await fetchPrompt(shotName, assetType, version - 1);
+        const prevPrompt = promptHistory[version - 1];
         if (prevPrompt) {
             modal.dataset.prevPrompt = prevPrompt;
             copyBtn.style.display = 'inline-block';
@@ -2023,12 +2525,12 @@ async function savePrompt() {
             showNotification(result.error || 'Failed to save prompt', 'error');
         } else {
             const shot = shots.find(s => s.name === shotName);
-            if (shot) {
-                if (assetType === 'image' || assetType === 'video') {
-                    shot[assetType].prompt = promptText;
-                } else if (shot.lipsync && shot.lipsync[assetType]) {
-                    shot.lipsync[assetType].prompt = promptText;
-                }
+            const asset = shot && (shot[assetType] || (shot.lipsync && shot.lipsync[assetType]));
+            if (asset && parseInt(version, 10) === (asset.active_version || asset.version)) {
+                asset.has_prompt = promptText.trim() !== '';
+                const btn = document.querySelector(
+                    `#shot-row-${CSS.escape(shotName)} .prompt-button[data-type="${assetType}"]`);
+                if (btn) btn.classList.toggle('has-prompt', asset.has_prompt);
             }
         }
     } catch (e) {
@@ -2298,7 +2800,7 @@ async function executeApplyNaming() {
                 (result.errors > 0 ? ` (${result.errors} errors)` : '');
             showNotification(msg, result.errors > 0 ? 'warning' : 'success');
             currentSettings.file_naming_pattern = pattern;
-            if (typeof loadShots === 'function') loadShots();
+            if (typeof refreshShots === 'function') refreshShots();
         } else {
             showNotification(result.error || 'Failed to rename files', 'error');
         }
@@ -2907,36 +3409,60 @@ async function loadAllMissingThumbnails() {
         elementMap.set(key, el);
     });
 
+    const applyThumbnail = (key, thumbnailUrl) => {
+        const element = elementMap.get(key);
+        if (!element) return;
+        if (thumbnailUrl) {
+            element.style.backgroundImage = `url('${thumbnailUrl}?v=${Date.now()}')`;
+            element.style.backgroundSize = 'cover';
+            element.style.backgroundPosition = 'center';
+        }
+        element.classList.remove('loading');
+        element.removeAttribute('data-lazy-thumb');
+    };
+
     try {
+        // Results stream in as NDJSON, one line per thumbnail as soon as it
+        // is rendered, so the grid fills progressively.
         const response = await fetch('/api/shots/generate-thumbnails-batch', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'Accept': 'application/x-ndjson' },
             body: JSON.stringify({ items })
         });
 
-        const result = await response.json();
-
-        if (result.success && result.thumbnails) {
-            // Apply all thumbnails
-            for (const [key, thumbnailUrl] of Object.entries(result.thumbnails)) {
-                const element = elementMap.get(key);
-                if (element && thumbnailUrl) {
-                    element.style.backgroundImage = `url('${thumbnailUrl}?v=${Date.now()}')`;
-                    element.style.backgroundSize = 'cover';
-                    element.style.backgroundPosition = 'center';
-                    element.classList.remove('loading');
-                    element.removeAttribute('data-lazy-thumb');
+        const contentType = response.headers.get('Content-Type') || '';
+        if (response.ok && response.body && contentType.includes('application/x-ndjson')) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    const result = JSON.parse(line);
+                    if (result.key) applyThumbnail(result.key, result.url);
                 }
+                if (done) break;
             }
-
-            // Remove loading state from any remaining elements (no thumbnail available)
-            lazyThumbs.forEach(el => {
-                if (el.hasAttribute('data-lazy-thumb')) {
-                    el.classList.remove('loading');
-                    el.removeAttribute('data-lazy-thumb');
+        } else {
+            const result = await response.json();
+            if (result.success && result.thumbnails) {
+                for (const [key, thumbnailUrl] of Object.entries(result.thumbnails)) {
+                    applyThumbnail(key, thumbnailUrl);
                 }
-            });
+            }
         }
+
+        // Remove loading state from any remaining elements (no thumbnail available)
+        lazyThumbs.forEach(el => {
+            if (el.hasAttribute('data-lazy-thumb')) {
+                el.classList.remove('loading');
+                el.removeAttribute('data-lazy-thumb');
+            }
+        });
     } catch (error) {
         console.error('Failed to load thumbnails batch:', error);
         // Remove loading state on error
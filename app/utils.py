@@ -1,11 +1,19 @@
 from pathlib import Path
 from functools import wraps
+import hashlib
+import io
 import logging
+import os
+import shutil
 import subprocess
 import platform
+import tempfile
 
 logger = logging.getLogger(__name__)
 
+# Seconds ffmpeg may take to extract a thumbnail frame before it is killed.
+DEFAULT_FFMPEG_TIMEOUT = 20.0
+
 
 class ProjectPaths:
     """Encapsulates common project directory paths.
@@ -66,6 +74,37 @@ def error_response(message, status_code=400):
     return jsonify({"success": False, "error": message}), status_code
 
 
+def make_etag(*parts):
+    """Return a strong ETag value hashed from ``parts``."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(str(part).encode('utf-8', 'surrogateescape'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def conditional_response(etag, build):
+    """Answer a GET with 304 if the client's ETag matches, else ``build()``.
+
+    ``build`` is only called when the client's copy is stale, so callers
+    should compute ``etag`` from cheap change state and leave all listing
+    work to ``build``.  Error tuples from ``build`` are passed through
+    without an ETag.
+    """
+    from flask import Response, request
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+        if isinstance(response, tuple):
+            return response
+    response.set_etag(etag)
+    # Let browsers keep the body but revalidate it on every request.
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 def reveal_in_file_browser(file_path):
     """Open the system file browser with the specified path selected."""
     file_path = Path(file_path)
@@ -88,6 +127,23 @@ def open_folder_in_browser(folder_path):
         subprocess.Popen(["xdg-open", str(folder_path)])
 
 
+def _save_thumbnail(img, thumb_path):
+    """Save ``img`` as a JPEG at ``thumb_path`` through a temporary file.
+
+    An existing thumbnail stays servable until the new one is complete, and
+    concurrent renders of the same thumbnail never write to the same file.
+    """
+    fd, part_path = tempfile.mkstemp(dir=thumb_path.parent, prefix=f"{thumb_path.stem}.",
+                                     suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            img.save(f, 'JPEG', quality=85)
+        os.replace(part_path, thumb_path)
+    except BaseException:
+        Path(part_path).unlink(missing_ok=True)
+        raise
+
+
 def create_image_thumbnail(image_path, thumb_path, size=None):
     """Create a JPEG thumbnail from an image file.
 
@@ -110,9 +166,6 @@ def create_image_thumbnail(image_path, thumb_path, size=None):
         thumb_path = Path(thumb_path)
         thumb_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if thumb_path.exists():
-            thumb_path.unlink()
-
         with Image.open(image_path) as img:
             img.thumbnail(size, Image.Resampling.LANCZOS)
 
@@ -124,7 +177,7 @@ def create_image_thumbnail(image_path, thumb_path, size=None):
                 background.paste(img, mask=img.split()[-1] if 'A' in img.mode else None)
                 img = background
 
-            img.save(str(thumb_path), 'JPEG', quality=85)
+            _save_thumbnail(img, thumb_path)
             return str(thumb_path)
 
     except Exception as e:
@@ -132,8 +185,64 @@ def create_image_thumbnail(image_path, thumb_path, size=None):
         return None
 
 
+def _ffmpeg_frame_command(ffmpeg, video_path, size, seek):
+    """Return the ffmpeg command printing one scaled frame as PPM to stdout."""
+    width, height = size
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if seek:
+        # Input seeking jumps to the nearest keyframe before decoding, and
+        # only keyframes are decoded until the frame is found.
+        cmd += ["-skip_frame", "nokey", "-ss", f"{seek:g}"]
+    cmd += [
+        "-i", str(video_path),
+        "-map", "0:v:0", "-an", "-sn", "-dn",
+        "-frames:v", "1",
+        # Scale inside ffmpeg to fit the thumbnail box (never upscaling),
+        # so only a thumbnail-sized raw frame crosses the pipe.
+        "-vf", (f"scale=w='min({width},iw)':h='min({height},ih)'"
+                ":force_original_aspect_ratio=decrease:flags=lanczos,format=rgb24"),
+        "-c:v", "ppm", "-f", "image2pipe", "pipe:1",
+    ]
+    return cmd
+
+
+def extract_video_frame(video_path, size, seek=0.0, timeout=None, ffmpeg=None):
+    """Return one frame of a video as an RGB PIL image fitting ``size``.
+
+    The frame is decoded at ``seek`` seconds (falling back to the first
+    frame if the video is shorter), scaled by ffmpeg and read from a pipe
+    without touching the disk.  ffmpeg is killed if it runs longer than
+    ``timeout`` seconds.
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not installed.
+        RuntimeError: If no frame could be decoded.
+        subprocess.TimeoutExpired: If ffmpeg timed out.
+    """
+    from PIL import Image
+
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise FileNotFoundError("ffmpeg not found")
+
+    for attempt_seek in ((seek, 0.0) if seek else (0.0,)):
+        proc = subprocess.run(
+            _ffmpeg_frame_command(ffmpeg, video_path, size, attempt_seek),
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            timeout=timeout)
+        if proc.returncode == 0 and proc.stdout:
+            with Image.open(io.BytesIO(proc.stdout)) as img:
+                return img.convert("RGB")
+    error = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+    raise RuntimeError(error[-1] if error else "ffmpeg produced no frame")
+
+
 def create_video_thumbnail(video_path, thumb_path, size=None):
-    """Create a JPEG thumbnail from the first frame of a video file.
+    """Create a JPEG thumbnail from a frame of a video file.
+
+    The frame is taken ``[thumbnails] video_seek`` seconds in (default: the
+    first frame) and ffmpeg is given ``[thumbnails] ffmpeg_timeout``
+    seconds; see :func:`extract_video_frame`.
 
     Args:
         video_path: Path to the source video
@@ -143,8 +252,8 @@ def create_video_thumbnail(video_path, thumb_path, size=None):
     Returns:
         str: Path to the created thumbnail, or None on failure
     """
-    import shutil as _shutil
     from PIL import Image
+    from .config.app_config import config_float
     from .config.constants import THUMBNAIL_SIZE
 
     if size is None:
@@ -153,38 +262,26 @@ def create_video_thumbnail(video_path, thumb_path, size=None):
     video_path = Path(video_path)
     thumb_path = Path(thumb_path)
 
-    ffmpeg = _shutil.which("ffmpeg")
+    ffmpeg = shutil.which("ffmpeg")
     if not ffmpeg:
         logger.warning("ffmpeg not found; skipping video thumbnail for %s", video_path)
         return None
 
     try:
         thumb_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Delete existing thumbnail to ensure fresh generation
-        if thumb_path.exists():
-            thumb_path.unlink()
-
-        tmp_path = thumb_path.with_suffix(".tmp.jpg")
-
-        cmd = [ffmpeg, "-y", "-i", str(video_path), "-frames:v", "1", str(tmp_path)]
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        with Image.open(tmp_path) as img:
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-
-            if img.mode in ("RGBA", "LA", "P"):
-                background = Image.new("RGB", img.size, (64, 64, 64))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(img, mask=img.split()[-1] if "A" in img.mode else None)
-                img = background
-
-            img.save(str(thumb_path), "JPEG", quality=85)
-
-        tmp_path.unlink(missing_ok=True)
+        img = extract_video_frame(
+            video_path, size,
+            seek=max(0.0, config_float('thumbnails', 'video_seek', 0.0)),
+            timeout=config_float('thumbnails', 'ffmpeg_timeout', DEFAULT_FFMPEG_TIMEOUT),
+            ffmpeg=ffmpeg)
+        # ffmpeg already scaled the frame; this only guards odd pixel aspects.
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        _save_thumbnail(img, thumb_path)
         return str(thumb_path)
 
+    except subprocess.TimeoutExpired:
+        logger.warning("ffmpeg timed out creating a thumbnail for %s", video_path)
+        return None
     except Exception as e:
         logger.warning("Error creating video thumbnail: %s", e)
         return None
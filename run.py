@@ -130,7 +130,10 @@ def kill_shotbuddy_on_port(port):
     return False
 
 
-app = create_app()
+# Thumbnail worker processes import this module again as "__mp_main__";
+# they only render images and must not start a second app.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     cfg_host, cfg_port = load_server_config()